@@ -0,0 +1,164 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+# Allow imports using the repo-relative paths even without packages
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import main as scraper                                          # type: ignore
+from extractors.backends import get_backend                    # type: ignore
+from extractors.page_index import PageIndex                    # type: ignore
+from extractors.product_profile import parse_product_profile   # type: ignore
+from extractors.reviews_parser import parse_reviews            # type: ignore
+from extractors.competitors import parse_competitive           # type: ignore
+from extractors.pricing_parser import parse_pricing            # type: ignore
+from extractors.page_record import extract_record              # type: ignore
+from pipelines.normalize import normalize_record               # type: ignore
+from pipelines.validators import SchemaValidator               # type: ignore
+from outputs.writer_json import JsonWriter                     # type: ignore
+from outputs.writer_sqlite import SqliteWriter                 # type: ignore
+from synthetic import generate_page                            # type: ignore
+
+URL = "https://www.g2.com/products/bench/reviews"
+
+PROFILES: Dict[str, Dict[str, int]] = {
+    "small": {"reviews": 25, "categories": 5, "alternatives": 10, "comparisons": 10, "plans": 3, "page_bytes": 0},
+    "large": {"reviews": 200, "categories": 500, "alternatives": 2000, "comparisons": 2000, "plans": 10,
+              "page_bytes": 1_000_000},
+}
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    fn()  # warm up
+    runs: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {"median": statistics.median(runs), "min": min(runs), "mean": statistics.fmean(runs), "runs": repeat}
+
+def run_suite(profile: Dict[str, int], repeat: int, pages: int) -> Dict[str, Dict[str, float]]:
+    html = generate_page(seed=1, **profile)
+    results: Dict[str, Dict[str, float]] = {}
+
+    for name in ("soup", "lxml", "partial"):
+        backend = get_backend(name)
+        root = backend.parse(html)
+        index = PageIndex(root, backend)
+        results[f"{name}.parse"] = measure(lambda: backend.parse(html), repeat)
+        results[f"{name}.index"] = measure(lambda: PageIndex(root, backend), repeat)
+        results[f"{name}.parse_product_profile"] = measure(lambda: parse_product_profile(root, URL, index=index), repeat)
+        results[f"{name}.parse_reviews"] = measure(lambda: parse_reviews(root, URL, index=index), repeat)
+        results[f"{name}.parse_competitive"] = measure(lambda: parse_competitive(root, URL, index=index), repeat)
+        results[f"{name}.parse_pricing"] = measure(lambda: parse_pricing(root, URL, index=index), repeat)
+        results[f"{name}.extract_record"] = measure(lambda: extract_record(html, URL, backend=name), repeat)
+
+    raw = extract_record(html, URL)
+    record = normalize_record(raw)
+    validator = SchemaValidator(scraper.DEFAULT_SCHEMA)
+    results["normalize_record"] = measure(lambda: normalize_record(raw), repeat)
+    results["validate_instance"] = measure(lambda: validator.validate_instance(record), repeat)
+    results["validate_jsonschema"] = measure(lambda: list(validator.validator.iter_errors(record)), repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = JsonWriter(os.path.join(tmp, "out", "records.json"))
+        distinct = [dict(record, g2_link=f"{URL}?p={i}") for i in range(pages)]
+        results[f"json_writer.{pages}"] = measure(lambda: writer.write(distinct), repeat)
+        runs = iter(range(repeat + 1))
+
+        def write_sqlite() -> None:
+            # A fresh database per run, so every record is an insert rather than a no-op.
+            with SqliteWriter(os.path.join(tmp, "out", f"records{next(runs)}.sqlite3"), batch_size=pages) as sink:
+                for item in distinct:
+                    sink.write_record(item)
+        results[f"sqlite_writer.{pages}"] = measure(write_sqlite, repeat)
+
+        inputs = []
+        for i in range(pages):
+            path = os.path.join(tmp, f"page{i}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(generate_page(seed=i, **profile))
+            inputs.append(path)
+        out = os.path.join(tmp, "out", "run.json")
+        results[f"run.{pages}_pages"] = measure(
+            lambda: scraper.run(inputs, out, 0.0, scraper.DEFAULT_SCHEMA), max(1, repeat // 5)
+        )
+    return results
+
+def compare(baseline_path: str, current_path: str, threshold: float) -> int:
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    with open(current_path, "r", encoding="utf-8") as f:
+        current = json.load(f)["results"]
+    regressions = 0
+    print(f"{'case':<40} {'baseline ms':>12} {'current ms':>12} {'change':>8}")
+    for case in sorted(set(baseline) & set(current)):
+        old, new = baseline[case]["median"], current[case]["median"]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{case:<40} {old * 1000:>12.3f} {new * 1000:>12.3f} {change:>+7.1%}{flag}")
+    for case in sorted(set(baseline) ^ set(current)):
+        print(f"{case:<40} (only in {'baseline' if case in baseline else 'current'})")
+    return 1 if regressions else 0
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="G2 scraper benchmark suite on synthetic pages")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="Run the suite and write results as JSON")
+    run_p.add_argument("--profile", choices=sorted(PROFILES), default="small")
+    for key in PROFILES["small"]:
+        run_p.add_argument(f"--{key.replace('_', '-')}", type=int, default=None, help=f"Override {key} of the profile")
+    run_p.add_argument("--repeat", type=int, default=10, help="Timed runs per case")
+    run_p.add_argument("--pages", type=int, default=20, help="Pages for the JsonWriter and end-to-end run() cases")
+    run_p.add_argument("--output", default=None, help="Write results JSON here (default: stdout)")
+
+    cmp_p = sub.add_parser("compare", help="Compare two result files and flag regressions")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=0.10, help="Flag cases slower by more than this fraction")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        return compare(args.baseline, args.current, args.threshold)
+
+    logging.basicConfig(level=logging.WARNING)
+    profile = dict(PROFILES[args.profile])
+    for key in profile:
+        value = getattr(args, key)
+        if value is not None:
+            profile[key] = value
+    report = {
+        "meta": {
+            "profile": profile,
+            "repeat": args.repeat,
+            "pages": args.pages,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "results": run_suite(profile, args.repeat, args.pages),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import argparse
+import gc
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+# Allow imports using the repo-relative paths even without packages
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, os.path.join(SRC_DIR, "extractors"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extractors.backends import get_backend        # type: ignore
+from extractors.page_record import extract_record  # type: ignore
+from synthetic import generate_page                # type: ignore
+
+FIXTURE = os.path.join(REPO_ROOT, "tests", "fixtures", "product_page.html")
+URL = "https://www.g2.com/products/acme/reviews"
+
+def build_page(copies: int) -> str:
+    """
+    Scale the test fixture by repeating its <body> content `copies` times.
+    """
+    with open(FIXTURE, "r", encoding="utf-8") as f:
+        html = f.read()
+    head, rest = html.split("<body>", 1)
+    body, tail = rest.split("</body>", 1)
+    return f"{head}<body>{body * copies}</body>{tail}"
+
+def time_backend(html: str, backend: str, repeat: int) -> float:
+    extract_record(html, URL, backend=backend)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        extract_record(html, URL, backend=backend)
+    return (time.perf_counter() - start) / repeat
+
+def python_peak(html: str, backend: str) -> int:
+    """
+    tracemalloc peak (bytes) of one extraction. Only Python allocations are
+    traced: libxml2's own tree memory (lxml, partial) does not show up here.
+    """
+    extract_record(html, URL, backend=backend)  # warm up
+    gc.collect()
+    tracemalloc.start()
+    extract_record(html, URL, backend=backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+def _tree_rss(html: str, backend: str) -> int:
+    # Runs in a fresh process so earlier trees and freed arenas do not blur the number.
+    engine = get_backend(backend)
+    engine.parse("<html><body></body></html>")  # load the parser before the baseline
+    gc.collect()
+    before = _rss_bytes()
+    tree = engine.parse(html)
+    held = _rss_bytes() - before
+    del tree
+    return held
+
+def tree_rss(html: str, backend: str) -> int:
+    """
+    Resident memory (bytes) held by the backend's parsed tree, C allocations
+    included (Linux /proc; one new process per measurement).
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(_tree_rss, html, backend).result()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Per-page extraction time and memory: soup vs lxml vs partial backend")
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 20, 200], help="Fixture body repetitions per page")
+    parser.add_argument("--synthetic-mb", type=int, nargs="*", default=[5],
+                        help="Also measure padded synthetic pages of roughly this many MB")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per page size")
+    args = parser.parse_args()
+
+    pages = [(f"x{copies}", build_page(copies)) for copies in args.copies]
+    pages += [(f"syn{n}MB", generate_page(seed=1, page_bytes=n * 1_000_000)) for n in args.synthetic_mb]
+    print(f"{'page':>8} {'bytes':>10} {'backend':>8} {'ms':>9} {'py peak MiB':>12} {'tree RSS MiB':>13}")
+    for label, html in pages:
+        reference = extract_record(html, URL, backend="soup")
+        assert extract_record(html, URL, backend="lxml") == reference
+        assert extract_record(html, URL, backend="partial") == reference
+        for backend in ("soup", "lxml", "partial"):
+            seconds = time_backend(html, backend, args.repeat)
+            print(f"{label:>8} {len(html):>10} {backend:>8} {seconds * 1000:>9.2f}"
+                  f" {python_peak(html, backend) / 2**20:>12.1f} {tree_rss(html, backend) / 2**20:>13.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
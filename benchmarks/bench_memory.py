@@ -0,0 +1,72 @@
+import argparse
+import copy
+import gc
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+# Allow imports using the repo-relative paths even without packages
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(REPO_ROOT, "src")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from extractors.page_record import extract_record              # type: ignore
+from pipelines.normalize import normalize_record               # type: ignore
+from pipelines.records import ProductRecord                    # type: ignore
+from synthetic import generate_page                            # type: ignore
+
+URL = "https://www.g2.com/products/bench/reviews"
+
+def template_records(variants: int, reviews: int) -> List[Dict[str, Any]]:
+    """
+    Normalized records from a few synthetic pages (small profile: 5 categories,
+    10 alternatives/comparisons, 3 plans, `reviews` reviews).
+    """
+    return [normalize_record(extract_record(generate_page(seed=seed, reviews=reviews), URL, backend="lxml"))
+            for seed in range(variants)]
+
+def distinct(templates: List[Dict[str, Any]], i: int) -> Dict[str, Any]:
+    # Deep copy with a unique link so no two records share objects, as after a real crawl.
+    record = copy.deepcopy(templates[i % len(templates)])
+    record["g2_link"] = f"{URL}?p={i}"
+    return record
+
+def held(count: int, templates: List[Dict[str, Any]], keep: Callable[[Dict[str, Any]], Any]) -> Dict[str, float]:
+    """
+    Traced memory of `count` records held in a list as keep(record) returns them.
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    batch = [keep(distinct(templates, i)) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del batch
+    return {"bytes": current, "peak": peak, "seconds": elapsed}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Memory held by a batch of records: plain dicts vs ProductRecord")
+    parser.add_argument("--records", type=int, default=100_000, help="Records held in memory")
+    parser.add_argument("--reviews", type=int, default=25, help="Initial reviews per record")
+    parser.add_argument("--variants", type=int, default=8, help="Distinct synthetic pages to copy from")
+    args = parser.parse_args()
+
+    templates = template_records(args.variants, args.reviews)
+    dicts = held(args.records, templates, lambda r: r)
+    compact = held(args.records, templates, ProductRecord.from_dict)
+    assert ProductRecord.from_dict(templates[0]).to_dict() == templates[0]
+
+    print(f"{'form':>14} {'MiB held':>10} {'bytes/record':>13} {'peak MiB':>10}")
+    for name, m in (("dict", dicts), ("ProductRecord", compact)):
+        print(f"{name:>14} {m['bytes'] / 2**20:>10.1f} {m['bytes'] / args.records:>13.0f} {m['peak'] / 2**20:>10.1f}")
+    saved = dicts["bytes"] - compact["bytes"]
+    print(f"saved {saved / 2**20:.1f} MiB per {args.records} records ({100.0 * saved / dicts['bytes']:.0f}%)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
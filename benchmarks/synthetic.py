@@ -0,0 +1,85 @@
+import random
+from typing import List
+
+WORDS = (
+    "platform team code review workflow integration pipeline deploy secure cloud "
+    "analytics dashboard support pricing enterprise developer automation repository"
+).split()
+
+def _sentence(rng: random.Random, n: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+def _slug(rng: random.Random) -> str:
+    return "-".join(rng.choice(WORDS) for _ in range(2)) + f"-{rng.randint(1, 99999)}"
+
+def generate_page(seed: int = 0, reviews: int = 25, categories: int = 5, alternatives: int = 10,
+                  comparisons: int = 10, plans: int = 3, page_bytes: int = 0) -> str:
+    """
+    Deterministic G2-like product page. The same arguments always give the same HTML.
+    `page_bytes` pads the page (inline scripts and filler markup) up to roughly that size.
+    """
+    rng = random.Random(seed)
+    slug = _slug(rng)
+    name = slug.replace("-", " ").title()
+    base = f"https://www.g2.com/products/{slug}/reviews"
+    parts: List[str] = [
+        "<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">",
+        f"<title>{name} Reviews</title>",
+        f"<meta itemprop=\"ratingValue\" content=\"{rng.uniform(3, 5):.1f}\">",
+        "</head><body>",
+        f"<div class=\"product-header\"><img itemprop=\"image\" alt=\"{name} logo\""
+        f" src=\"https://images.g2crowd.com/uploads/product/{slug}.png\">",
+        f"<h1 data-testid=\"product-profile-header\">{name}</h1></div>",
+        f"<div data-testid=\"what-is\"><p>{_sentence(rng, 20)}</p></div>",
+        f"<div><span data-testid=\"average-rating\">{rng.uniform(3, 5):.1f}</span></div>",
+        f"<div data-testid=\"review-count\">{rng.randint(reviews, reviews * 100):,}</div>",
+        "<div class=\"rating-bars\">",
+    ]
+    for star in range(5, 0, -1):
+        parts.append(f"<div data-star=\"{star}\" data-count=\"{rng.randint(0, 5000)}\"></div>")
+    parts.append("</div><nav class=\"categories\">")
+    for _ in range(categories):
+        cat = _slug(rng)
+        parts.append(f"<a href=\"https://www.g2.com/categories/{cat}\">{cat.replace('-', ' ').title()}</a>")
+    parts.append("</nav><section id=\"pricing\">")
+    for i in range(plans):
+        features = "".join(f"<li>{_sentence(rng, 4)}</li>" for _ in range(rng.randint(2, 8)))
+        parts.append(
+            f"<div class=\"plan\"><h3>Plan {i + 1}</h3><p>{_sentence(rng, 8)}</p>"
+            f"<ul class=\"plan-features\">{features}</ul></div>"
+        )
+    parts.append("</section><div class=\"alternatives\">")
+    for _ in range(alternatives):
+        alt = _slug(rng)
+        parts.append(f"<a href=\"https://www.g2.com/products/{alt}/reviews\">{alt.replace('-', ' ').title()}</a>")
+    parts.append("</div><div class=\"comparisons\">")
+    for _ in range(comparisons):
+        alt = _slug(rng)
+        parts.append(f"<a href=\"https://www.g2.com/compare/{slug}-vs-{alt}\">{name} vs {alt}</a>")
+    parts.append("</div><div id=\"reviews\">")
+    for _ in range(reviews):
+        review_id = rng.randint(1000000, 9999999)
+        parts.append(
+            "<div data-testid=\"review\">"
+            f"<h3 data-testid=\"review-title\">{_sentence(rng, 6)}</h3>"
+            f"<div data-testid=\"star-rating\"><span data-rating=\"{rng.randint(1, 5)}\"></span></div>"
+            f"<time datetime=\"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}\"></time>"
+            f"<p>{_sentence(rng, 40)}</p>"
+            f"<a href=\"{base}/{slug}-review-{review_id}\">Read review</a></div>"
+        )
+    parts.append("</div><footer>")
+    parts.append(f"<a href=\"https://twitter.com/{slug}\">Twitter</a>")
+    parts.append(f"<a href=\"https://www.linkedin.com/company/{slug}\">LinkedIn</a>")
+    parts.append(f"<a href=\"https://{slug}.example/features\">Features</a>")
+    parts.append(f"<a href=\"https://{slug}.example\">Website</a></footer>")
+
+    size = sum(len(p) for p in parts)
+    while size < page_bytes:
+        filler = (
+            f"<script type=\"application/json\">{{\"state\": \"{_sentence(rng, 60)}\"}}</script>"
+            f"<div class=\"filler\"><span>{_sentence(rng, 30)}</span></div>"
+        )
+        parts.append(filler)
+        size += len(filler)
+    parts.append("</body></html>")
+    return "".join(parts)
@@ -0,0 +1,211 @@
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from lxml import etree
+
+# bs4 is imported on first use, so lxml-only runs (and startup) skip it.
+
+# Scoped selectors the extractors still run as selectors (everything else goes
+# through PageIndex lookups). Keys are shared by both backends; the CSS strings are
+# the reference semantics that the compiled XPath below must reproduce.
+CSS_SELECTORS: Dict[str, str] = {
+    "product_header_h1": ".product-header h1",
+    "about_p": "section#about div p",
+    "plan_name": ".plan-name, h3, h4",
+    "plan_description": ".plan-description, p",
+    "plan_features": ".plan-features li, ul li",
+    "review_title": "[data-testid='review-title'], .review-title",
+    "review_rating": "[data-testid='star-rating'] [data-rating], .star-rating [data-rating]",
+    "review_date": "time[datetime], .review-date",
+    "review_link": "a[href*='/reviews/']",
+}
+
+def _cls(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# Like soupsieve, ancestor conditions are not limited to the scope node.
+_XPATH_SELECTORS: Dict[str, str] = {
+    "product_header_h1": f"//h1[ancestor::*[{_cls('product-header')}]]",
+    "about_p": "//p[ancestor::div[ancestor::section[@id='about']]]",
+    "plan_name": f".//*[{_cls('plan-name')} or self::h3 or self::h4]",
+    "plan_description": f".//*[{_cls('plan-description')} or self::p]",
+    "plan_features": f".//li[ancestor::*[{_cls('plan-features')}] or ancestor::ul]",
+    "review_title": f".//*[@data-testid='review-title' or {_cls('review-title')}]",
+    "review_rating": f".//*[@data-rating][ancestor::*[@data-testid='star-rating' or {_cls('star-rating')}]]",
+    "review_date": f".//*[(self::time and @datetime) or {_cls('review-date')}]",
+    "review_link": ".//a[contains(@href, '/reviews/')]",
+}
+XPATH_SELECTORS: Dict[str, etree.XPath] = {k: etree.XPath(v) for k, v in _XPATH_SELECTORS.items()}
+
+# BeautifulSoup's get_text() skips strings inside these containers.
+_TEXT_XPATH = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template"
+    " or ancestor::rt or ancestor::rp)]"
+)
+
+def _decode_like_soup(data: bytes) -> str:
+    """
+    Decode raw page bytes with the first candidate charset BeautifulSoup's lxml
+    builder would accept (BOM, declared, detected, UTF-8, cp1252).
+    """
+    from bs4.dammit import EncodingDetector
+    detector = EncodingDetector(data, is_html=True)
+    for encoding in detector.encodings:
+        try:
+            etree.HTMLParser(encoding=encoding)  # libxml2 must know it too
+            return detector.markup.decode(encoding)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return data.decode("utf-8", "replace")
+
+class SoupBackend:
+    """
+    Reference backend: BeautifulSoup tree (lxml parser) queried with soupsieve.
+    """
+    name = "soup"
+
+    def parse(self, html: Union[str, bytes]) -> Any:
+        from bs4 import BeautifulSoup
+        return BeautifulSoup(html, "lxml")
+
+    def elements(self, root: Any) -> Iterable[Any]:
+        return root.find_all(True)
+
+    def tag(self, node: Any) -> str:
+        return node.name
+
+    def attrs(self, node: Any) -> Iterable[Tuple[str, Any]]:
+        return node.attrs.items()
+
+    def classes(self, value: Any) -> List[str]:
+        return value
+
+    def text(self, node: Any) -> str:
+        return node.get_text(strip=True)
+
+    def parent(self, node: Any) -> Optional[Any]:
+        return node.parent
+
+    def find(self, node: Any, name: str) -> Optional[Any]:
+        return node.find(name)
+
+    def find_class(self, node: Any, cls: str) -> Optional[Any]:
+        return node.find(class_=cls)
+
+    def select(self, node: Any, key: str) -> List[Any]:
+        return node.select(CSS_SELECTORS[key])
+
+    def select_one(self, node: Any, key: str) -> Optional[Any]:
+        return node.select_one(CSS_SELECTORS[key])
+
+class LxmlBackend:
+    """
+    lxml.html tree queried with XPath compiled at import time.
+    Produces the same records as SoupBackend on a much lighter tree.
+    """
+    name = "lxml"
+
+    def parse(self, html: Union[str, bytes]) -> Any:
+        if isinstance(html, bytes):
+            html = _decode_like_soup(html)
+        data = html.encode("utf-8")
+        root = etree.fromstring(data, etree.HTMLParser(encoding="utf-8")) if data.strip() else None
+        return root.getroottree() if root is not None else etree.ElementTree(etree.Element("html"))
+
+    def elements(self, root: Any) -> Iterable[Any]:
+        return (el for el in root.iter() if isinstance(el.tag, str))
+
+    def tag(self, node: Any) -> str:
+        return node.tag
+
+    def attrs(self, node: Any) -> Iterable[Tuple[str, Any]]:
+        return node.attrib.items()
+
+    def classes(self, value: Any) -> List[str]:
+        return value.split()
+
+    def text(self, node: Any) -> str:
+        return "".join(t.strip() for t in _TEXT_XPATH(node))
+
+    def parent(self, node: Any) -> Optional[Any]:
+        return node.getparent()
+
+    def find(self, node: Any, name: str) -> Optional[Any]:
+        return next(node.iterdescendants(name), None)
+
+    def find_class(self, node: Any, cls: str) -> Optional[Any]:
+        return next((d for d in node.iterdescendants()
+                     if isinstance(d.tag, str) and cls in (d.get("class") or "").split()), None)
+
+    def select(self, node: Any, key: str) -> List[Any]:
+        return XPATH_SELECTORS[key](node)
+
+    def select_one(self, node: Any, key: str) -> Optional[Any]:
+        found = XPATH_SELECTORS[key](node)
+        return found[0] if found else None
+
+# Attributes any extractor, PageIndex grouping or compiled XPath reads (plus data-*).
+_KEPT_ATTRS = frozenset(("class", "id", "href", "itemprop", "content", "datetime", "alt", "src"))
+# Raw-text elements: their text never reaches get_text()/_TEXT_XPATH, so only the
+# (empty) element is kept, for identical tag/class lookups and positions.
+_RAW_TEXT_TAGS = frozenset(("script", "style"))
+
+class _PrunedTreeBuilder:
+    """
+    lxml parser target that builds the same element tree as LxmlBackend.parse()
+    minus what no extractor reads: comments, processing instructions, script and
+    style bodies (inline JSON state is most of a large page) and unused attributes.
+    """
+    def __init__(self) -> None:
+        self.builder = etree.TreeBuilder()
+        self.raw_text = 0
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        kept = {k: v for k, v in attrib.items() if k in _KEPT_ATTRS or k.startswith("data-")}
+        self.builder.start(tag, kept)
+        if tag in _RAW_TEXT_TAGS:
+            self.raw_text += 1
+
+    def end(self, tag: str) -> None:
+        if tag in _RAW_TEXT_TAGS:
+            self.raw_text -= 1
+        self.builder.end(tag)
+
+    def data(self, data: str) -> None:
+        if not self.raw_text:
+            self.builder.data(data)
+
+    def close(self) -> Any:
+        return self.builder.close()
+
+class PartialBackend(LxmlBackend):
+    """
+    LxmlBackend on a pruned tree: libxml2 streams parse events into
+    _PrunedTreeBuilder, so the discarded parts of a page are never built and
+    huge pages cost a fraction of the memory for identical records.
+    The document is handed over in one piece: libxml2's push parser (feed())
+    can mis-tokenize a </script> split across two chunks.
+    """
+    name = "partial"
+
+    def parse(self, html: Union[str, bytes]) -> Any:
+        if isinstance(html, bytes):
+            html = _decode_like_soup(html)
+        data = html.encode("utf-8")
+        if not data.strip():
+            return etree.ElementTree(etree.Element("html"))
+        parser = etree.HTMLParser(encoding="utf-8", target=_PrunedTreeBuilder())
+        root = etree.fromstring(data, parser)
+        return root.getroottree() if root is not None else etree.ElementTree(etree.Element("html"))
+
+BACKENDS = {"soup": SoupBackend(), "lxml": LxmlBackend(), "partial": PartialBackend()}
+
+def get_backend(name: str = "soup") -> Any:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown extraction backend '{name}' (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]
+
+def backend_for(root: Any) -> Any:
+    # Without bs4 loaded, `root` cannot be a soup tree.
+    bs4 = sys.modules.get("bs4")
+    return BACKENDS["soup"] if bs4 is not None and isinstance(root, bs4.Tag) else BACKENDS["lxml"]
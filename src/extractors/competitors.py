@@ -1,19 +1,22 @@
-from typing import Dict, Any, List
-from bs4 import BeautifulSoup
+from typing import Dict, Any, List, Optional
 
-def parse_competitive(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+from extractors.page_index import PageIndex  # type: ignore
+
+def parse_competitive(soup: Any, url: str, index: Optional[PageIndex] = None) -> Dict[str, Any]:
     """
     Extract alternatives and comparison links.
     """
+    index = index or PageIndex(soup)
     alternatives: List[Dict[str, Any]] = []
     comparisons: List[Dict[str, Any]] = []
 
-    # Alternatives list guess
-    for row in soup.select("a[href*='/products/'][href*='/reviews']"):
-        name = row.get_text(strip=True)
-        href = row.get("href")
+    # Alternatives list guess: a[href*='/products/'][href*='/reviews']
+    seen_links = set()
+    for href, row in index.product_review_links:
+        name = index.text(row)
         if name and href and "g2.com/products/" in href:
-            if not any(a["competitor_link"] == href for a in alternatives):
+            if href not in seen_links:
+                seen_links.add(href)
                 alternatives.append({
                     "competitor_name": name,
                     "competitor_link": href,
@@ -22,13 +25,12 @@ def parse_competitive(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
                 })
 
     # Comparisons like /compare/x-vs-y
-    for a in soup.select("a[href*='/compare/']"):
-        href = a.get("href")
-        label = a.get_text(strip=True)
+    for href, a in index.compare_links:
+        label = index.text(a)
         if href:
             comparisons.append({
                 "link": href,
                 "competitor_name": label or None
             })
 
-    return {"alternatives": alternatives, "comparisons": comparisons}
\ No newline at end of file
+    return {"alternatives": alternatives, "comparisons": comparisons}
@@ -0,0 +1,166 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+from extractors.backends import backend_for               # type: ignore
+from extractors.selector_stats import SelectorChains       # type: ignore
+
+class PageIndex:
+    """
+    Lookups over a parsed page, built in a single traversal and shared by all extractors.
+
+    Elements are grouped by tag, data-testid, itemprop, id, class and data-* attribute
+    name, and anchors are grouped by the href patterns the extractors look for. Every
+    list keeps document order, so "first match" semantics equal soup.select_one().
+
+    `root` is a BeautifulSoup document or an lxml tree; node access goes through
+    the matching backend (see backends.py) so extractors work on either.
+    `chains` runs the extractors' selector fallback chains (fixed order unless
+    extract_record installs learned hints, see selector_stats.py).
+    """
+    def __init__(self, root: Any, backend: Optional[Any] = None):
+        self.root = root
+        self.backend = backend or backend_for(root)
+        self.pos: Dict[int, int] = {}
+        self.by_tag: Dict[str, List[Any]] = {}
+        self.by_testid: Dict[str, List[Any]] = {}
+        self.by_itemprop: Dict[str, List[Any]] = {}
+        self.by_id: Dict[str, List[Any]] = {}
+        self.by_class: Dict[str, List[Any]] = {}
+        self.by_data: Dict[str, List[Any]] = {}
+        # (href, node) for a[href], plus the href-pattern groups used by the extractors
+        self.anchors: List[Any] = []
+        self.category_links: List[Any] = []
+        self.product_review_links: List[Any] = []
+        self.compare_links: List[Any] = []
+        self.external_links: List[Any] = []
+        self._first_href: Dict[str, Optional[str]] = {}
+        self.chains = SelectorChains()
+
+        backend = self.backend
+        for i, node in enumerate(backend.elements(root)):
+            name = backend.tag(node)
+            self.pos[id(node)] = i
+            self.by_tag.setdefault(name, []).append(node)
+            for attr, value in backend.attrs(node):
+                if attr == "class":
+                    for cls in backend.classes(value):
+                        self.by_class.setdefault(cls, []).append(node)
+                elif attr == "id":
+                    self.by_id.setdefault(value, []).append(node)
+                elif attr == "itemprop":
+                    self.by_itemprop.setdefault(value, []).append(node)
+                elif attr.startswith("data-"):
+                    self.by_data.setdefault(attr, []).append(node)
+                    if attr == "data-testid":
+                        self.by_testid.setdefault(value, []).append(node)
+            if name == "a":
+                href = node.get("href")
+                if href is None:
+                    continue
+                self.anchors.append((href, node))
+                if "/categories/" in href:
+                    self.category_links.append((href, node))
+                if "/products/" in href and "/reviews" in href:
+                    self.product_review_links.append((href, node))
+                if "/compare/" in href:
+                    self.compare_links.append((href, node))
+                if href.startswith("http"):
+                    self.external_links.append((href, node))
+
+    def _of_tag(self, nodes: Iterable[Any], tag: Optional[str]) -> List[Any]:
+        return [n for n in nodes if tag is None or self.backend.tag(n) == tag]
+
+    def text(self, node: Optional[Any]) -> Optional[str]:
+        """
+        Stripped text of `node` (get_text(strip=True)), or None when empty/missing.
+        """
+        if node is None:
+            return None
+        return self.backend.text(node) or None
+
+    def tag(self, node: Any) -> str:
+        return self.backend.tag(node)
+
+    def select(self, node: Any, key: str) -> List[Any]:
+        return self.backend.select(node, key)
+
+    def select_one(self, node: Any, key: str) -> Optional[Any]:
+        return self.backend.select_one(node, key)
+
+    def find_class(self, node: Any, cls: str) -> Optional[Any]:
+        return self.backend.find_class(node, cls)
+
+    def testid(self, value: str, tag: Optional[str] = None) -> List[Any]:
+        return self._of_tag(self.by_testid.get(value, ()), tag)
+
+    def itemprop(self, value: str, tag: Optional[str] = None) -> List[Any]:
+        return self._of_tag(self.by_itemprop.get(value, ()), tag)
+
+    def with_id(self, value: str, tag: Optional[str] = None) -> List[Any]:
+        return self._of_tag(self.by_id.get(value, ()), tag)
+
+    def with_class(self, value: str, tag: Optional[str] = None) -> List[Any]:
+        return self._of_tag(self.by_class.get(value, ()), tag)
+
+    def tags(self, name: str) -> List[Any]:
+        return self.by_tag.get(name, [])
+
+    def data(self, attr: str, value: Optional[str] = None) -> List[Any]:
+        nodes = self.by_data.get(attr, [])
+        return nodes if value is None else [n for n in nodes if n.get(attr) == value]
+
+    @staticmethod
+    def first(nodes: List[Any]) -> Optional[Any]:
+        return nodes[0] if nodes else None
+
+    def first_of(self, *groups: List[Any]) -> Optional[Any]:
+        """
+        Earliest node (document order) across several groups, like a comma selector.
+        """
+        heads = [g[0] for g in groups if g]
+        return min(heads, key=lambda n: self.pos[id(n)]) if heads else None
+
+    def union(self, *groups: List[Any]) -> List[Any]:
+        """
+        All nodes across groups, deduplicated and in document order.
+        """
+        seen: Dict[int, Any] = {}
+        for group in groups:
+            for n in group:
+                seen[id(n)] = n
+        return sorted(seen.values(), key=lambda n: self.pos[id(n)])
+
+    def first_descendant(self, nodes: List[Any], name: str) -> Optional[Any]:
+        """
+        First `name` element below any of `nodes` in document order ("X name" selector).
+        """
+        for n in nodes:
+            found = self.backend.find(n, name)
+            if found is not None:
+                return found
+        return None
+
+    def within(self, nodes: List[Any], containers: List[Any]) -> List[Any]:
+        """
+        Nodes that have one of `containers` as an ancestor ("container node" selector).
+        """
+        ids = {id(c) for c in containers}
+        if not ids:
+            return []
+        out = []
+        parent_of = self.backend.parent
+        for n in nodes:
+            parent = parent_of(n)
+            while parent is not None:
+                if id(parent) in ids:
+                    out.append(n)
+                    break
+                parent = parent_of(parent)
+        return out
+
+    def first_href(self, keyword: str) -> Optional[str]:
+        """
+        First a[href] containing `keyword`, memoized per keyword.
+        """
+        if keyword not in self._first_href:
+            self._first_href[keyword] = next((h for h, _ in self.anchors if keyword in h), None)
+        return self._first_href[keyword]
@@ -0,0 +1,80 @@
+import time
+from typing import Dict, Any, Optional, Tuple, Union
+
+from extractors.backends import get_backend                  # type: ignore
+from extractors.page_index import PageIndex                  # type: ignore
+from extractors.product_profile import parse_product_profile  # type: ignore
+from extractors.reviews_parser import parse_reviews           # type: ignore
+from extractors.competitors import parse_competitive          # type: ignore
+from extractors.pricing_parser import parse_pricing           # type: ignore
+from extractors.selector_stats import SelectorStats, Trace, fingerprint  # type: ignore
+
+EXTRACTORS = (
+    ("parse_product_profile", parse_product_profile),
+    ("parse_reviews", parse_reviews),
+    ("parse_competitive", parse_competitive),
+    ("parse_pricing", parse_pricing),
+)
+
+def _extract(html: Union[str, bytes], url: str, backend: str, timings: Optional[Dict[str, float]],
+             selectors: Optional[SelectorStats]) -> Tuple[Dict[str, Any], Optional[Trace]]:
+    clock = time.perf_counter if timings is not None else None
+    engine = get_backend(backend)
+    start = clock() if clock else 0.0
+    soup = engine.parse(html)
+    index = PageIndex(soup, engine)
+    if selectors is not None:
+        index.chains = selectors.chains(fingerprint(index))
+    if clock:
+        timings["parse"] = clock() - start
+
+    parts: Dict[str, Dict[str, Any]] = {}
+    for name, extractor in EXTRACTORS:
+        start = clock() if clock else 0.0
+        parts[name] = extractor(soup, url=url, index=index)
+        if clock:
+            timings[name] = clock() - start
+
+    # Merge into the (fresh) profile dict rather than copying all three.
+    record = parts["parse_product_profile"]
+    record.update(parts["parse_competitive"])
+    record.update(parts["parse_pricing"])
+    record["initial_reviews"] = parts["parse_reviews"].get("initial_reviews", [])
+    return record, index.chains.trace() if selectors is not None else None
+
+def extract_record(html: Union[str, bytes], url: str, backend: str = "soup",
+                   timings: Optional[Dict[str, float]] = None,
+                   selectors: Optional[SelectorStats] = None) -> Dict[str, Any]:
+    """
+    Parse the page with the chosen backend ("soup" or "lxml") and run every
+    extractor over it, returning the merged raw record.
+    Only plain dicts leave this function so it can run inside a worker process.
+    When `timings` is given, the seconds spent in each step are stored in it.
+    With `selectors`, selector chains try the candidate learned for the page's
+    layout first and the outcome is recorded there; the record is the same.
+    """
+    record, trace = _extract(html, url, backend, timings, selectors)
+    if trace is not None:
+        selectors.observe(trace)
+    return record
+
+def extract_record_timed(html: Union[str, bytes], url: str, backend: str = "soup",
+                         timed: bool = True) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    extract_record() plus its per-step timings, for use in a worker process.
+    With `timed` False nothing is clocked and the timings stay empty.
+    """
+    timings: Dict[str, float] = {}
+    return extract_record(html, url, backend=backend, timings=timings if timed else None), timings
+
+def extract_record_traced(html: Union[str, bytes], url: str, backend: str = "soup",
+                          selectors: Optional[SelectorStats] = None, timed: bool = True
+                          ) -> Tuple[Dict[str, Any], Dict[str, float], Optional[Trace]]:
+    """
+    extract_record_timed() ordered by `selectors`' hints, returning the selector
+    trace for the caller to observe() instead of recording it: a worker process
+    only holds a copy of the hints.
+    """
+    timings: Dict[str, float] = {}
+    record, trace = _extract(html, url, backend, timings if timed else None, selectors)
+    return record, timings, trace
@@ -1,24 +1,33 @@
-from typing import Dict, Any, List
-from bs4 import BeautifulSoup
+from typing import Dict, Any, List, Optional
 
-def parse_pricing(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+from extractors.page_index import PageIndex  # type: ignore
+
+def parse_pricing(soup: Any, url: str, index: Optional[PageIndex] = None) -> Dict[str, Any]:
     """
     Extract pricing plan cards: plan name, description, and feature bullets.
     """
+    index = index or PageIndex(soup)
     plans: List[Dict[str, Any]] = []
-    sections = soup.select("[data-testid='pricing'] .plan, .pricing .plan, section#pricing .plan")
-    if not sections:
+    sections = index.chains.first("pricing_sections", (
+        # [data-testid='pricing'] .plan, .pricing .plan, section#pricing .plan
+        (lambda: "plan" in index.by_class,
+         lambda: index.within(index.with_class("plan"), index.union(
+             index.testid("pricing"), index.with_class("pricing"), index.with_id("pricing", "section"))) or None),
         # Fallback: cards with title/bullets
-        sections = soup.select("section#pricing, [data-section='pricing'], .pricing")
+        # section#pricing, [data-section='pricing'], .pricing
+        (lambda: "pricing" in index.by_id or "data-section" in index.by_data or "pricing" in index.by_class,
+         lambda: index.union(index.with_id("pricing", "section"), index.data("data-section", "pricing"),
+                             index.with_class("pricing")) or None),
+    )) or []
 
     for sec in sections:
-        name_node = sec.select_one(".plan-name, h3, h4")
-        desc_node = sec.select_one(".plan-description, p")
-        feature_nodes = sec.select(".plan-features li, ul li")
+        name_node = index.select_one(sec, "plan_name")            # .plan-name, h3, h4
+        desc_node = index.select_one(sec, "plan_description")     # .plan-description, p
+        feature_nodes = index.select(sec, "plan_features")        # .plan-features li, ul li
         plan = {
-            "plan_name": name_node.get_text(strip=True) if name_node else None,
-            "plan_description": desc_node.get_text(strip=True) if desc_node else None,
-            "plan_features": [li.get_text(strip=True) for li in feature_nodes][:25] if feature_nodes else [],
+            "plan_name": index.backend.text(name_node) if name_node is not None else None,
+            "plan_description": index.backend.text(desc_node) if desc_node is not None else None,
+            "plan_features": [index.backend.text(li) for li in feature_nodes][:25] if feature_nodes else [],
         }
         if any(v for v in plan.values()):
             plans.append(plan)
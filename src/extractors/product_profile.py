@@ -1,94 +1,97 @@
 from typing import Dict, Any, Optional
-from bs4 import BeautifulSoup
 
-def _text_or_none(node) -> Optional[str]:
-    if not node:
-        return None
-    text = node.get_text(strip=True)
-    return text or None
+from extractors.page_index import PageIndex  # type: ignore
 
-def parse_product_profile(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+def _src(node: Optional[Any]) -> Optional[str]:
+    return (node.get("src") or None) if node is not None else None
+
+def parse_product_profile(soup: Any, url: str, index: Optional[PageIndex] = None) -> Dict[str, Any]:
     """
     Extract core product profile fields from a G2-like product page.
     This parser is resilient: it uses multiple CSS strategies to find data.
+    Lookups go through the shared PageIndex; each fallback chain keeps the
+    order of the CSS selectors noted next to it and runs via index.chains.
     """
+    index = index or PageIndex(soup)
+    chains = index.chains
+
     # Product name
-    name = None
-    for selector in [
-        "h1[data-testid='product-profile-header']",
-        "h1[itemprop='name']",
-        "h1",
-        ".product-header h1",
-    ]:
-        node = soup.select_one(selector)
-        name = _text_or_none(node)
-        if name:
-            break
+    name = chains.first("product_name", (
+        (lambda: "product-profile-header" in index.by_testid,
+         lambda: index.text(index.first(index.testid("product-profile-header", "h1")))),  # h1[data-testid='product-profile-header']
+        (lambda: "name" in index.by_itemprop,
+         lambda: index.text(index.first(index.itemprop("name", "h1")))),                  # h1[itemprop='name']
+        (lambda: "h1" in index.by_tag,
+         lambda: index.text(index.first(index.tags("h1")))),                              # h1
+        (lambda: "product-header" in index.by_class,
+         lambda: index.text(index.select_one(soup, "product_header_h1"))
+         if index.with_class("product-header") else None),
+    ))
 
     # Description / what-is
-    what_is = None
-    for selector in [
-        "[data-testid='what-is'] p",
-        "section#about div p",
-        "div[itemprop='description'] p",
-        "div[itemprop='description']",
-    ]:
-        node = soup.select_one(selector)
-        what_is = _text_or_none(node)
-        if what_is:
-            break
+    what_is = chains.first("what_is", (
+        (lambda: "what-is" in index.by_testid,
+         lambda: index.text(index.first_descendant(index.testid("what-is"), "p"))),               # [data-testid='what-is'] p
+        (lambda: "about" in index.by_id,
+         lambda: index.text(index.select_one(soup, "about_p")) if index.with_id("about", "section") else None),
+        (lambda: "description" in index.by_itemprop,
+         lambda: index.text(index.first_descendant(index.itemprop("description", "div"), "p"))),  # div[itemprop='description'] p
+        (lambda: "description" in index.by_itemprop,
+         lambda: index.text(index.first(index.itemprop("description", "div")))),                  # div[itemprop='description']
+    ))
 
     # Rating and total reviews
     rating = None
     total_reviews = None
-    rating_node = soup.select_one("[data-testid='average-rating'], meta[itemprop='ratingValue']")
-    if rating_node:
-        rating = rating_node.get("content") if rating_node.name == "meta" else _text_or_none(rating_node)
+    # [data-testid='average-rating'], meta[itemprop='ratingValue']
+    rating_node = index.first_of(index.testid("average-rating"), index.itemprop("ratingValue", "meta"))
+    if rating_node is not None:
+        rating = rating_node.get("content") if index.tag(rating_node) == "meta" else index.text(rating_node)
         try:
             rating = float(str(rating).strip())
         except Exception:
             rating = None
 
     # total reviews
-    for s in [
-        "[data-testid='review-count']",
-        "meta[itemprop='reviewCount']",
-        "a[href*='#reviews'] .count",
-    ]:
-        node = soup.select_one(s)
-        if node:
-            val = node.get("content") if node.name == "meta" else _text_or_none(node)
-            try:
-                total_reviews = int(str(val).replace(",", "").strip())
-            except Exception:
-                total_reviews = None
-            break
+    found = chains.first("review_count", (
+        (lambda: "review-count" in index.by_testid,
+         lambda: index.first(index.testid("review-count"))),              # [data-testid='review-count']
+        (lambda: "reviewCount" in index.by_itemprop,
+         lambda: index.first(index.itemprop("reviewCount", "meta"))),     # meta[itemprop='reviewCount']
+        (lambda: "count" in index.by_class,
+         lambda: next((c for c in (index.find_class(a, "count") for h, a in index.anchors if "#reviews" in h)
+                       if c is not None), None)),                         # a[href*='#reviews'] .count
+    ))
+    if found is not None:
+        val = found.get("content") if index.tag(found) == "meta" else index.text(found)
+        try:
+            total_reviews = int(str(val).replace(",", "").strip())
+        except Exception:
+            total_reviews = None
 
     # Logo
-    logo = None
-    for s in [
-        "img[itemprop='image']",
-        "img[alt*='logo' i]",
-        "img[src*='g2crowd']",
-        "img",
-    ]:
-        node = soup.select_one(s)
-        if node and node.get("src"):
-            logo = node.get("src")
-            break
+    imgs = index.tags("img")
+    logo = chains.first("logo", (
+        (lambda: "image" in index.by_itemprop,
+         lambda: _src(index.first(index.itemprop("image", "img")))),                             # img[itemprop='image']
+        (None, lambda: _src(next((i for i in imgs if "logo" in (i.get("alt") or "").lower()), None))),  # img[alt*='logo' i]
+        (None, lambda: _src(next((i for i in imgs if "g2crowd" in (i.get("src") or "")), None))),       # img[src*='g2crowd']
+        (None, lambda: _src(index.first(imgs))),                                                 # img
+    ))
 
     # Categories
     categories = []
-    for a in soup.select("a[href*='/categories/']"):
-        label = _text_or_none(a)
-        href = a.get("href")
-        if label and href and label.lower() not in {c["category_name"].lower() for c in categories}:
+    seen_categories = set()
+    for href, a in index.category_links:
+        label = index.text(a)
+        if label and href and label.lower() not in seen_categories:
+            seen_categories.add(label.lower())
             categories.append({"category_name": label, "category_link": href})
 
     # Star distribution (try reading from script/meta or UI bars)
     star_distribution = {}
     # Bars like: data-star="5" data-count="123"
-    for bar in soup.select("[data-star][data-count]"):
+    for bar in index.data("data-star"):
         star = bar.get("data-star")
         cnt = bar.get("data-count")
         if star and cnt:
@@ -105,19 +108,11 @@ def parse_product_profile(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
             star_distribution[str(i)] = star_distribution.get(str(i), 0)
 
     # Social links and sites
-    def find_link_like(keyword: str) -> Optional[str]:
-        for a in soup.select("a[href]"):
-            href = a.get("href", "")
-            if keyword in href:
-                return href
-        return None
-
-    twitter = find_link_like("twitter.com")
-    linkedin = find_link_like("linkedin.com/company")
-    product_site = find_link_like("features") or find_link_like("product")
+    twitter = index.first_href("twitter.com")
+    linkedin = index.first_href("linkedin.com/company")
+    product_site = index.first_href("features") or index.first_href("product")
     company_site = None
-    for a in soup.select("a[href^='http']"):
-        href = a.get("href", "")
+    for href, _ in index.external_links:
         if "g2.com" not in href and "twitter.com" not in href and "linkedin.com" not in href:
             company_site = href
             break
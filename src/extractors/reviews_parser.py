@@ -1,28 +1,65 @@
-from typing import Dict, Any, List
-from bs4 import BeautifulSoup
+from typing import Dict, Any, List, Optional
+from urllib.parse import parse_qs, parse_qsl, urlencode, urljoin, urlparse, urlunparse
 
-def parse_reviews(soup: BeautifulSoup, url: str) -> Dict[str, Any]:
+from extractors.page_index import PageIndex  # type: ignore
+
+def parse_review_list(soup: Any, url: str, index: Optional[PageIndex] = None,
+                      limit: Optional[int] = None) -> List[Dict[str, Any]]:
     """
-    Extract a small sample of reviews from a G2-like page.
-    We look for common structures and fall back gracefully.
+    Extract every review block on the page (or the first `limit`).
     """
+    index = index or PageIndex(soup)
     reviews: List[Dict[str, Any]] = []
 
-    # Common structure guess:
-    review_blocks = soup.select("[data-testid='review']") or soup.select(".review") or []
-    for i, block in enumerate(review_blocks[:25], start=1):
-        title = block.select_one("[data-testid='review-title'], .review-title")
-        rating = block.select_one("[data-testid='star-rating'] [data-rating], .star-rating [data-rating]")
-        date = block.select_one("time[datetime], .review-date")
-        link = block.select_one("a[href*='/reviews/']")
+    # Common structure guess: [data-testid='review'], then .review
+    review_blocks = index.testid("review") or index.with_class("review") or []
+    for i, block in enumerate(review_blocks[:limit], start=1):
+        title = index.select_one(block, "review_title")    # [data-testid='review-title'], .review-title
+        rating = index.select_one(block, "review_rating")  # [data-testid='star-rating'] [data-rating], ...
+        date = index.select_one(block, "review_date")      # time[datetime], .review-date
+        link = index.select_one(block, "review_link")      # a[href*='/reviews/']
         item = {
             "review_id": None,
-            "review_title": (title.get_text(strip=True) if title else None) or f"Review #{i}",
-            "review_rating": float(rating.get("data-rating")) if rating and rating.get("data-rating") else None,
-            "publish_date": date.get("datetime") if date and date.get("datetime") else None,
-            "review_link": link.get("href") if link else url,
+            "review_title": index.text(title) or f"Review #{i}",
+            "review_rating": float(rating.get("data-rating")) if rating is not None and rating.get("data-rating") else None,
+            "publish_date": date.get("datetime") if date is not None and date.get("datetime") else None,
+            "review_link": link.get("href") if link is not None else url,
         }
         reviews.append(item)
+    return reviews
 
+def parse_reviews(soup: Any, url: str, index: Optional[PageIndex] = None) -> Dict[str, Any]:
+    """
+    Extract a small sample of reviews from a G2-like page.
+    We look for common structures and fall back gracefully.
+    """
     # If none found, return empty; schema allows empty sample
-    return {"initial_reviews": reviews}
\ No newline at end of file
+    return {"initial_reviews": parse_review_list(soup, url, index=index, limit=25)}
+
+def review_page_count(soup: Any, url: str, index: Optional[PageIndex] = None) -> int:
+    """
+    Number of review pages, from the highest ?page=N link back to this reviews path.
+    """
+    index = index or PageIndex(soup)
+    path = urlparse(urljoin(url, "")).path.rstrip("/")
+    pages = 1
+    for href, _ in index.anchors:
+        if "page=" not in href:
+            continue
+        target = urlparse(urljoin(url, href))
+        if target.path.rstrip("/") != path:
+            continue
+        for value in parse_qs(target.query).get("page", []):
+            if value.isdigit():
+                pages = max(pages, int(value))
+    return pages
+
+def review_page_url(url: str, page: int) -> str:
+    """
+    `url` with its ?page= query parameter set to `page` (fragment dropped).
+    """
+    parts = urlparse(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "page"]
+    if page > 1:
+        query.append(("page", str(page)))
+    return urlunparse(parts._replace(query=urlencode(query), fragment=""))
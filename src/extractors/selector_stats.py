@@ -0,0 +1,251 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+# (probe, lookup): lookup() returns the chain's value or None on a miss; probe()
+# is a cheap index check that is False only when lookup() cannot match (None:
+# no cheap check, always look up).
+Candidate = Tuple[Optional[Callable[[], bool]], Callable[[], Any]]
+# (fingerprint, {chain: winning position or None}, lookups run) for one page
+Trace = Tuple[str, Dict[str, Optional[int]], int]
+Pattern = Tuple[str, Tuple[Tuple[str, Optional[int]], ...]]
+
+MISS = "none"
+FOLD_EVERY = 64
+
+def fingerprint(index: Any) -> str:
+    """
+    Cheap layout signature of a page from its PageIndex: the data-testid and
+    itemprop names and the digit-free ids it uses (per-item ids such as
+    review-123 would split one template into many).
+    """
+    markers = sorted(index.by_testid)
+    markers += ["@" + k for k in sorted(index.by_itemprop)]
+    markers += ["#" + k for k in sorted(index.by_id) if not any(c.isdigit() for c in k)]
+    return format(zlib.crc32("\n".join(markers).encode("utf-8")), "08x")
+
+class SelectorChains:
+    """
+    Runs the selector fallback chains of one page.
+
+    Without hints each chain is tried in its fixed order and the first lookup
+    that does not return None wins. With a learned position k for a chain, the
+    lookup at k runs first; the candidates before it are then only probed, and
+    looked up when the probe allows a match, so the winner is always the one the
+    fixed order would pick. `winners` records the winning position per chain.
+    """
+
+    def __init__(self, fingerprint: Optional[str] = None, hints: Optional[Dict[str, int]] = None):
+        self.fingerprint = fingerprint
+        self.hints = hints or {}
+        self.winners: Dict[str, Optional[int]] = {}
+        self.lookups = 0
+
+    def _lookup(self, candidate: Candidate) -> Any:
+        self.lookups += 1
+        return candidate[1]()
+
+    def first(self, chain: str, candidates: Sequence[Candidate]) -> Any:
+        hinted = self.hints.get(chain, 0)
+        if 0 < hinted < len(candidates):
+            value = self._lookup(candidates[hinted])
+            if value is not None:
+                for i, (probe, _) in enumerate(candidates[:hinted]):
+                    if probe is None or probe():
+                        earlier = self._lookup(candidates[i])
+                        if earlier is not None:
+                            self.winners[chain] = i
+                            return earlier
+                self.winners[chain] = hinted
+                return value
+        for i, candidate in enumerate(candidates):
+            if i == hinted and hinted > 0:
+                continue  # already missed above
+            value = self._lookup(candidate)
+            if value is not None:
+                self.winners[chain] = i
+                return value
+        self.winners[chain] = None
+        return None
+
+    def trace(self) -> Trace:
+        return self.fingerprint or "", dict(self.winners), self.lookups
+
+def _leader(counts: Dict[str, int]) -> Optional[int]:
+    """
+    Most frequent winning position (ties go to the earlier one), None if nothing matched.
+    """
+    best = max(((n, -int(pos)) for pos, n in counts.items() if pos != MISS and n > 0), default=None)
+    return -best[1] if best is not None else None
+
+class SelectorStats:
+    """
+    Which candidate of each selector chain won, per page layout (fingerprint),
+    kept as JSON at `path` between runs.
+
+    hints(fingerprint) gives the most frequent winner per chain, which
+    SelectorChains tries first. drift() compares this run with what was learned
+    before it: layouts never seen before, and chains whose usual winner changed
+    or that stopped matching at all, a sign the site's markup moved.
+
+    Only the hints travel to worker processes (see __getstate__); outcomes are
+    recorded with observe() in the process that owns the stats.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.lock = threading.Lock()
+        # fingerprint -> {"pages", "first_seen", "last_seen", "chains": {chain: {position|"none": count}}}
+        self.layouts: Dict[str, Dict[str, Any]] = {}
+        self.baseline: Dict[str, Dict[str, Optional[int]]] = {}
+        # this run only: fingerprint -> {"pages", "chains": {chain: {position|"none": count}}}
+        self.run: Dict[str, Dict[str, Any]] = {}
+        self.pages = 0
+        self.lookups = 0
+        self._hints: Dict[str, Dict[str, int]] = {}
+        self._pending: Dict[Pattern, int] = {}
+        self._patterns: Set[Pattern] = set()
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"_hints": self._hints}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__()  # type: ignore[misc]
+        self._hints = state["_hints"]
+
+    def load(self, path: str) -> None:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        with self.lock:
+            self.layouts = data.get("layouts", {})
+            for fp, layout in self.layouts.items():
+                self.baseline[fp] = {chain: _leader(c) for chain, c in layout["chains"].items()}
+                self._refresh(fp)
+
+    def _refresh(self, fp: str) -> None:
+        # Caller holds self.lock. Position 0 needs no hint.
+        leaders = {chain: _leader(c) for chain, c in self.layouts[fp]["chains"].items()}
+        self._hints[fp] = {chain: pos for chain, pos in leaders.items() if pos}
+
+    def hints(self, fp: str) -> Dict[str, int]:
+        return self._hints.get(fp, {})
+
+    def chains(self, fp: str) -> SelectorChains:
+        return SelectorChains(fp, self.hints(fp))
+
+    def observe(self, trace: Trace) -> None:
+        """
+        Record one page. Most pages of a layout repeat the same winners, so
+        outcomes are counted per (layout, winners) pattern and folded into the
+        stats when a new pattern shows up or every FOLD_EVERY pages.
+        """
+        fp, winners, lookups = trace
+        pattern = (fp, tuple(winners.items()))
+        with self.lock:
+            self._pending[pattern] = self._pending.get(pattern, 0) + 1
+            self.pages += 1
+            self.lookups += lookups
+            if pattern not in self._patterns:
+                self._patterns.add(pattern)
+                self._fold()
+            elif self.pages % FOLD_EVERY == 0:
+                self._fold()
+
+    def _fold(self) -> None:
+        # Caller holds self.lock.
+        now = time.time()
+        for (fp, winners), pages in self._pending.items():
+            layout = self.layouts.get(fp)
+            if layout is None:
+                layout = self.layouts[fp] = {"pages": 0, "first_seen": now, "last_seen": now, "chains": {}}
+            layout["pages"] += pages
+            layout["last_seen"] = now
+            run = self.run.setdefault(fp, {"pages": 0, "chains": {}})
+            run["pages"] += pages
+            for chain, pos in winners:
+                key = MISS if pos is None else str(pos)
+                for counts in (layout["chains"].setdefault(chain, {}), run["chains"].setdefault(chain, {})):
+                    counts[key] = counts.get(key, 0) + pages
+        for fp in {fp for fp, _ in self._pending}:
+            self._refresh(fp)
+        self._pending.clear()
+
+    def drift(self) -> List[Dict[str, Any]]:
+        """
+        [{"layout", "pages", "new": True}] for layouts first seen this run and
+        [{"layout", "chain", "learned", "now", "pages"}] for chains whose usual
+        winner this run differs from the one learned before ("now" None: no
+        candidate matched).
+        """
+        out: List[Dict[str, Any]] = []
+        with self.lock:
+            self._fold()
+            for fp, run in sorted(self.run.items()):
+                learned = self.baseline.get(fp)
+                if learned is None:
+                    out.append({"layout": fp, "pages": run["pages"], "new": True})
+                    continue
+                for chain, counts in sorted(run["chains"].items()):
+                    now = _leader(counts)
+                    if chain in learned and now != learned[chain]:
+                        out.append({"layout": fp, "chain": chain, "learned": learned[chain], "now": now,
+                                    "pages": sum(counts.values())})
+        return out
+
+    def report(self) -> Dict[str, Any]:
+        with self.lock:
+            self._fold()
+            layouts = {fp: {"pages": run["pages"],
+                            "winners": {chain: _leader(c) for chain, c in sorted(run["chains"].items())}}
+                       for fp, run in sorted(self.run.items())}
+            pages, lookups = self.pages, self.lookups
+        return {
+            "pages": pages,
+            "lookups_per_page": lookups / pages if pages else 0.0,
+            "layouts": layouts,
+            "drift": self.drift(),
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """
+        Write the learned stats plus this run's report (atomically, via rename).
+        """
+        path = path or self.path
+        if not path:
+            return
+        report = self.report()
+        with self.lock:
+            self._fold()
+            data = {"layouts": self.layouts, "last_run": report}
+            head, name = os.path.split(os.path.abspath(path))
+            os.makedirs(head, exist_ok=True)
+            # A unique temp name per writer, so runs saving the same file never
+            # write into each other's temp file.
+            fd, tmp = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=head)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(data, f, indent=2, sort_keys=True)
+                os.replace(tmp, path)
+            except BaseException:
+                os.remove(tmp)
+                raise
+
+    def log_report(self, logger: logging.Logger) -> None:
+        report = self.report()
+        logger.info("Selectors: %d pages over %d layouts, %.1f lookups/page",
+                    report["pages"], len(report["layouts"]), report["lookups_per_page"])
+        for entry in report["drift"]:
+            if entry.get("new"):
+                logger.info("  new layout %s (%d pages)", entry["layout"], entry["pages"])
+            else:
+                logger.warning("  layout drift %s: %s now won by %s (learned %s) on %d pages",
+                               entry["layout"], entry["chain"],
+                               "nothing" if entry["now"] is None else f"candidate {entry['now']}",
+                               entry["learned"], entry["pages"])
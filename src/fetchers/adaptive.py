@@ -0,0 +1,227 @@
+import random
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+from urllib.parse import urlparse
+
+T = TypeVar("T")
+
+# Responses worth retrying; 429 and 503 also mean "slow down".
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLE_STATUSES = frozenset({429, 503})
+
+def retry_after_seconds(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Retry-After header (delta-seconds or an HTTP date) -> seconds to wait, None if absent or invalid.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+    return max(when - (time.time() if now is None else now), 0.0)
+
+def classify(error: BaseException) -> Optional[Dict[str, Any]]:
+    """
+    None when `error` is not worth retrying, else {"throttled": bool, "retry_after": seconds or None}.
+    """
+    # Only requests raises what is worth retrying; if it was never imported
+    # (local files, fixture sites) there is nothing to classify.
+    requests = sys.modules.get("requests")
+    if requests is None:
+        return None
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        if status not in RETRY_STATUSES:
+            return None
+        return {"throttled": status in THROTTLE_STATUSES,
+                "retry_after": retry_after_seconds(error.response.headers.get("Retry-After"))}
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return {"throttled": True, "retry_after": None}
+    return None
+
+class _HostState:
+    def __init__(self, rate: Optional[float], limit: int):
+        self.rate = rate
+        self.limit = limit
+        self.in_flight = 0
+        self.next_at = 0.0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.successes = 0
+
+class FetchController:
+    """
+    Retries failed fetches with jittered exponential backoff and adapts each
+    host's request rate and concurrency AIMD-style.
+
+    A throttling signal (429/503, connection error or timeout, or a response
+    slower than `latency_target`) multiplies the host's rate and concurrency by
+    `decrease`, at most once per request interval; every fast success adds
+    `increase` requests/second, and every `limit` fast successes in a row allow
+    one more request in flight. Rates stay within [min_rate, max_rate] and
+    concurrency within [1, per_host]. A Retry-After header pauses the whole host
+    for that long (capped at `max_backoff`). With `adaptive=False` rate and
+    concurrency stay fixed and only the retries apply.
+
+    The current total rate and concurrency are published as the "fetch_rate" and
+    "fetch_concurrency" gauges of `metrics`, retries and throttles as counters.
+    Sources without a network host (local files) are neither paced nor retried.
+    """
+
+    def __init__(self, rate: Optional[float] = None, per_host: int = 2, retries: int = 3,
+                 backoff: float = 1.0, max_backoff: float = 60.0, adaptive: bool = True,
+                 min_rate: float = 0.05, max_rate: Optional[float] = None, increase: Optional[float] = None,
+                 decrease: float = 0.5, latency_target: float = 10.0, metrics: Optional[Any] = None):
+        self.rate = rate if rate and rate > 0 else None
+        self.per_host = max(int(per_host), 1)
+        self.retries = max(int(retries), 0)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.adaptive = adaptive
+        self.min_rate = min(min_rate, self.rate) if self.rate else min_rate
+        self.max_rate = max_rate or (self.rate * 4 if self.rate else None)
+        self.increase = increase or (self.rate * 0.1 if self.rate else 0.0)
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self.metrics = metrics
+        self.cond = threading.Condition()
+        self.hosts: Dict[str, _HostState] = {}
+        self._publish()
+
+    def _state(self, host: str) -> _HostState:
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = _HostState(self.rate, self.per_host)
+        return state
+
+    def _publish(self) -> None:
+        # Caller holds self.cond (or is __init__).
+        if self.metrics is None:
+            return
+        states = list(self.hosts.values())
+        if self.rate is not None:
+            self.metrics.gauge("fetch_rate", sum(s.rate for s in states) if states else self.rate)
+        self.metrics.gauge("fetch_concurrency", sum(s.limit for s in states) if states else self.per_host)
+
+    def current_rate(self, source: str) -> Optional[float]:
+        with self.cond:
+            state = self.hosts.get(urlparse(source).netloc.lower())
+            return state.rate if state is not None else self.rate
+
+    def current_limit(self, source: str) -> int:
+        with self.cond:
+            state = self.hosts.get(urlparse(source).netloc.lower())
+            return state.limit if state is not None else self.per_host
+
+    def paces(self, source: str) -> bool:
+        """
+        Whether fetches of `source` are paced here (it has a network host and a rate is set).
+        """
+        return self.rate is not None and bool(urlparse(source).netloc)
+
+    @contextmanager
+    def slot(self, host: str) -> Iterator[None]:
+        """
+        Wait for a free request slot on `host` and for its next paced start time.
+        """
+        with self.cond:
+            state = self._state(host)
+            while True:
+                now = time.monotonic()
+                if state.in_flight < state.limit:
+                    start = max(now, state.next_at, state.paused_until)
+                    if start <= now:
+                        break
+                    self.cond.wait(start - now)
+                else:
+                    self.cond.wait()
+            state.in_flight += 1
+            if state.rate is not None:
+                state.next_at = now + 1.0 / state.rate
+        try:
+            yield
+        finally:
+            with self.cond:
+                state.in_flight -= 1
+                self.cond.notify_all()
+
+    def _success(self, state: _HostState, latency: float) -> None:
+        if latency > self.latency_target:
+            self._slow_down(state, latency)
+            return
+        if state.rate is not None:
+            state.rate = min(state.rate + self.increase, self.max_rate)
+        state.successes += 1
+        if state.successes >= state.limit and state.limit < self.per_host:
+            state.limit += 1
+            state.successes = 0
+            self.cond.notify_all()
+
+    def _slow_down(self, state: _HostState, latency: float) -> None:
+        now = time.monotonic()
+        interval = max(latency, 1.0 / state.rate if state.rate else 0.0)
+        state.successes = 0
+        if now - state.last_decrease < interval:
+            # Requests already in flight report the same congestion; count it once.
+            return
+        state.last_decrease = now
+        if state.rate is not None:
+            state.rate = max(state.rate * self.decrease, self.min_rate)
+        state.limit = max(int(state.limit * self.decrease), 1)
+        if self.metrics is not None:
+            self.metrics.count("fetch_throttled")
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Full-jitter exponential backoff: uniform in [0, min(max_backoff, backoff * 2**attempt)].
+        """
+        return random.uniform(0.0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def call(self, source: str, fetch: Callable[[], T]) -> T:
+        """
+        Run `fetch()` for `source` within a host slot, retrying transient failures.
+        The last error is raised once `retries` retries are spent.
+        """
+        host = urlparse(source).netloc.lower()
+        if not host:
+            return fetch()
+        attempt = 0
+        while True:
+            with self.slot(host):
+                start = time.monotonic()
+                try:
+                    result = fetch()
+                except Exception as e:
+                    error: Optional[BaseException] = e
+                else:
+                    error = None
+                latency = time.monotonic() - start
+            verdict = classify(error) if error is not None else None
+            with self.cond:
+                state = self._state(host)
+                if self.adaptive:
+                    if error is None:
+                        self._success(state, latency)
+                    elif verdict is not None and verdict["throttled"]:
+                        self._slow_down(state, latency)
+                retry_after = verdict["retry_after"] if verdict is not None else None
+                if retry_after is not None:
+                    state.paused_until = max(state.paused_until,
+                                             time.monotonic() + min(retry_after, self.max_backoff))
+                self._publish()
+            if error is None:
+                return result
+            if verdict is None or attempt >= self.retries:
+                raise error
+            if self.metrics is not None:
+                self.metrics.count("fetch_retries")
+            time.sleep(self.backoff_delay(attempt))
+            attempt += 1
@@ -0,0 +1,212 @@
+import gzip
+import mmap
+import os
+import tarfile
+import zlib
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+ArchivePage = Tuple[str, bytes]
+
+WARC_SUFFIXES = (".warc", ".warc.gz")
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz")
+HTML_SUFFIXES = (".html", ".htm", ".xhtml")
+
+@contextmanager
+def _mapped(path: str) -> Iterator[Any]:
+    """
+    Read-only mmap of `path` (None for an empty file, which cannot be mapped).
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield None
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+def _headers(lines: bytes) -> Dict[str, str]:
+    headers: Dict[str, str] = {}
+    for line in lines.split(b"\r\n"):
+        name, sep, value = line.partition(b":")
+        if sep:
+            headers[name.strip().decode("latin-1").lower()] = value.strip().decode("latin-1")
+    return headers
+
+def _dechunk(body: bytes) -> bytes:
+    out = []
+    pos = 0
+    while True:
+        eol = body.find(b"\r\n", pos)
+        if eol < 0:
+            break
+        size = int(body[pos:eol].split(b";")[0].strip() or b"0", 16)
+        if size == 0:
+            break
+        out.append(body[eol + 2:eol + 2 + size])
+        pos = eol + 2 + size + 2
+    return b"".join(out)
+
+def http_body(block: bytes) -> Optional[bytes]:
+    """
+    Body of a recorded HTTP response (de-chunked and decompressed), or None when
+    it is not a 2xx HTML response.
+    """
+    head, sep, body = block.partition(b"\r\n\r\n")
+    if not sep:
+        return None
+    status_line, _, header_lines = head.partition(b"\r\n")
+    parts = status_line.split(None, 2)
+    if len(parts) < 2 or not parts[1].isdigit() or not 200 <= int(parts[1]) < 300:
+        return None
+    headers = _headers(header_lines)
+    ctype = headers.get("content-type", "text/html").lower()
+    if "html" not in ctype:
+        return None
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        body = _dechunk(body)
+    encoding = headers.get("content-encoding", "").lower()
+    try:
+        if encoding in ("gzip", "x-gzip"):
+            body = gzip.decompress(body)
+        elif encoding == "deflate":
+            body = zlib.decompress(body)
+    except (OSError, zlib.error):
+        # Archivers often store the decoded payload but keep the original header.
+        pass
+    return body
+
+def _read_warc(stream: Any) -> Iterator[Tuple[Dict[str, str], bytes]]:
+    """
+    (WARC headers, content block) per record of a readline()/read() stream:
+    a gzip file (one member per record or one for the whole file) or an mmap.
+    """
+    while True:
+        line = stream.readline()
+        if not line:
+            return
+        if not line.startswith(b"WARC/"):
+            continue  # blank separator lines between records
+        lines = []
+        while True:
+            line = stream.readline()
+            if not line or line in (b"\r\n", b"\n"):
+                break
+            lines.append(line.rstrip(b"\r\n"))
+        headers = _headers(b"\r\n".join(lines))
+        yield headers, stream.read(int(headers.get("content-length", "0")))
+
+def iter_warc(path: str) -> Iterator[ArchivePage]:
+    """
+    (target URI, HTML bytes) for every 2xx HTML response or resource record.
+    Uncompressed files are memory-mapped; .warc.gz is decompressed as a stream.
+    """
+    def pages(stream: Any) -> Iterator[ArchivePage]:
+        for headers, block in _read_warc(stream):
+            kind = headers.get("warc-type")
+            uri = headers.get("warc-target-uri", "").strip("<>")
+            if kind == "response" and headers.get("content-type", "").startswith("application/http"):
+                body = http_body(block)
+            elif kind == "resource" and "html" in headers.get("content-type", "html"):
+                body = block
+            else:
+                continue
+            if body is not None and uri:
+                yield uri, body
+
+    if path.lower().endswith(".gz"):
+        with gzip.open(path, "rb") as stream:
+            yield from pages(stream)
+        return
+    with _mapped(path) as mapped:
+        if mapped is not None:
+            yield from pages(mapped)
+
+def _html_member(member: tarfile.TarInfo) -> bool:
+    return member.isfile() and member.name.lower().endswith(HTML_SUFFIXES)
+
+def _tar_number(field: bytes) -> int:
+    if field[:1] and field[0] & 0x80:  # GNU base-256 for sizes >= 8 GiB
+        return int.from_bytes(field[1:], "big")
+    return int(field.rstrip(b"\0 ").strip() or b"0", 8)
+
+def _pax_path(data: bytes) -> Optional[str]:
+    pos = 0
+    while pos < len(data):
+        length, _, rest = data[pos:pos + 32].partition(b" ")
+        if not length.isdigit():
+            break
+        record = data[pos:pos + int(length)]
+        key, _, value = record.partition(b" ")[2].partition(b"=")
+        if key == b"path":
+            return value.rstrip(b"\n").decode("utf-8", "surrogateescape")
+        pos += int(length)
+    return None
+
+def tar_members(buf: Any) -> Iterator[Tuple[str, int, int]]:
+    """
+    (name, data offset, size) of every regular file in an uncompressed tar held
+    in `buf` (bytes or mmap), read straight from the 512-byte headers. Handles
+    ustar prefixes, GNU long names and pax path overrides.
+    """
+    pos = 0
+    end = len(buf) - 512
+    long_name: Optional[str] = None
+    while pos <= end:
+        header = buf[pos:pos + 512]
+        if header[0] == 0:
+            break  # end-of-archive blocks
+        size = _tar_number(header[124:136])
+        kind = header[156:157]
+        data = pos + 512
+        pos = data + (size + 511) // 512 * 512
+        if kind in (b"L", b"x"):
+            payload = buf[data:data + size]
+            long_name = (payload.rstrip(b"\0").decode("utf-8", "surrogateescape") if kind == b"L"
+                         else _pax_path(payload))
+            continue
+        if kind not in (b"0", b"\0", b"7"):
+            if kind != b"g":
+                long_name = None
+            continue
+        name = long_name
+        long_name = None
+        if name is None:
+            name = header[:100].split(b"\0", 1)[0].decode("utf-8", "surrogateescape")
+            if header[257:262] == b"ustar":
+                prefix = header[345:500].split(b"\0", 1)[0]
+                if prefix:
+                    name = prefix.decode("utf-8", "surrogateescape") + "/" + name
+        yield name, data, size
+
+def iter_tar(path: str) -> Iterator[ArchivePage]:
+    """
+    ("<archive>!<member>", bytes) for every .html/.htm member, in archive order.
+    An uncompressed tar is memory-mapped and members are sliced out of the map
+    (no extraction, no per-member file object); compressed tars are read as a
+    single forward stream.
+    """
+    if path.lower().endswith(".tar"):
+        with _mapped(path) as mapped:
+            if mapped is None:
+                return
+            for name, offset, size in tar_members(mapped):
+                if name.lower().endswith(HTML_SUFFIXES):
+                    yield f"{path}!{name}", mapped[offset:offset + size]
+        return
+    with tarfile.open(path, "r|*") as tar:
+        for member in tar:
+            if _html_member(member):
+                data = tar.extractfile(member)
+                if data is not None:
+                    yield f"{path}!{member.name}", data.read()
+            tar.members = []  # TarFile remembers every member; keep memory flat
+
+def iter_archive(path: str) -> Iterator[ArchivePage]:
+    if path.lower().endswith(WARC_SUFFIXES):
+        return iter_warc(path)
+    if path.lower().endswith(TAR_SUFFIXES):
+        return iter_tar(path)
+    raise ValueError(f"Not a WARC or tar archive: {path}")
@@ -0,0 +1,30 @@
+import os
+from typing import Any, Optional
+from urllib.parse import unquote, urlsplit
+
+class FixtureSite:
+    """
+    A local directory of HTML files standing in for the site, for crawl tests
+    and offline dry runs. https://www.g2.com/products/acme/reviews is served
+    from <directory>/products/acme/reviews.html (host and query are ignored).
+    Drop-in replacement for fetch_html: missing pages raise FileNotFoundError.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.abspath(directory)
+
+    def path_for(self, url: str) -> str:
+        path = unquote(urlsplit(url).path).strip("/") or "index"
+        full = os.path.abspath(os.path.join(self.directory, path + ".html"))
+        if not full.startswith(self.directory + os.sep):
+            raise FileNotFoundError(f"Outside fixture site: {url}")
+        return full
+
+    def fetch(self, source: str, timeout: int = 20, session: Optional[Any] = None) -> str:
+        path = self.path_for(source)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No fixture page for {source} ({path})")
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.read()
+
+    __call__ = fetch
@@ -0,0 +1,67 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Deque, Iterable, Iterator, Optional, Tuple
+
+from fetchers.adaptive import FetchController                 # type: ignore
+
+if TYPE_CHECKING:
+    import requests  # imported lazily at runtime, see build_session
+
+FetchResult = Tuple[str, Optional[str], Optional[BaseException]]
+
+def build_session(pool_size: int = 10) -> "requests.Session":
+    """
+    Session whose adapters keep up to `pool_size` keep-alive connections per host.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+class ConcurrentFetcher:
+    """
+    Fetch many sources on a thread pool sharing one pooled requests.Session.
+    Results are yielded in input order; a failing source yields its exception
+    instead of HTML so callers can skip just that source.
+    Per-host concurrency and pacing come from `controller` (an
+    adaptive.FetchController); without one, a fixed controller allowing
+    `per_host` requests in flight at `rate` requests/second per host, with no
+    retries, is used.
+    """
+    def __init__(self, fetch: Callable[..., str], workers: int = 8, per_host: int = 2,
+                 rate: Optional[float] = None, timeout: int = 20,
+                 controller: Optional[FetchController] = None):
+        self.fetch = fetch
+        self.workers = max(int(workers), 1)
+        self.timeout = timeout
+        self.controller = controller or FetchController(rate=rate, per_host=per_host, retries=0, adaptive=False)
+        self.session = build_session(pool_size=max(self.workers, per_host))
+
+    def _fetch_one(self, source: str) -> str:
+        return self.controller.call(source, lambda: self.fetch(source, timeout=self.timeout, session=self.session))
+
+    @staticmethod
+    def _result(source: str, future: "Future[str]") -> FetchResult:
+        try:
+            return source, future.result(), None
+        except Exception as e:
+            return source, None, e
+
+    def fetch_all(self, sources: Iterable[str]) -> Iterator[FetchResult]:
+        # Keep a bounded window of in-flight fetches so huge input lists do not
+        # queue every future up front, and so results can be released in order.
+        window: Deque[Tuple[str, "Future[str]"]] = deque()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="fetch") as pool:
+            for src in sources:
+                window.append((src, pool.submit(self._fetch_one, src)))
+                if len(window) >= self.workers * 2:
+                    yield self._result(*window.popleft())
+            while window:
+                yield self._result(*window.popleft())
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,230 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional
+
+KEPT_HEADERS = frozenset({"etag", "last-modified", "content-type"})
+EVICT_BATCH = 256
+
+class CachedResponse(NamedTuple):
+    url: str
+    digest: str
+    headers: Dict[str, str]
+    encoding: str
+    stored_at: float
+
+class CacheMiss(LookupError):
+    """
+    Raised in offline (cache-only) mode when a URL has never been cached.
+    """
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache keyed by URL.
+
+    Bodies are gzip-compressed and content-addressed (blobs/<xx>/<sha256>.gz), so
+    identical pages share one blob. A SQLite index keeps each URL's response headers,
+    encoding and timestamps. Entries younger than `ttl` seconds are served without a
+    request; older ones are revalidated with If-None-Match / If-Modified-Since.
+    When blobs exceed `max_bytes`, least recently used entries are evicted.
+    `offline` serves every request from the cache and never touches the network.
+    """
+    def __init__(self, directory: str, ttl: float = 0.0, max_bytes: Optional[int] = None,
+                 offline: bool = False):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.blob_dir = os.path.join(directory, "blobs")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (url TEXT PRIMARY KEY, digest TEXT NOT NULL,"
+                " headers TEXT NOT NULL, encoding TEXT NOT NULL, stored_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            self.db.execute("CREATE TABLE IF NOT EXISTS blobs (digest TEXT PRIMARY KEY, size INTEGER NOT NULL)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+            self.db.execute("CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)")
+        # Running total of blob sizes, so a put does not have to SUM the whole table.
+        self.blob_bytes = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], f"{digest}.gz")
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self.lock:
+            row = self.db.execute(
+                "SELECT digest, headers, encoding, stored_at FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            with self.db:
+                self.db.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        return CachedResponse(url, row[0], json.loads(row[1]), row[2], row[3])
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return self.offline or time.time() - entry.stored_at < self.ttl
+
+    def read_text(self, entry: CachedResponse) -> Optional[str]:
+        """
+        The cached body, or None when its blob is gone or unreadable (deleted by
+        hand, cut short by a crash); the index rows pointing at it are then
+        dropped so the page is fetched and stored again.
+        """
+        try:
+            with gzip.open(self._blob_path(entry.digest), "rb") as f:
+                return f.read().decode(entry.encoding, errors="replace")
+        except (FileNotFoundError, EOFError, zlib.error, gzip.BadGzipFile):
+            self.forget(entry.digest)
+            return None
+
+    def forget(self, digest: str) -> None:
+        """
+        Drop a blob and every entry that uses it.
+        """
+        with self.lock, self.db:
+            self.db.execute("DELETE FROM entries WHERE digest = ?", (digest,))
+            size = self.db.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+            self.db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+            self.blob_bytes -= size[0] if size else 0
+        try:
+            os.remove(self._blob_path(digest))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def validators(entry: Optional[CachedResponse]) -> Dict[str, str]:
+        """
+        Conditional request headers for revalidating `entry`.
+        """
+        if entry is None:
+            return {}
+        headers = {}
+        lowered = {k.lower(): v for k, v in entry.headers.items()}
+        if "etag" in lowered:
+            headers["If-None-Match"] = lowered["etag"]
+        if "last-modified" in lowered:
+            headers["If-Modified-Since"] = lowered["last-modified"]
+        return headers
+
+    def put(self, url: str, body: bytes, headers: Mapping[str, str], encoding: str) -> CachedResponse:
+        digest = hashlib.sha256(body).hexdigest()
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        now = time.time()
+        # Only what revalidation (and decoding) needs, not the whole response header set.
+        kept = {k: v for k, v in headers.items() if k.lower() in KEPT_HEADERS}
+        size = os.path.getsize(path)
+        with self.lock, self.db:
+            if self.db.execute("INSERT OR IGNORE INTO blobs (digest, size) VALUES (?, ?)", (digest, size)).rowcount:
+                self.blob_bytes += size
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries (url, digest, headers, encoding, stored_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, digest, json.dumps(kept), encoding, now, now),
+            )
+        self.evict()
+        return CachedResponse(url, digest, kept, encoding, now)
+
+    def touch(self, url: str, headers: Optional[Mapping[str, str]] = None) -> None:
+        """
+        Mark a revalidated (304) entry as fresh again, merging any updated headers.
+        """
+        with self.lock:
+            row = self.db.execute("SELECT headers FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return
+            updated = {k: v for k, v in (headers or {}).items() if k.lower() in KEPT_HEADERS}
+            replaced = {k.lower() for k in updated}
+            merged = {k: v for k, v in json.loads(row[0]).items() if k.lower() not in replaced}
+            merged.update(updated)
+            now = time.time()
+            with self.db:
+                self.db.execute(
+                    "UPDATE entries SET headers = ?, stored_at = ?, accessed_at = ? WHERE url = ?",
+                    (json.dumps(merged), now, now, url),
+                )
+
+    def total_bytes(self) -> int:
+        with self.lock:
+            return self.db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def evict(self) -> None:
+        """
+        Drop least recently used entries until blobs fit in max_bytes, walking the
+        accessed_at index EVICT_BATCH entries at a time.
+        """
+        if self.max_bytes is None:
+            return
+        with self.lock:
+            if self.blob_bytes <= self.max_bytes:
+                return
+            with self.db:
+                while self.blob_bytes > self.max_bytes:
+                    rows = self.db.execute(
+                        "SELECT url, digest FROM entries ORDER BY accessed_at LIMIT ?", (EVICT_BATCH,)
+                    ).fetchall()
+                    if not rows:
+                        break
+                    for url, digest in rows:
+                        if self.blob_bytes <= self.max_bytes:
+                            break
+                        self.db.execute("DELETE FROM entries WHERE url = ?", (url,))
+                        if self.db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                            continue
+                        size = self.db.execute("SELECT size FROM blobs WHERE digest = ?", (digest,)).fetchone()
+                        self.db.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                        self.blob_bytes -= size[0] if size else 0
+                        try:
+                            os.remove(self._blob_path(digest))
+                        except FileNotFoundError:
+                            pass
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
+
+def fetch_cached(cache: ResponseCache, url: str, get: Any, headers: Dict[str, str], timeout: int,
+                 on_response: Optional[Callable[[Any], None]] = None) -> str:
+    """
+    GET `url` through `cache`: fresh entries are served directly, stale ones are
+    revalidated (304 -> cached body), and new 200 bodies are stored.
+    `on_response` sees every response that actually came from the network.
+    """
+    entry = cache.get(url)
+    if entry is not None and cache.is_fresh(entry):
+        text = cache.read_text(entry)
+        if text is not None:
+            return text
+        entry = None  # blob lost: treat as a miss
+    if cache.offline:
+        raise CacheMiss(f"Not in cache (offline mode): {url}")
+    resp = get(url, timeout=timeout, headers={**headers, **cache.validators(entry)})
+    if on_response is not None:
+        on_response(resp)
+    if resp.status_code == 304 and entry is not None:
+        text = cache.read_text(entry)
+        if text is not None:
+            cache.touch(url, resp.headers)
+            return text
+        # The blob went missing since get(): ask again, unconditionally.
+        resp = get(url, timeout=timeout, headers=headers)
+        if on_response is not None:
+            on_response(resp)
+    resp.raise_for_status()
+    encoding = resp.encoding or resp.apparent_encoding or "utf-8"
+    cache.put(url, resp.content, resp.headers, encoding)
+    return resp.content.decode(encoding, errors="replace")
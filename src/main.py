@@ -1,12 +1,16 @@
 import argparse
+import functools
 import json
 import logging
 import os
 import sys
 import time
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple, Union
 from urllib.parse import urlparse
 
+if TYPE_CHECKING:
+    import requests  # imported lazily at runtime, by network fetches only
+
 # Allow imports using the repo-relative paths even without packages
 REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 SRC_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -14,21 +18,29 @@ sys.path.insert(0, SRC_DIR)
 sys.path.insert(0, os.path.join(SRC_DIR, "extractors"))
 sys.path.insert(0, os.path.join(SRC_DIR, "pipelines"))
 sys.path.insert(0, os.path.join(SRC_DIR, "outputs"))
+sys.path.insert(0, os.path.join(SRC_DIR, "fetchers"))
 
-from extractors.product_profile import parse_product_profile  # type: ignore
-from extractors.reviews_parser import parse_reviews           # type: ignore
-from extractors.competitors import parse_competitive          # type: ignore
-from extractors.pricing_parser import parse_pricing           # type: ignore
+from extractors.page_record import extract_record, extract_record_timed, extract_record_traced  # type: ignore
+from extractors.selector_stats import SelectorStats           # type: ignore
 from pipelines.normalize import normalize_record              # type: ignore
+from pipelines.records import ProductRecord                   # type: ignore
 from pipelines.validators import SchemaValidator              # type: ignore
+from pipelines.staged import StagedPipeline                   # type: ignore
+from pipelines.incremental import IncrementalState            # type: ignore
+from pipelines.metrics import NullMetrics, RunMetrics         # type: ignore
+from pipelines.review_harvest import ReviewHarvester          # type: ignore
+from pipelines.frontier import PENDING, Frontier, canonicalize_url  # type: ignore
+from pipelines.crawler import Crawler                         # type: ignore
+from pipelines.sharding import done_marker, mark_shard_done, merge_outputs, parse_shard, shard_path  # type: ignore
+from pipelines.inputs import ArchiveStream, InputStream, progress_label  # type: ignore
+from pipelines.daemon import ExtractionService, parse_address, serve  # type: ignore
 from outputs.writer_json import JsonWriter                    # type: ignore
-
-try:
-    import requests
-    from bs4 import BeautifulSoup
-except Exception as e:  # pragma: no cover
-    print("Missing dependencies. Run: pip install -r requirements.txt", file=sys.stderr)
-    raise
+from outputs.writer_jsonl import Checkpoint, JsonlWriter, finalize_jsonl  # type: ignore
+from outputs.writer_sqlite import SqliteWriter                # type: ignore
+from fetchers.adaptive import FetchController                 # type: ignore
+from fetchers.http_pool import ConcurrentFetcher             # type: ignore
+from fetchers.response_cache import ResponseCache, fetch_cached  # type: ignore
+from fetchers.fixture_site import FixtureSite                 # type: ignore
 
 DEFAULT_INPUTS = os.path.join(REPO_ROOT, "data", "inputs.sample.txt")
 DEFAULT_OUTPUT = os.path.join(REPO_ROOT, "data", "sample_output.json")
@@ -41,21 +53,30 @@ def load_settings(path: str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def read_inputs(path: str) -> List[str]:
-    with open(path, "r", encoding="utf-8") as f:
-        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; G2ProductScraper/1.0; +https://bitbash.dev)"
+}
 
-def fetch_html(source: str, timeout: int = 20) -> str:
+def fetch_html(source: str, timeout: int = 20, session: Optional["requests.Session"] = None,
+               cache: Optional[ResponseCache] = None, metrics: Optional[RunMetrics] = None) -> str:
     """
     Fetch HTML from a URL or read from a local file path.
-    - If source starts with http/https, perform GET.
+    - If source starts with http/https, perform GET (through `session` when given,
+      so keep-alive connections are reused, and through `cache` when given, so
+      unchanged pages are revalidated instead of downloaded).
     - If source points to existing file, open and read.
+    HTTP status codes and bytes downloaded are counted in `metrics` when given.
     """
     parsed = urlparse(source)
     if parsed.scheme in ("http", "https"):
-        resp = requests.get(source, timeout=timeout, headers={
-            "User-Agent": "Mozilla/5.0 (compatible; G2ProductScraper/1.0; +https://bitbash.dev)"
-        })
+        import requests  # only network runs pay for it
+        getter = session.get if session is not None else requests.get
+        on_response = metrics.observe_response if metrics is not None else None
+        if cache is not None:
+            return fetch_cached(cache, source, getter, HTTP_HEADERS, timeout, on_response=on_response)
+        resp = getter(source, timeout=timeout, headers=HTTP_HEADERS)
+        if on_response is not None:
+            on_response(resp)
         resp.raise_for_status()
         return resp.text
     if os.path.exists(source):
@@ -63,45 +84,311 @@ def fetch_html(source: str, timeout: int = 20) -> str:
             return f.read()
     raise FileNotFoundError(f"Cannot treat '{source}' as URL or file path")
 
-def process_single(html: str, url: str) -> Dict[str, Any]:
-    soup = BeautifulSoup(html, "lxml")
-    profile = parse_product_profile(soup, url=url)
-    reviews = parse_reviews(soup, url=url)
-    comp = parse_competitive(soup, url=url)
-    pricing = parse_pricing(soup, url=url)
+def process_single(html: str, url: str, backend: str = "soup",
+                   selectors: Optional[SelectorStats] = None) -> Dict[str, Any]:
+    return normalize_record(extract_record(html, url, backend=backend, selectors=selectors), in_place=True)
 
-    record = {**profile, **comp, **pricing}
-    record["initial_reviews"] = reviews.get("initial_reviews", [])
-    return normalize_record(record)
+def iter_pages(inputs: Iterable[str], delay: float, concurrency: int = 0, per_host: int = 2,
+               rate: Optional[float] = None,
+               cache: Optional[ResponseCache] = None,
+               metrics: Optional[RunMetrics] = None,
+               fetcher: Optional[Callable[..., str]] = None,
+               controller: Optional[FetchController] = None) -> Iterator[Tuple[str, Optional[str], Optional[BaseException]]]:
+    """
+    Yield (source, html, error) for every input, in input order.
+    - concurrency <= 0: fetch one at a time, sleeping `delay` between pages.
+    - concurrency > 0: fetch on a pooled thread pool, with at most `per_host`
+      requests in flight per host, each host paced at `rate` requests/second
+      (defaults to 1/delay).
+    HTTP responses go through `cache` when one is given.
+    With `metrics`, each fetch is timed under the "fetch" stage.
+    `fetcher` replaces fetch_html (e.g. a FixtureSite).
+    With a `controller`, it paces, limits and retries HTTP fetches (both modes)
+    in place of `delay`/`rate`/`per_host`; serially, `delay` still separates the
+    sources it does not pace (local files, or no rate set).
+    """
+    fetch = fetcher or functools.partial(fetch_html, cache=cache, metrics=metrics)
+    if metrics is not None:
+        untimed = fetch
 
-def run(inputs: List[str], output_path: str, delay: float, schema_path: str) -> int:
-    writer = JsonWriter(output_path)
-    validator = SchemaValidator(schema_path)
+        def fetch(src: str, **kwargs: Any) -> str:
+            with metrics.timed("fetch", src):
+                return untimed(src, **kwargs)
+    if concurrency > 0:
+        if rate is None and delay > 0:
+            rate = 1.0 / delay
+        fetcher = ConcurrentFetcher(fetch, workers=concurrency, per_host=per_host, rate=rate,
+                                    controller=controller)
+        try:
+            yield from fetcher.fetch_all(inputs)
+        finally:
+            fetcher.close()
+        return
 
-    results: List[Dict[str, Any]] = []
-    for i, src in enumerate(inputs, start=1):
+    fetched = False
+    for src in inputs:
+        # Sleep between successful fetches (not after the last one), without
+        # needing to know how many inputs there are.
+        if fetched and delay > 0 and (controller is None or not controller.paces(src)):
+            time.sleep(delay)
         try:
-            logger.info("Processing (%d/%d): %s", i, len(inputs), src)
-            html = fetch_html(src)
-            record = process_single(html, src)
+            html = fetch(src) if controller is None else controller.call(src, functools.partial(fetch, src))
+        except Exception as e:
+            fetched = False
+            yield src, None, e
+            continue
+        fetched = True
+        yield src, html, None
+
+def run(inputs: Union[Iterable[str], ArchiveStream], output_path: str, delay: float, schema_path: str,
+        concurrency: int = 0, per_host: int = 2, rate: Optional[float] = None,
+        parse_workers: int = 0, queue_size: int = 64, stream: bool = False,
+        resume: bool = False, checkpoint_path: Optional[str] = None, batch_size: int = 100,
+        backend: str = "soup", cache: Optional[ResponseCache] = None,
+        incremental_path: Optional[str] = None, changes_path: Optional[str] = None,
+        metrics: Optional[RunMetrics] = None, validate_every: int = 1,
+        sqlite_path: Optional[str] = None, controller: Optional[FetchController] = None,
+        selectors: Optional[SelectorStats] = None) -> int:
+    """
+    Fetch -> parse/extract -> normalize/validate -> write, as a staged pipeline.
+    Returns the process exit code; the options mirror the CLI flags of the same name.
+    """
+    recorder = metrics or NullMetrics()
+    validator = SchemaValidator(schema_path, sample_every=validate_every)
+    source_inputs = inputs
+    skipped = 0
+    if stream:
+        checkpoint = Checkpoint(checkpoint_path or output_path + ".checkpoint", reset=not resume)
+        if resume:
+            done = checkpoint.load()
+            logger.info("Resuming: %d inputs already done", len(done))
+
+            def pending(items: Iterable[Any]) -> Iterator[Any]:
+                nonlocal skipped
+                for item in items:
+                    if (item[0] if isinstance(item, tuple) else item) in done:
+                        skipped += 1
+                        continue
+                    yield item
+            inputs = pending(inputs)
+        stream_writer = JsonlWriter(output_path, batch_size=batch_size, append=resume, checkpoint=checkpoint)
+    else:
+        writer = JsonWriter(output_path)
+
+    def finish(extracted: Tuple[Any, ...]) -> Tuple[Dict[str, Any], Dict[str, float]]:
+        raw, timings = extracted[:2]
+        if selectors is not None and extracted[2] is not None:
+            selectors.observe(extracted[2])
+        if not recorder.enabled:
+            record = normalize_record(raw, in_place=True)
             validator.validate_instance(record)
-            results.append(record)
-            if delay > 0 and i < len(inputs):
+            return record, timings
+        start = time.perf_counter()
+        record = normalize_record(raw, in_place=True)
+        timings["normalize"] = time.perf_counter() - start
+        validator.validate_instance(record)
+        timings["validate"] = time.perf_counter() - start - timings["normalize"]
+        return record, timings
+
+    if selectors is not None:
+        # Workers get a copy of the hints with each page; outcomes come back to finish().
+        extract = functools.partial(extract_record_traced, backend=backend, selectors=selectors,
+                                    timed=recorder.enabled)
+    else:
+        extract = functools.partial(extract_record_timed, backend=backend, timed=recorder.enabled)
+    pipeline = StagedPipeline(extract, finish, parse_workers=parse_workers, queue_size=queue_size)
+    if isinstance(source_inputs, ArchiveStream):
+        pages: Iterable[Tuple[str, Any, Optional[BaseException]]] = inputs
+    else:
+        pages = iter_pages(inputs, delay, concurrency=concurrency, per_host=per_host, rate=rate, cache=cache,
+                           metrics=metrics, controller=controller)
+    state = None
+    if incremental_path:
+        state = IncrementalState(incremental_path)
+        pages = state.skip_unchanged(pages, on_skip=recorder.skip_source)
+        changes = JsonlWriter(changes_path or output_path + ".changes.jsonl", batch_size=batch_size)
+        if stream:
+            # Page state is stored only once its record is on disk.
+            stream_writer.on_flush = state.save
+
+    sink = SqliteWriter(sqlite_path, batch_size=batch_size) if sqlite_path else None
+    results: List[ProductRecord] = []
+    try:
+        for i, (src, finished, error) in enumerate(pipeline.run(pages), start=1):
+            if error is not None:
+                logger.error("Failed to process %s: %s", src, error, exc_info=error)
+                recorder.finish_source(src, ok=False)
+                if state is not None:
+                    state.forget(src)
+                continue
+            logger.info("Processed (%s): %s", progress_label(source_inputs, i), src)
+            record, timings = finished
+            recorder.observe_many(src, timings)
+            if state is not None:
+                changed = state.diff(src, record)
+                if not changed:
+                    state.save([src])
+                    recorder.finish_source(src)
+                    continue
+                changes.write_record({"source": src, "g2_link": record.get("g2_link"), "changes": changed})
+            with recorder.timed("write", src):
+                if stream:
+                    stream_writer.write_record(record, source=src)
+                else:
+                    # Held until the end: keep the compact form.
+                    results.append(ProductRecord.from_dict(record))
+                if sink is not None:
+                    sink.write_record(record, source=src)
+            recorder.finish_source(src)
+        if not stream:
+            start = time.perf_counter()
+            writer.write(results)
+            recorder.gauge("final_write_seconds", time.perf_counter() - start)
+            logger.info("Wrote %d records -> %s", len(results), output_path)
+            if state is not None:
+                state.save()
+    finally:
+        if stream:
+            stream_writer.close()
+        if sink is not None:
+            sink.close()
+            logger.info("Upserted %d records -> %s", sink.count, sqlite_path)
+        if state is not None:
+            changes.close()
+            state.close()
+            logger.info("Incremental: %d unchanged pages skipped, %d changed records", state.unchanged, changes.count)
+
+    if skipped:
+        logger.info("Skipped %d checkpointed inputs", skipped)
+    if isinstance(source_inputs, InputStream) and source_inputs.duplicates:
+        logger.info("Dropped %d duplicate inputs", source_inputs.duplicates)
+    if stream:
+        logger.info("Streamed %d records -> %s", stream_writer.count, output_path)
+    return 0
+
+def crawl(seeds: Iterable[str], frontier_path: str, output_path: str, delay: float, schema_path: str,
+          concurrency: int = 0, per_host: int = 2, rate: Optional[float] = None, backend: str = "soup",
+          cache: Optional[ResponseCache] = None, max_depth: int = 2, max_pages: Optional[int] = None,
+          batch_size: int = 100, fetcher: Optional[Callable[..., str]] = None,
+          controller: Optional[FetchController] = None, selectors: Optional[SelectorStats] = None) -> int:
+    """
+    Discovery crawl from `seeds`; product records are appended to `output_path` (JSONL).
+    Re-running with the same `frontier_path` resumes where the last run stopped.
+    """
+    validator = SchemaValidator(schema_path)
+    seeds = list(seeds)
+    hosts = [urlparse(canonicalize_url(s)).netloc for s in seeds if urlparse(s).scheme in ("http", "https")]
+    frontier = Frontier(frontier_path, hosts=hosts or None)
+
+    def process(html: str, url: str) -> Dict[str, Any]:
+        record = process_single(html, url, backend=backend, selectors=selectors)
+        validator.validate_instance(record)
+        return record
+
+    # One fetcher (session + per-host limiter) and one pacing state for the whole
+    # crawl, not one per frontier batch.
+    fetch = fetcher or functools.partial(fetch_html, cache=cache)
+    pool = None
+    if concurrency > 0:
+        if rate is None and delay > 0:
+            rate = 1.0 / delay
+        pool = ConcurrentFetcher(fetch, workers=concurrency, per_host=per_host, rate=rate, controller=controller)
+        fetch_pages = pool.fetch_all
+    else:
+        paced = False
+
+        def fetch_pages(batch: List[str]) -> Iterator[Tuple[str, Optional[str], Optional[BaseException]]]:
+            # iter_pages sleeps between the pages of a batch; this keeps the same
+            # delay between the last page of one batch and the first of the next.
+            nonlocal paced
+            if paced and batch and delay > 0 and (controller is None or not controller.paces(batch[0])):
                 time.sleep(delay)
-        except Exception as e:
-            logger.exception("Failed to process %s: %s", src, e)
+            for item in iter_pages(batch, delay, fetcher=fetch, controller=controller):
+                paced = item[2] is None
+                yield item
 
-    writer.write(results)
-    logger.info("Wrote %d records -> %s", len(results), output_path)
+    crawler = Crawler(frontier, fetch_pages, process, backend=backend, max_depth=max_depth,
+                      max_pages=max_pages, batch_size=max(concurrency * 2, 1) if concurrency > 0 else 8)
+    try:
+        with JsonlWriter(output_path, batch_size=batch_size, append=True) as writer:
+            stats = crawler.run(seeds, writer)
+        logger.info("Crawled %d pages (%d records, %d failed, %d new URLs); frontier has %d pending",
+                    stats["pages"], stats["records"], stats["failed"], stats["discovered"],
+                    frontier.count(PENDING))
+    finally:
+        if pool is not None:
+            pool.close()
+        frontier.close()
     return 0
 
 def main() -> int:
     parser = argparse.ArgumentParser(description="G2 Product Scraper - structured product data extractor")
-    parser.add_argument("--inputs", default=DEFAULT_INPUTS, help="Path to file with URLs or local HTML paths (one per line)")
+    parser.add_argument("--inputs", default=DEFAULT_INPUTS,
+                        help="Path to file with URLs or local HTML paths (one per line); .gz is decompressed, - reads stdin")
+    parser.add_argument("--archive", action="append", default=None, metavar="PATH",
+                        help="Re-extract pages stored in a WARC(.gz) or tar(.gz) archive instead of fetching --inputs "
+                             "(repeatable)")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Drop repeated inputs (same URL up to scheme/host case and #fragment); each drop is logged")
     parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Path to write JSON output")
     parser.add_argument("--settings", default=DEFAULT_SETTINGS, help="Path to settings JSON")
     parser.add_argument("--schema", default=DEFAULT_SCHEMA, help="Path to JSON schema")
     parser.add_argument("--delay", type=float, default=1.0, help="Delay between requests (seconds)")
+    parser.add_argument("--concurrency", type=int, default=0, help="Concurrent fetches (0 = serial, one page at a time)")
+    parser.add_argument("--per-host", type=int, default=2, help="Max concurrent requests per host in concurrent mode")
+    parser.add_argument("--rate", type=float, default=None, help="Requests/second per host in concurrent mode (default: 1/delay)")
+    parser.add_argument("--retries", type=int, default=3,
+                        help="Retries per page on 429/5xx/connection errors, with jittered exponential backoff")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Adapt each host's rate and concurrency to errors and latency (AIMD), starting from --rate")
+    parser.add_argument("--max-rate", type=float, default=None, help="Upper bound on the --adaptive rate (default: 4x start)")
+    parser.add_argument("--latency-target", type=float, default=10.0,
+                        help="Responses slower than this many seconds count as congestion in --adaptive mode")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Processes for parsing/extraction (0 = in-process)")
+    parser.add_argument("--queue-size", type=int, default=64, help="Bound on each pipeline stage queue")
+    parser.add_argument("--backend", choices=["soup", "lxml", "partial"], default="soup",
+                        help="Extraction backend (lxml is faster, partial also drops what extractors never read "
+                             "to save memory on huge pages, soup is the reference)")
+    parser.add_argument("--cache-dir", default=None, help="Directory for the persistent HTTP response cache")
+    parser.add_argument("--cache-ttl", type=float, default=0.0, help="Seconds a cached page is served without revalidation")
+    parser.add_argument("--cache-max-mb", type=float, default=None, help="Evict least recently used pages beyond this size")
+    parser.add_argument("--cache-only", action="store_true", help="Replay from --cache-dir without touching the network")
+    parser.add_argument("--incremental", metavar="STATE", default=None, help="SQLite state file; skip unchanged pages and emit only changed records")
+    parser.add_argument("--changes", default=None, help="Change summary JSONL for --incremental (default: <output>.changes.jsonl)")
+    parser.add_argument("--stream", action="store_true", help="Append records to --output as JSONL (.gz to compress) as they complete")
+    parser.add_argument("--batch-size", type=int, default=100, help="Records per flush/checkpoint in --stream mode")
+    parser.add_argument("--resume", action="store_true", help="In --stream mode, skip inputs recorded in the checkpoint")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint path for --stream (default: <output>.checkpoint)")
+    parser.add_argument("--sqlite", metavar="DB", default=None,
+                        help="Also upsert records into this SQLite database (child tables + rating/review history)")
+    parser.add_argument("--finalize", metavar="JSONL", default=None, help="Convert a JSONL(.gz) stream to a JSON array at --output and exit")
+    parser.add_argument("--harvest-reviews", metavar="DIR", default=None,
+                        help="Collect every review page per input product into DIR/<product>.reviews.jsonl and exit")
+    parser.add_argument("--max-review-pages", type=int, default=None, help="Cap on review pages per product in --harvest-reviews")
+    parser.add_argument("--crawl", metavar="FRONTIER", default=None,
+                        help="Crawl from the inputs as seeds, following category/alternative/comparison links; "
+                             "FRONTIER is the resumable SQLite frontier. Records are appended to --output as JSONL")
+    parser.add_argument("--max-depth", type=int, default=2, help="Link depth limit for --crawl (seeds are depth 0)")
+    parser.add_argument("--max-pages", type=int, default=None, help="Total page budget for --crawl, across restarts")
+    parser.add_argument("--site-dir", default=None, help="Serve URLs from a local directory of HTML pages instead of the network")
+    parser.add_argument("--shard", type=parse_shard, default=None, metavar="i/N",
+                        help="Process only inputs whose canonical URL hashes to shard i of N; "
+                             "--output, --incremental, --cache-dir, --crawl, --sqlite, --changes, "
+                             "--checkpoint, --metrics, --prometheus and --selector-stats get per-shard names")
+    parser.add_argument("--merge", type=int, default=None, metavar="N",
+                        help="Merge the N finished shard outputs of --output into --output (deduplicated, sorted) and exit")
+    parser.add_argument("--serve", type=parse_address, default=None, metavar="[HOST:]PORT",
+                        help="Run as a long-lived extraction server (POST /extract URLs or raw HTML, GET /health) "
+                             "instead of processing --inputs; binds 127.0.0.1 unless HOST is given")
+    parser.add_argument("--max-batch", type=int, default=100, help="Largest batch one --serve request may carry")
+    parser.add_argument("--selector-stats", metavar="JSON", default=None,
+                        help="Learn which fallback selector wins per page layout, try it first on later pages "
+                             "(same results), keep the stats here across runs and log layout drift")
+    parser.add_argument("--metrics", default=None, help="Write a per-stage timing/throughput summary (JSON) here")
+    parser.add_argument("--prometheus", default=None, help="Also export the metrics as a Prometheus textfile here")
+    parser.add_argument("--slowest", type=int, default=10, help="Number of slowest inputs to log with --metrics")
+    parser.add_argument("--validate-every", type=int, default=1,
+                        help="Schema-check only every Nth record (1 = all, the default for CI)")
     parser.add_argument("--log", default="INFO", help="Logging level (DEBUG, INFO, WARNING, ERROR)")
     args = parser.parse_args()
 
@@ -110,6 +397,24 @@ def main() -> int:
         format="%(asctime)s %(levelname)s %(name)s: %(message)s",
     )
 
+    if args.finalize:
+        count = finalize_jsonl(args.finalize, args.output)
+        logger.info("Finalized %d records -> %s", count, args.output)
+        return 0
+
+    if args.merge is not None:
+        if args.merge < 1:
+            parser.error("--merge needs a shard count of at least 1")
+        shards = [shard_path(args.output, i, args.merge) for i in range(1, args.merge + 1)]
+        missing = [p for p in shards if not os.path.exists(done_marker(p))]
+        if missing:
+            logger.error("Shards not finished (no .done marker): %s", ", ".join(missing))
+            return 1
+        count, duplicates = merge_outputs(shards, args.output)
+        logger.info("Merged %d shards: %d records (%d duplicates dropped) -> %s",
+                    len(shards), count, duplicates, args.output)
+        return 0
+
     if not os.path.exists(args.settings):
         logger.warning("Settings file not found at %s, using defaults.", args.settings)
         settings = {}
@@ -118,7 +423,113 @@ def main() -> int:
 
     # Allow overriding delay from settings
     delay = settings.get("delay_seconds", args.delay)
-    return run(read_inputs(args.inputs), args.output, delay, args.schema)
+    concurrency = settings.get("concurrency", args.concurrency)
+    per_host = settings.get("per_host_concurrency", args.per_host)
+    rate = settings.get("per_host_rate", args.rate)
+    parse_workers = settings.get("parse_workers", args.parse_workers)
+    queue_size = settings.get("queue_size", args.queue_size)
+    backend = settings.get("backend", args.backend)
+    cache_dir = settings.get("cache_dir", args.cache_dir)
+    incremental = settings.get("incremental_state", args.incremental)
+    if args.archive and (args.crawl or args.harvest_reviews):
+        parser.error("--archive cannot be combined with --crawl or --harvest-reviews")
+    if args.archive:
+        inputs = ArchiveStream(args.archive, shard=args.shard)
+    else:
+        inputs = InputStream(args.inputs, dedupe=args.dedupe, shard=args.shard)
+    output = args.output
+    sqlite_path = settings.get("sqlite_path", args.sqlite)
+    frontier_path = args.crawl
+    selector_stats = settings.get("selector_stats", args.selector_stats)
+    if args.shard:
+        # Every per-run file gets the shard suffix so boxes sharing a filesystem never collide.
+        index, count = args.shard
+        output = shard_path(output, index, count)
+        def per_shard(path):
+            return shard_path(path, index, count) if path else path
+        incremental, sqlite_path, frontier_path = per_shard(incremental), per_shard(sqlite_path), per_shard(frontier_path)
+        args.changes, args.checkpoint = per_shard(args.changes), per_shard(args.checkpoint)
+        args.metrics, args.prometheus = per_shard(args.metrics), per_shard(args.prometheus)
+        selector_stats = per_shard(selector_stats)
+        if cache_dir:
+            cache_dir = os.path.join(cache_dir, f"shard-{index}-of-{count}")
+        logger.info("Shard %d/%d -> %s", index, count, output)
+    cache = None
+    if cache_dir:
+        max_mb = settings.get("cache_max_mb", args.cache_max_mb)
+        cache = ResponseCache(cache_dir, ttl=settings.get("cache_ttl_seconds", args.cache_ttl),
+                              max_bytes=int(max_mb * 1024 * 1024) if max_mb else None,
+                              offline=args.cache_only)
+    elif args.cache_only:
+        parser.error("--cache-only requires --cache-dir")
+    if args.cache_only:
+        delay = 0.0
+    metrics = RunMetrics(slowest=args.slowest) if args.metrics or args.prometheus else None
+    if rate is None and delay > 0:
+        rate = 1.0 / delay
+    controller = FetchController(rate=rate, per_host=per_host if concurrency > 0 else 1,
+                                 retries=settings.get("max_retries", args.retries),
+                                 adaptive=settings.get("adaptive", args.adaptive),
+                                 max_rate=settings.get("max_rate", args.max_rate),
+                                 latency_target=settings.get("latency_target_seconds", args.latency_target),
+                                 metrics=metrics)
+    site = FixtureSite(args.site_dir) if args.site_dir else None
+    selectors = SelectorStats(selector_stats) if selector_stats else None
+    if args.serve:
+        fetcher = ConcurrentFetcher(site or functools.partial(fetch_html, cache=cache), workers=max(concurrency, 1),
+                                    per_host=per_host, rate=rate, controller=controller)
+        service = ExtractionService(args.schema, fetcher.fetch_all, backend=backend, workers=parse_workers,
+                                    max_batch=settings.get("max_batch", args.max_batch))
+        try:
+            serve(service, *args.serve)
+        finally:
+            fetcher.close()
+        return 0
+    if args.crawl:
+        try:
+            return crawl(inputs, frontier_path, output, delay, args.schema,
+                         concurrency=concurrency, per_host=per_host, rate=rate, backend=backend, cache=cache,
+                         max_depth=settings.get("max_depth", args.max_depth),
+                         max_pages=settings.get("max_pages", args.max_pages),
+                         batch_size=args.batch_size, fetcher=site, controller=controller, selectors=selectors)
+        finally:
+            if selectors is not None:
+                selectors.save()
+                selectors.log_report(logger)
+    if args.harvest_reviews:
+        fetcher = ConcurrentFetcher(site or functools.partial(fetch_html, cache=cache), workers=max(concurrency, 1),
+                                    per_host=per_host, rate=rate, controller=controller)
+        try:
+            harvester = ReviewHarvester(fetcher, args.harvest_reviews, backend=backend,
+                                        max_pages=args.max_review_pages, batch_size=args.batch_size)
+            return 1 if harvester.harvest_all(inputs) else 0
+        finally:
+            fetcher.close()
+    if args.shard and os.path.exists(done_marker(output)):
+        os.remove(done_marker(output))
+    try:
+        code = run(inputs, output, delay, args.schema,
+                   concurrency=concurrency, per_host=per_host, rate=rate,
+                   parse_workers=parse_workers, queue_size=queue_size, stream=args.stream,
+                   resume=args.resume, checkpoint_path=args.checkpoint, batch_size=args.batch_size,
+                   backend=backend, cache=cache, incremental_path=incremental,
+                   changes_path=args.changes, metrics=metrics,
+                   validate_every=settings.get("validate_every", args.validate_every),
+                   sqlite_path=sqlite_path, controller=controller,
+                   selectors=selectors)
+    finally:
+        if selectors is not None:
+            selectors.save()
+            selectors.log_report(logger)
+    if metrics is not None:
+        metrics.log_report(logger)
+        if args.metrics:
+            metrics.write_summary(args.metrics)
+        if args.prometheus:
+            metrics.write_prometheus(args.prometheus)
+    if args.shard and code == 0:
+        mark_shard_done(output, {"shard": "%d/%d" % args.shard, "inputs": inputs.read})
+    return code
 
 if __name__ == "__main__":
     sys.exit(main())
\ No newline at end of file
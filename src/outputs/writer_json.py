@@ -2,6 +2,15 @@ import json
 import os
 from typing import Any, List, Dict
 
+def json_default(obj: Any) -> Any:
+    """
+    json `default=` hook for compact records (anything with __json__()).
+    """
+    encode = getattr(obj, "__json__", None)
+    if encode is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return encode()
+
 class JsonWriter:
     def __init__(self, path: str):
         self.path = path
@@ -9,4 +18,4 @@ class JsonWriter:
 
     def write(self, items: List[Dict[str, Any]]) -> None:
         with open(self.path, "w", encoding="utf-8") as f:
-            json.dump(items, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+            json.dump(items, f, ensure_ascii=False, indent=2, default=json_default)
\ No newline at end of file
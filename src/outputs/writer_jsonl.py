@@ -0,0 +1,197 @@
+import gzip
+import json
+import logging
+import os
+import zlib
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Set
+
+from outputs.writer_json import json_default                  # type: ignore
+
+logger = logging.getLogger("g2_scraper")
+
+# What reading a gzip stream cut off by a crash raises.
+TRUNCATED_GZIP = (EOFError, zlib.error, gzip.BadGzipFile)
+
+def _open_text(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore[return-value]
+    return open(path, mode, encoding="utf-8")
+
+def _trim_partial_line(path: str) -> int:
+    """
+    Cut a plain JSONL file back to its last complete line; returns the bytes dropped.
+    """
+    with open(path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(pos - 65536, 0)
+            f.seek(start)
+            newline = f.read(pos - start).rfind(b"\n")
+            if newline >= 0:
+                pos = start + newline + 1
+                break
+            pos = start
+        if pos < end:
+            f.truncate(pos)
+        return end - pos
+
+def _repair_gzip(path: str) -> int:
+    """
+    Rewrite a JSONL.gz whose tail was cut off (a truncated gzip member, or a
+    last line without its newline) with only its complete lines, so new members
+    can be appended after it. Returns the lines dropped (0: file left untouched).
+    """
+    broken = False
+    try:
+        with gzip.open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    broken = True
+    except TRUNCATED_GZIP:
+        broken = True
+    if not broken:
+        return 0
+    dropped = 0
+    tmp = f"{path}.repair"
+    with gzip.open(path, "rb") as src, gzip.open(tmp, "wb") as out:
+        try:
+            for line in src:
+                if line.endswith(b"\n"):
+                    out.write(line)
+                else:
+                    dropped += 1
+        except TRUNCATED_GZIP:
+            dropped += 1
+    os.replace(tmp, path)
+    return dropped
+
+def repair_tail(path: str) -> None:
+    """
+    Make a JSONL(.gz) file left behind by a crash safe to append to.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    if path.endswith(".gz"):
+        dropped = _repair_gzip(path)
+        if dropped:
+            logger.warning("Dropped a truncated tail (%d partial line(s)) from %s", dropped, path)
+    else:
+        dropped = _trim_partial_line(path)
+        if dropped:
+            logger.warning("Dropped a truncated tail (%d bytes) from %s", dropped, path)
+
+class Checkpoint:
+    """
+    Append-only log of inputs whose records have been durably written.
+    """
+    def __init__(self, path: str, reset: bool = False):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if reset and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def load(self) -> Set[str]:
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, "r", encoding="utf-8") as f:
+            return {line.rstrip("\n") for line in f if line.strip()}
+
+    def mark(self, sources: List[str]) -> None:
+        if not sources:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{s}\n" for s in sources))
+            f.flush()
+            os.fsync(f.fileno())
+
+class JsonlWriter:
+    """
+    Stream records as JSON Lines (gzip-compressed when the path ends in .gz),
+    flushing every `batch_size` records. After each flush the data is fsynced
+    and the batch's sources are recorded in `checkpoint`, so a crash loses at
+    most one batch. `on_flush(sources)` is called after that, once the batch is
+    durable. With `append`, a tail left truncated by a crash is removed first
+    (see repair_tail).
+    """
+    def __init__(self, path: str, batch_size: int = 100, append: bool = False,
+                 checkpoint: Optional[Checkpoint] = None,
+                 on_flush: Optional[Callable[[List[str]], None]] = None):
+        self.path = path
+        self.batch_size = max(int(batch_size), 1)
+        self.checkpoint = checkpoint
+        self.on_flush = on_flush
+        self.count = 0
+        self._lines: List[str] = []
+        self._sources: List[str] = []
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if append:
+            repair_tail(self.path)
+        self._fh = _open_text(self.path, "a" if append else "w")
+
+    def write_record(self, record: Dict[str, Any], source: Optional[str] = None) -> None:
+        self._lines.append(json.dumps(record, ensure_ascii=False, default=json_default) + "\n")
+        if source is not None:
+            self._sources.append(source)
+        self.count += 1
+        if len(self._lines) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._lines:
+            self._fh.write("".join(self._lines))
+            self._lines = []
+        self._fh.flush()
+        if self.checkpoint is not None or self.on_flush is not None:
+            # The records must be on disk before their sources count as done.
+            os.fsync(self._fh.fileno())
+        if self.checkpoint is not None:
+            self.checkpoint.mark(self._sources)
+        if self.on_flush is not None and self._sources:
+            self.on_flush(self._sources)
+        self._sources = []
+
+    def close(self) -> None:
+        if self._fh.closed:
+            return
+        self.flush()
+        self._fh.close()
+
+    def __enter__(self) -> "JsonlWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Read records back from a JSONL(.gz) file. A line or gzip member left
+    truncated by a crash is skipped.
+    """
+    with _open_text(path, "r") as f:
+        lineno = 0
+        try:
+            for lineno, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning("Skipping unreadable line %d in %s", lineno, path)
+        except TRUNCATED_GZIP:
+            logger.warning("Skipping truncated data after line %d in %s", lineno, path)
+
+def finalize_jsonl(jsonl_path: str, json_path: str) -> int:
+    """
+    Convert a JSONL(.gz) stream into the JSON array format written by JsonWriter,
+    one record at a time. Returns the number of records written.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+    count = 0
+    with open(json_path, "w", encoding="utf-8") as out:
+        for record in iter_jsonl(jsonl_path):
+            body = json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+            out.write(("[\n  " if count == 0 else ",\n  ") + body)
+            count += 1
+        out.write("\n]" if count else "[]")
+    return count
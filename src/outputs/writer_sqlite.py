@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from outputs.writer_json import json_default                  # type: ignore
+
+# Scalar record fields stored as columns of `products` (see outputs/schema.json).
+SCALAR_FIELDS = (
+    "product_id", "product_name", "product_logo", "what_is", "product_description",
+    "positioning_against_competitor", "reviews", "rating", "company_id", "seller",
+    "company_phone", "company_location", "company_founded_year", "company_annual_revenue",
+    "company_ownership", "discussions_link", "supported_languages", "twitter",
+    "number_of_followers_on_twitter", "linkedin", "number_of_employees_on_linkedin",
+    "product_website", "company_website", "is_claimed", "g2_reviews_link",
+)
+# Lists of strings, kept as JSON text.
+JSON_FIELDS = ("screenshots", "videos", "download_links")
+STARS = ("1", "2", "3", "4", "5")
+
+# Child table -> (record field, columns); rows are keyed by (g2_link, position).
+CHILD_TABLES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "categories": ("categories", ("category_name", "category_link")),
+    "pricing_plans": ("pricing_plans", ("plan_name", "plan_description", "plan_features")),
+    "alternatives": ("alternatives", ("competitor_name", "competitor_link", "competitor_rating", "competitor_reviews")),
+    "comparisons": ("comparisons", ("link", "competitor_name")),
+    "initial_reviews": ("initial_reviews", ("review_id", "review_title", "review_rating", "publish_date", "review_link")),
+}
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS products_name ON products (product_name)",
+    "CREATE INDEX IF NOT EXISTS products_rating ON products (rating)",
+    "CREATE INDEX IF NOT EXISTS categories_link ON categories (category_link)",
+    "CREATE INDEX IF NOT EXISTS alternatives_link ON alternatives (competitor_link)",
+    "CREATE INDEX IF NOT EXISTS initial_reviews_link ON initial_reviews (review_link)",
+    "CREATE INDEX IF NOT EXISTS history_product ON history (g2_link, observed_at)",
+)
+
+def _schema() -> List[str]:
+    columns = ", ".join(
+        ["g2_link TEXT PRIMARY KEY", "source TEXT"]
+        + list(SCALAR_FIELDS)
+        + [f"{f} TEXT" for f in JSON_FIELDS]
+        + [f"star_{s} INTEGER" for s in STARS]
+        + ["record_hash TEXT NOT NULL", "first_seen REAL NOT NULL", "last_seen REAL NOT NULL"]
+    )
+    statements = [f"CREATE TABLE IF NOT EXISTS products ({columns})"]
+    for table, (_, cols) in CHILD_TABLES.items():
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS {table} (g2_link TEXT NOT NULL, position INTEGER NOT NULL, "
+            f"{', '.join(cols)}, PRIMARY KEY (g2_link, position)) WITHOUT ROWID"
+        )
+    statements.append(
+        "CREATE TABLE IF NOT EXISTS history (g2_link TEXT NOT NULL, observed_at REAL NOT NULL,"
+        " rating REAL, reviews INTEGER)"
+    )
+    return statements + list(INDEXES)
+
+class SqliteWriter:
+    """
+    Upsert normalized records into SQLite, keyed by g2_link (the input source
+    when a record has none), with one child table per nested list.
+
+    Records are buffered and written `batch_size` at a time, each batch in one
+    transaction. A record whose content hash is unchanged only bumps last_seen;
+    a changed one has its child rows replaced. A `history` row is added whenever
+    rating or review count differs from the product's previous values.
+    Same write_record/flush/close interface as JsonlWriter.
+    """
+
+    def __init__(self, path: str, batch_size: int = 100):
+        self.path = path
+        self.batch_size = max(int(batch_size), 1)
+        self.count = 0
+        self._pending: List[Tuple[Dict[str, Any], Optional[str]]] = []
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            for statement in _schema():
+                self.db.execute(statement)
+
+        names = ["g2_link", "source", *SCALAR_FIELDS, *JSON_FIELDS, *(f"star_{s}" for s in STARS),
+                 "record_hash", "first_seen", "last_seen"]
+        updates = ", ".join(f"{n} = excluded.{n}" for n in names if n not in ("g2_link", "first_seen"))
+        self._upsert = (
+            f"INSERT INTO products ({', '.join(names)}) VALUES ({', '.join('?' * len(names))}) "
+            f"ON CONFLICT (g2_link) DO UPDATE SET {updates}"
+        )
+        self._inserts = {
+            table: f"INSERT INTO {table} (g2_link, position, {', '.join(cols)}) "
+                   f"VALUES ({', '.join('?' * (len(cols) + 2))})"
+            for table, (_, cols) in CHILD_TABLES.items()
+        }
+
+    def write_record(self, record: Dict[str, Any], source: Optional[str] = None) -> None:
+        self._pending.append((record, source))
+        self.count += 1
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def _product_row(self, key: str, record: Dict[str, Any], source: Optional[str],
+                     digest: str, now: float) -> List[Any]:
+        stars = record.get("star_distribution") or {}
+        return ([key, source]
+                + [record.get(f) for f in SCALAR_FIELDS]
+                + [json.dumps(record.get(f) or [], ensure_ascii=False) for f in JSON_FIELDS]
+                + [stars.get(s) for s in STARS]
+                + [digest, now, now])
+
+    def _write(self, record: Dict[str, Any], source: Optional[str], now: float) -> None:
+        key = record.get("g2_link") or source
+        if not key:
+            raise ValueError("record has neither g2_link nor source")
+        digest = hashlib.blake2b(json.dumps(record, ensure_ascii=False, sort_keys=True,
+                                            default=json_default).encode("utf-8"),
+                                 digest_size=16).hexdigest()
+        row = self.db.execute("SELECT record_hash, rating, reviews FROM products WHERE g2_link = ?", (key,)).fetchone()
+        if row is not None and row[0] == digest:
+            self.db.execute("UPDATE products SET last_seen = ?, source = ? WHERE g2_link = ?", (now, source, key))
+            return
+        if row is None or (row[1], row[2]) != (record.get("rating"), record.get("reviews")):
+            self.db.execute("INSERT INTO history (g2_link, observed_at, rating, reviews) VALUES (?, ?, ?, ?)",
+                            (key, now, record.get("rating"), record.get("reviews")))
+        self.db.execute(self._upsert, self._product_row(key, record, source, digest, now))
+        for table, (field, cols) in CHILD_TABLES.items():
+            if row is not None:
+                self.db.execute(f"DELETE FROM {table} WHERE g2_link = ?", (key,))
+            rows = [
+                [key, i] + [json.dumps(item.get(c), ensure_ascii=False) if c == "plan_features" else item.get(c)
+                            for c in cols]
+                for i, item in enumerate(record.get(field) or [])
+            ]
+            if rows:
+                self.db.executemany(self._inserts[table], rows)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        now = time.time()
+        with self.db:
+            for record, source in self._pending:
+                self._write(record, source, now)
+        self._pending = []
+
+    def close(self) -> None:
+        if self.db is None:
+            return
+        self.flush()
+        self.db.close()
+        self.db = None
+
+    def __enter__(self) -> "SqliteWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
@@ -0,0 +1,94 @@
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from extractors.backends import get_backend                   # type: ignore
+from extractors.page_index import PageIndex                   # type: ignore
+from outputs.writer_jsonl import JsonlWriter                  # type: ignore
+from pipelines.frontier import DONE, FAILED, Frontier         # type: ignore
+
+logger = logging.getLogger("g2_scraper")
+
+PageItem = Tuple[str, Optional[str], Optional[BaseException]]
+
+def record_links(record: Dict[str, Any]) -> List[str]:
+    """
+    Outgoing G2 links of a product record: categories, alternatives, comparisons.
+    """
+    links = [c.get("category_link") for c in record.get("categories") or []]
+    links += [a.get("competitor_link") for a in record.get("alternatives") or []]
+    links += [c.get("link") for c in record.get("comparisons") or []]
+    return [link for link in links if link]
+
+class Crawler:
+    """
+    Discovery crawl: product pages become records and feed their category,
+    alternative and comparison links back into the frontier; category and
+    comparison pages only contribute links.
+
+    Work is done in batches of `batch_size` URLs popped from the frontier and
+    fetched through `fetch_pages` (e.g. iter_pages, so concurrency and caching
+    apply). The batch's records are flushed before the frontier commits, so a
+    restarted crawl never loses a page (at worst it re-emits the last batch).
+    """
+
+    def __init__(self, frontier: Frontier, fetch_pages: Callable[[List[str]], Iterable[PageItem]],
+                 process: Callable[[str, str], Dict[str, Any]], backend: str = "soup",
+                 max_depth: int = 2, max_pages: Optional[int] = None, batch_size: int = 8):
+        self.frontier = frontier
+        self.fetch_pages = fetch_pages
+        self.process = process
+        self.backend = get_backend(backend)
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.batch_size = max(int(batch_size), 1)
+
+    def _links(self, html: str, url: str, kind: str) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+        if kind == "product":
+            record = self.process(html, url)
+            return record, record_links(record)
+        index = PageIndex(self.backend.parse(html), self.backend)
+        return None, [href for href, _ in index.anchors]
+
+    def _budget(self) -> Optional[int]:
+        if self.max_pages is None:
+            return None
+        return self.max_pages - self.frontier.count(DONE) - self.frontier.count(FAILED)
+
+    def run(self, seeds: Iterable[str], writer: JsonlWriter) -> Dict[str, int]:
+        """
+        Crawl from `seeds` (ignored if already known) until the frontier is
+        empty or the page budget is spent; records go to `writer`.
+        """
+        self.frontier.add_many(seeds, depth=0)
+        self.frontier.commit()
+        stats = {"pages": 0, "records": 0, "failed": 0, "discovered": 0}
+        while True:
+            budget = self._budget()
+            limit = self.batch_size if budget is None else min(self.batch_size, budget)
+            if limit <= 0:
+                break
+            batch = {url: (kind, depth) for url, kind, depth in self.frontier.pop(limit)}
+            if not batch:
+                break
+            for src, html, error in self.fetch_pages(list(batch)):
+                kind, depth = batch[src]
+                stats["pages"] += 1
+                try:
+                    if error is not None:
+                        raise error
+                    record, links = self._links(html, src, kind)
+                except Exception as e:
+                    logger.error("Failed to crawl %s: %s", src, e, exc_info=e)
+                    self.frontier.mark(src, ok=False)
+                    stats["failed"] += 1
+                    continue
+                if record is not None:
+                    writer.write_record(record, source=src)
+                    stats["records"] += 1
+                if depth < self.max_depth:
+                    stats["discovered"] += self.frontier.add_many(links, depth + 1, base=src)
+                self.frontier.mark(src)
+                logger.info("Crawled %s (%s, depth %d)", src, kind, depth)
+            writer.flush()
+            self.frontier.commit()
+        return stats
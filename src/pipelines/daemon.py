@@ -0,0 +1,250 @@
+import json
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+from extractors.backends import get_backend                   # type: ignore
+from extractors.page_record import extract_record             # type: ignore
+from pipelines.normalize import normalize_record              # type: ignore
+from pipelines.validators import SchemaValidator              # type: ignore
+
+logger = logging.getLogger("g2_scraper")
+
+PageItem = Tuple[str, Optional[str], Optional[BaseException]]
+
+WARMUP_HTML = "<html><head><title>warmup</title></head><body><h1>warmup</h1></body></html>"
+
+def parse_address(spec: str) -> Tuple[str, int]:
+    """
+    "[host:]port" -> (host, port); the host defaults to 127.0.0.1.
+    """
+    host, _, port = spec.rpartition(":")
+    try:
+        return host or "127.0.0.1", int(port)
+    except ValueError:
+        raise ValueError(f"address must look like [host:]port, got {spec!r}")
+
+def process_page(html: Union[str, bytes], url: str, backend: str = "soup") -> Dict[str, Any]:
+    return normalize_record(extract_record(html, url, backend=backend), in_place=True)
+
+def _warm_worker(backend: str) -> None:
+    # Pay for imports and first-parse setup before the first request arrives.
+    process_page(WARMUP_HTML, "https://www.g2.com/products/warmup/reviews", backend)
+
+class ExtractionService:
+    """
+    Warm extraction state kept across requests: the backend, the compiled schema
+    validator, a page fetcher and (with `workers` > 0) a process pool whose
+    workers have already imported and exercised the extractors.
+
+    `fetch_pages(urls)` yields (source, html, error) like iter_pages, so the
+    caller decides on concurrency, caching and retries. Items are dicts with
+    a "url", plus "html" when the page is supplied instead of fetched. Each
+    result is {"source", "record"} or {"source", "error"}, in item order.
+    """
+
+    def __init__(self, schema_path: str, fetch_pages: Callable[[List[str]], Iterable[PageItem]],
+                 backend: str = "soup", workers: int = 0, max_batch: int = 100):
+        self.validator = SchemaValidator(schema_path)
+        self.fetch_pages = fetch_pages
+        self.backend = get_backend(backend).name
+        self.max_batch = max(int(max_batch), 1)
+        self.workers = workers
+        self.pool: Optional[ProcessPoolExecutor] = self._new_pool() if workers > 0 else None
+        _warm_worker(self.backend)
+        self.served = 0
+        self.restarts = 0
+        self.lock = threading.Lock()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn: the pool is (re)started from a process already running server threads,
+        # and a forked child could inherit a lock one of them holds.
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker, initargs=(self.backend,),
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """
+        Replace a pool whose worker died (every pending and future submit on it
+        fails with BrokenProcessPool) with a freshly warmed one. Concurrent
+        requests that saw the same pool break only restart it once.
+        """
+        with self.lock:
+            if self.pool is not broken:
+                return
+            logger.warning("Extraction worker died; restarting the process pool")
+            self.pool = self._new_pool()
+            self.restarts += 1
+        broken.shutdown(wait=False)
+
+    @staticmethod
+    def check_item(item: Any) -> Optional[str]:
+        if not isinstance(item, dict):
+            return "each item must be an object"
+        if not isinstance(item.get("url", ""), str) or not isinstance(item.get("html", ""), str):
+            return "url and html must be strings"
+        if not item.get("url") and "html" not in item:
+            return "each item needs a url or html"
+        return None
+
+    def _extract(self, html: str, url: str) -> Tuple[Optional[ProcessPoolExecutor], Any]:
+        """
+        (pool it was submitted to, Future) with a pool, (None, record) without.
+        """
+        pool = self.pool
+        if pool is None:
+            return None, process_page(html, url, self.backend)
+        try:
+            return pool, pool.submit(process_page, html, url, self.backend)
+        except BrokenProcessPool:
+            self._restart(pool)
+            pool = self.pool
+            return pool, pool.submit(process_page, html, url, self.backend)
+
+    def _result(self, source: str, pool: Optional[ProcessPoolExecutor], pending: Any) -> Dict[str, Any]:
+        try:
+            record = pending.result() if isinstance(pending, Future) else pending
+        except BrokenProcessPool as e:
+            self._restart(pool)
+            return {"source": source, "error": f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            return {"source": source, "error": f"{type(e).__name__}: {e}"}
+        error = self.validator.first_error(record)
+        if error is not None:
+            return {"source": source, "error": f"ValidationError: {error}"}
+        return {"source": source, "record": record}
+
+    def handle(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Fetch (where needed), extract, normalize and validate a batch of items.
+        """
+        urls = [item["url"] for item in items if "html" not in item]
+        pages: Dict[str, Tuple[Optional[str], Optional[BaseException]]] = {}
+        if urls:
+            pages = {src: (html, error) for src, html, error in self.fetch_pages(list(dict.fromkeys(urls)))}
+
+        pending: List[Tuple[str, Optional[ProcessPoolExecutor], Any]] = []
+        for item in items:
+            source = item.get("url", "")
+            if "html" in item:
+                html: Optional[str] = item["html"]
+                error: Optional[BaseException] = None
+            else:
+                html, error = pages[source]
+            if error is not None:
+                pending.append((source, None, error))
+                continue
+            try:
+                pending.append((source, *self._extract(html, source)))
+            except Exception as e:
+                pending.append((source, None, e))
+
+        results = [{"source": source, "error": f"{type(p).__name__}: {p}"} if isinstance(p, BaseException)
+                   else self._result(source, pool, p) for source, pool, p in pending]
+        with self.lock:
+            self.served += len(results)
+        return results
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    GET /health -> status; POST /extract with a JSON item, a JSON list of items,
+    newline-separated URLs (text/plain) or a raw page (text/html, ?url=...).
+    """
+    server: "ExtractionServer"
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if urlsplit(self.path).path != "/health":
+            self._send(404, {"error": "not found"})
+            return
+        service = self.server.service
+        self._send(200, {"status": "ok", "backend": service.backend, "served": service.served,
+                         "restarts": service.restarts})
+
+    def _content_length(self) -> Optional[int]:
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            return None
+        return length if length >= 0 else None
+
+    def _items(self, length: int) -> Tuple[List[Dict[str, Any]], bool]:
+        query = parse_qs(urlsplit(self.path).query)
+        body = self.rfile.read(length).decode("utf-8", "replace")
+        ctype = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if ctype == "text/html":
+            return [{"url": query.get("url", [""])[0], "html": body}], True
+        if ctype == "text/plain":
+            return [{"url": line.strip()} for line in body.splitlines() if line.strip()], False
+        payload = json.loads(body)
+        return ([payload], True) if isinstance(payload, dict) else (payload, False)
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/extract":
+            self._send(404, {"error": "not found"})
+            return
+        service = self.server.service
+        length = self._content_length()
+        if length is None:
+            # The body cannot be skipped without a length, so the connection cannot be reused.
+            self.close_connection = True
+            self._send(400, {"error": "invalid Content-Length"})
+            return
+        try:
+            items, single = self._items(length)
+        except ValueError as e:
+            self._send(400, {"error": f"invalid JSON: {e}"})
+            return
+        if not isinstance(items, list):
+            self._send(400, {"error": "expected an object or a list of objects"})
+            return
+        problem = next((p for p in map(service.check_item, items) if p), None)
+        if problem:
+            self._send(400, {"error": problem})
+            return
+        if len(items) > service.max_batch:
+            self._send(413, {"error": f"at most {service.max_batch} items per request"})
+            return
+        results = service.handle(items)
+        self._send(200, results[0] if single else {"results": results})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+class ExtractionServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: ExtractionService):
+        super().__init__(address, _Handler)
+        self.service = service
+
+def serve(service: ExtractionService, host: str = "127.0.0.1", port: int = 8765) -> None:
+    """
+    Serve `service` over HTTP until interrupted.
+    """
+    server = ExtractionServer((host, port), service)
+    logger.info("Serving extraction on http://%s:%d (POST /extract, GET /health)", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,136 @@
+import re
+import sqlite3
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+_PRODUCT_PATH = re.compile(r"^/products/([^/]+)")
+_CATEGORY_PATH = re.compile(r"^/categories/([^/]+)$")
+_COMPARE_PATH = re.compile(r"^/compare/([^/]+)$")
+_TRACKING_PARAMS = ("utm_", "gclid", "fbclid", "ref")
+# Already-canonical URLs (lowercase host, no port/query/fragment/empty segments;
+# product pages in /products/<slug>/reviews form) skip the urllib round trip.
+_CANONICAL = re.compile(r"https?://[a-z0-9.-]+(?:/[^/?#\s]+)+")
+_CANONICAL_PRODUCT = re.compile(r"https?://[a-z0-9.-]+/products/[^/?#\sA-Z]+/reviews")
+
+# Crawl order: product pages yield records, category and comparison pages only links.
+KIND_PRIORITY = {"product": 2, "category": 1, "compare": 0}
+
+PENDING, IN_FLIGHT, DONE, FAILED = 0, 1, 2, 3
+
+def canonicalize_url(url: str, base: Optional[str] = None) -> str:
+    """
+    Canonical form used for the seen-set: lowercase scheme/host, no default port,
+    fragment or tracking parameters, sorted query, no trailing slash. Product URLs
+    collapse to https://host/products/<slug>/reviews.
+    """
+    url = urljoin(base, url.strip()) if base else url.strip()
+    if _CANONICAL.fullmatch(url) and ("/products/" not in url or _CANONICAL_PRODUCT.fullmatch(url)):
+        return url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:  # unparseable port: keep the netloc as written
+        host, port = parts.netloc.lower(), None
+    if port and (scheme, port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{port}"
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                   if not k.lower().startswith(_TRACKING_PARAMS))
+    m = _PRODUCT_PATH.match(path)
+    if m:
+        path, query = f"/products/{m.group(1).lower()}/reviews", []
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+def page_kind(url: str) -> Optional[str]:
+    """
+    "product", "category" or "compare" for G2 pages worth crawling, else None.
+    """
+    path = urlsplit(url).path
+    if _PRODUCT_PATH.match(path):
+        return "product"
+    if _CATEGORY_PATH.match(path):
+        return "category"
+    if _COMPARE_PATH.match(path):
+        return "compare"
+    return None
+
+class Frontier:
+    """
+    Prioritized crawl frontier and seen-set in one SQLite table, so the set of
+    known URLs lives on disk rather than in memory.
+
+    Every canonical URL is stored once with its depth, priority and state.
+    `pop()` hands out pending URLs by priority (then discovery order) and marks
+    them in flight; `commit()` makes discoveries and completions durable. URLs
+    left in flight by a crashed run are pending again when the file is reopened.
+    With `hosts`, only URLs on those hosts are accepted.
+    """
+
+    def __init__(self, path: str, hosts: Optional[Iterable[str]] = None):
+        self.path = path
+        self.hosts = {h.lower() for h in hosts} if hosts else None
+        self.db = sqlite3.connect(path)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, kind TEXT NOT NULL,"
+                " depth INTEGER NOT NULL, priority INTEGER NOT NULL, state INTEGER NOT NULL,"
+                " seq INTEGER NOT NULL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS urls_pending ON urls (state, priority DESC, seq)")
+            self.db.execute("UPDATE urls SET state = ? WHERE state = ?", (PENDING, IN_FLIGHT))
+        row = self.db.execute("SELECT COALESCE(MAX(seq), 0) FROM urls").fetchone()
+        self._seq = row[0]
+
+    def add(self, url: str, depth: int, base: Optional[str] = None) -> bool:
+        """
+        Queue `url` (canonicalized, relative to `base`) unless seen before or not
+        a crawlable page. Returns True if it was new.
+        """
+        canonical = canonicalize_url(url, base)
+        kind = page_kind(canonical)
+        if kind is None or (self.hosts is not None and urlsplit(canonical).netloc not in self.hosts):
+            return False
+        self._seq += 1
+        cur = self.db.execute(
+            "INSERT OR IGNORE INTO urls (url, kind, depth, priority, state, seq) VALUES (?, ?, ?, ?, ?, ?)",
+            (canonical, kind, depth, KIND_PRIORITY[kind], PENDING, self._seq),
+        )
+        return cur.rowcount > 0
+
+    def add_many(self, urls: Iterable[str], depth: int, base: Optional[str] = None) -> int:
+        return sum(self.add(url, depth, base) for url in urls if url)
+
+    def pop(self, limit: int) -> List[Tuple[str, str, int]]:
+        """
+        Up to `limit` pending (url, kind, depth), highest priority first, marked in flight.
+        """
+        rows = self.db.execute(
+            "SELECT url, kind, depth FROM urls WHERE state = ? ORDER BY priority DESC, seq LIMIT ?",
+            (PENDING, limit),
+        ).fetchall()
+        self.db.executemany("UPDATE urls SET state = ? WHERE url = ?", [(IN_FLIGHT, r[0]) for r in rows])
+        return rows
+
+    def mark(self, url: str, ok: bool = True) -> None:
+        self.db.execute("UPDATE urls SET state = ? WHERE url = ?", (DONE if ok else FAILED, url))
+
+    def commit(self) -> None:
+        self.db.commit()
+
+    def count(self, state: Optional[int] = None, kind: Optional[str] = None) -> int:
+        sql, params = "SELECT COUNT(*) FROM urls WHERE 1 = 1", []
+        if state is not None:
+            sql += " AND state = ?"
+            params.append(state)
+        if kind is not None:
+            sql += " AND kind = ?"
+            params.append(kind)
+        return self.db.execute(sql, params).fetchone()[0]
+
+    def close(self) -> None:
+        self.db.commit()
+        self.db.close()
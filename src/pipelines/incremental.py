@@ -0,0 +1,104 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+PageItem = Tuple[str, Optional[str], Optional[BaseException]]
+
+def content_hash(html: Any) -> str:
+    data = html.encode("utf-8") if isinstance(html, str) else html
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+class IncrementalState:
+    """
+    Per-input state for incremental re-scrapes, kept in SQLite:
+    the hash of the last processed HTML and the last emitted record.
+
+    `skip_unchanged()` drops pages whose HTML hash matches the stored one before
+    they reach parsing/validation. `diff()` returns the fields that changed since
+    the previous run (empty dict = nothing changed) and stages the new record;
+    `save()` stores it once the output is durable.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.db:
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS pages (source TEXT PRIMARY KEY, html_hash TEXT NOT NULL,"
+                " record TEXT, updated_at REAL NOT NULL)"
+            )
+        self.pending: Dict[str, str] = {}
+        self.staged: Dict[str, Tuple[str, str]] = {}
+        self.unchanged = 0
+
+    def _stored_hash(self, source: str) -> Optional[str]:
+        with self.lock:
+            row = self.db.execute("SELECT html_hash FROM pages WHERE source = ?", (source,)).fetchone()
+        return row[0] if row else None
+
+    def skip_unchanged(self, pages: Iterable[PageItem],
+                       on_skip: Optional[Callable[[str], None]] = None) -> Iterator[PageItem]:
+        for src, html, error in pages:
+            if error is None:
+                digest = content_hash(html)
+                if digest == self._stored_hash(src):
+                    self.unchanged += 1
+                    if on_skip is not None:
+                        on_skip(src)
+                    continue
+                self.pending[src] = digest
+            yield src, html, error
+
+    def diff(self, source: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Return {field: {"old": ..., "new": ...}} for every field of `record` that
+        changed since the stored one, or {"*": "new"} the first time a source is
+        seen. The new state is only staged: save() stores it once the record has
+        been durably written, so a crash never marks an unwritten page unchanged.
+        """
+        digest = self.pending.pop(source, None)
+        encoded = json.dumps(record, ensure_ascii=False, sort_keys=True)
+        with self.lock:
+            row = self.db.execute("SELECT html_hash, record FROM pages WHERE source = ?", (source,)).fetchone()
+            if digest is None:
+                # Repeated input within one run: its hash came with the first occurrence
+                staged = self.staged.get(source)
+                digest = staged[0] if staged else (row[0] if row else "")
+            self.staged[source] = (digest, encoded)
+        if row is None or row[1] is None:
+            return {"*": "new"}
+        previous = json.loads(row[1])
+        current = json.loads(encoded)
+        return {
+            k: {"old": previous.get(k), "new": current.get(k)}
+            for k in sorted(set(previous) | set(current))
+            if previous.get(k) != current.get(k)
+        }
+
+    def save(self, sources: Optional[Iterable[str]] = None) -> None:
+        """
+        Store the staged state of `sources` (default: everything staged).
+        """
+        with self.lock:
+            keys = list(self.staged) if sources is None else [s for s in sources if s in self.staged]
+            if not keys:
+                return
+            now = time.time()
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO pages (source, html_hash, record, updated_at) VALUES (?, ?, ?, ?)",
+                    [(src, *self.staged.pop(src), now) for src in keys],
+                )
+
+    def forget(self, source: str) -> None:
+        """
+        Drop the pending hash of a page that failed, so the next run retries it.
+        """
+        self.pending.pop(source, None)
+
+    def close(self) -> None:
+        with self.lock:
+            self.db.close()
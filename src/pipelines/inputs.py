@@ -0,0 +1,184 @@
+import gzip
+import hashlib
+import logging
+import math
+import os
+import sys
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit, urlunsplit
+
+from fetchers.archives import iter_archive                    # type: ignore
+from pipelines.sharding import shard_of                       # type: ignore
+
+logger = logging.getLogger("g2_scraper")
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings (blake2b, double hashing).
+    `capacity` items fit at about `error_rate` false positives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.capacity = max(int(capacity), 1)
+        self.bits = max(int(-self.capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(int(round(self.bits / self.capacity * math.log(2))), 1)
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def positions(self, h1: int, h2: int) -> List[int]:
+        bits = self.bits
+        return [(h1 + i * h2) % bits for i in range(self.hashes)]
+
+    def contains(self, positions: List[int]) -> bool:
+        array = self.array
+        for p in positions:
+            if not array[p >> 3] & (1 << (p & 7)):
+                return False
+        return True
+
+    def add(self, positions: List[int]) -> None:
+        array = self.array
+        for p in positions:
+            array[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+def _double_hash(item: str) -> Tuple[int, int]:
+    digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+class SeenFilter:
+    """
+    Scalable Bloom filter: when the current layer is full a new one with twice
+    the capacity and half the error rate is added, so the overall false-positive
+    rate stays under 2 * `error_rate` at a few bytes per distinct item.
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 1e-6):
+        self.error_rate = error_rate
+        self.layers: List[BloomFilter] = [BloomFilter(capacity, error_rate)]
+
+    def add(self, item: str) -> bool:
+        """
+        Add `item`; True if it was (probably) seen before.
+        """
+        h1, h2 = _double_hash(item)
+        for layer in self.layers:
+            if layer.contains(layer.positions(h1, h2)):
+                return True
+        layer = self.layers[-1]
+        if layer.count >= layer.capacity:
+            layer = BloomFilter(layer.capacity * 2, self.error_rate / 2 ** len(self.layers))
+            self.layers.append(layer)
+        layer.add(layer.positions(h1, h2))
+        return False
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(layer.array) for layer in self.layers)
+
+def input_key(source: str) -> str:
+    """
+    Exact identity of an input for dedupe: a URL with its scheme and host
+    lowercased and the fragment dropped (path and query kept as written, so
+    review pages and sub-pages stay distinct), or a normalized local path.
+    """
+    if source[:8].lower().startswith(("http://", "https://")):
+        parts = urlsplit(source)
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+    return os.path.normpath(source)
+
+class InputStream:
+    """
+    Lazy iterator over an inputs file: one URL or local path per line, blank
+    lines and #comments skipped. "-" reads stdin; a .gz path is decompressed.
+
+    With `dedupe`, repeated inputs (compared by input_key) are dropped through
+    a SeenFilter, so memory stays flat however long the list is; every dropped
+    input is logged, since a Bloom false positive looks like a repeat. Progress
+    is the byte offset into the (compressed) file rather than a line count.
+    With `shard` (i, N), only inputs hashed to shard i are yielded.
+    """
+
+    def __init__(self, path: str, dedupe: bool = False, capacity: int = 1_000_000,
+                 error_rate: float = 1e-6, shard: Optional[Tuple[int, int]] = None):
+        self.path = path
+        self.shard = shard
+        self.seen = SeenFilter(capacity, error_rate) if dedupe else None
+        self.read = 0
+        self.duplicates = 0
+        self.offset = 0
+        self.size: Optional[int] = None
+
+    def _open(self) -> BinaryIO:
+        if self.path == "-":
+            return sys.stdin.buffer
+        raw = open(self.path, "rb")
+        self.size = os.fstat(raw.fileno()).st_size
+        return raw
+
+    def __iter__(self) -> Iterator[str]:
+        raw = self._open()
+        stream: BinaryIO = gzip.GzipFile(fileobj=raw) if self.path.endswith(".gz") else raw
+        counted = self.path == "-"
+        try:
+            for line in stream:
+                self.offset = self.offset + len(line) if counted else raw.tell()
+                src = line.decode("utf-8", errors="replace").strip()
+                if not src or src.startswith("#"):
+                    continue
+                if self.shard is not None and shard_of(src, self.shard[1]) != self.shard[0]:
+                    continue
+                self.read += 1
+                if self.seen is not None and self.seen.add(input_key(src)):
+                    self.duplicates += 1
+                    logger.info("Dropped repeated input: %s", src)
+                    continue
+                yield src
+        finally:
+            if stream is not raw:
+                stream.close()
+            if raw is not sys.stdin.buffer:
+                raw.close()
+
+    def progress(self) -> str:
+        if self.size:
+            return f"{100.0 * self.offset / self.size:.1f}% of {self.path}"
+        return f"{self.offset} bytes of {self.path}"
+
+class ArchiveStream:
+    """
+    Pages straight out of WARC(.gz) / tar(.gz) archives as (source, html bytes,
+    None) items, ready for the parse stage without fetching or decoding.
+    Sources are WARC target URIs or "<archive>!<member>" paths; with `shard`
+    (i, N), only pages hashed to shard i are yielded.
+    """
+
+    def __init__(self, paths: List[str], shard: Optional[Tuple[int, int]] = None):
+        self.paths = list(paths)
+        self.shard = shard
+        self.read = 0
+        self.current: Optional[str] = None
+
+    def __iter__(self) -> Iterator[Tuple[str, bytes, None]]:
+        for path in self.paths:
+            self.current = path
+            for src, data in iter_archive(path):
+                if self.shard is not None and shard_of(src, self.shard[1]) != self.shard[0]:
+                    continue
+                self.read += 1
+                yield src, data, None
+
+    def progress(self) -> str:
+        if self.current is None:
+            return "0 archives read"
+        return f"archive {self.paths.index(self.current) + 1}/{len(self.paths)} ({self.current})"
+
+def progress_label(inputs: Union[InputStream, ArchiveStream, Iterable[str]], done: int) -> str:
+    """
+    "<done>, <progress>" for an InputStream or ArchiveStream, "<done>/<total>" for a list.
+    """
+    if isinstance(inputs, (InputStream, ArchiveStream)):
+        return f"{done}, {inputs.progress()}"
+    if isinstance(inputs, list):
+        return f"{done}/{len(inputs)}"
+    return str(done)
@@ -0,0 +1,236 @@
+import heapq
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+STAGES = ("fetch", "parse", "parse_product_profile", "parse_reviews", "parse_competitive",
+          "parse_pricing", "normalize", "validate", "write")
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list (q in 0..100).
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+RESERVOIR_SIZE = 1024
+
+class StageStats:
+    """
+    Bounded summary of one stage's timings: exact count, total and max, plus a
+    uniform reservoir sample of at most RESERVOIR_SIZE values for percentiles,
+    so memory does not grow with the length of the run.
+    """
+    def __init__(self, size: int = RESERVOIR_SIZE, seed: int = 0):
+        self.size = size
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.sample: List[float] = []
+        self._rng = random.Random(seed)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.sample) < self.size:
+            self.sample.append(seconds)
+        else:
+            slot = self._rng.randrange(self.count)
+            if slot < self.size:
+                self.sample[slot] = seconds
+
+    def summary(self) -> Dict[str, float]:
+        ordered = sorted(self.sample)
+        return {
+            "count": self.count,
+            "total": self.total,
+            "p50": percentile(ordered, 50),
+            "p95": percentile(ordered, 95),
+            "p99": percentile(ordered, 99),
+            "max": self.max,
+        }
+
+class RunMetrics:
+    """
+    Per-stage latency, throughput and HTTP counters for one run.
+
+    Stage timings are recorded per source; `finish_source()` folds them into the
+    run totals and keeps the `slowest` sources by total time. Each stage keeps a
+    bounded StageStats, not every sample. Safe to call from
+    the fetch threads and the pipeline consumer at the same time.
+    """
+    enabled = True
+
+    def __init__(self, slowest: int = 10):
+        self.slowest_n = slowest
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.stages: Dict[str, StageStats] = {}
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, float] = {}
+        self.pages = 0
+        self._pending: Dict[str, Dict[str, float]] = {}
+        self._slowest: List[Tuple[float, int, str, Dict[str, float]]] = []
+        self._seq = itertools.count()
+
+    def observe(self, stage: str, source: str, seconds: float) -> None:
+        with self.lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.add(seconds)
+            pending = self._pending.setdefault(source, {})
+            pending[stage] = pending.get(stage, 0.0) + seconds
+
+    def observe_many(self, source: str, timings: Dict[str, float]) -> None:
+        for stage, seconds in timings.items():
+            self.observe(stage, source, seconds)
+
+    @contextmanager
+    def timed(self, stage: str, source: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, source, time.perf_counter() - start)
+
+    def count(self, name: str, value: float = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        with self.lock:
+            self.gauges[name] = value
+
+    def observe_response(self, resp: Any) -> None:
+        """
+        requests.Response hook: status counts and bytes downloaded.
+        """
+        self.count(f"http_status_{resp.status_code}")
+        self.count("bytes_downloaded", len(resp.content or b""))
+
+    def finish_source(self, source: str, ok: bool = True) -> None:
+        with self.lock:
+            timings = self._pending.pop(source, {})
+            if ok:
+                self.pages += 1
+            else:
+                self.counters["errors"] = self.counters.get("errors", 0) + 1
+            entry = (sum(timings.values()), next(self._seq), source, timings)
+            if len(self._slowest) < self.slowest_n:
+                heapq.heappush(self._slowest, entry)
+            elif self.slowest_n and entry[0] > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def skip_source(self, source: str) -> None:
+        """
+        Drop the timings of a source that will never reach finish_source() (e.g.
+        an unchanged page skipped by incremental mode), counting it as skipped.
+        """
+        with self.lock:
+            self._pending.pop(source, None)
+            self.counters["skipped"] = self.counters.get("skipped", 0) + 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            stages = {stage: stats.summary() for stage, stats in self.stages.items()}
+            slowest = sorted(self._slowest, key=lambda e: e[0], reverse=True)
+            return {
+                "pages": self.pages,
+                "elapsed_seconds": elapsed,
+                "pages_per_second": self.pages / elapsed if elapsed > 0 else 0.0,
+                "stages": stages,
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "slowest": [{"source": s, "seconds": t, "stages": st} for t, _, s, st in slowest],
+            }
+
+    def write_summary(self, path: str) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def write_prometheus(self, path: str, prefix: str = "g2_scraper") -> None:
+        """
+        Write a node_exporter textfile-collector file (atomically, via rename).
+        """
+        summary = self.summary()
+        lines = [f"# TYPE {prefix}_stage_seconds summary"]
+        for stage, s in sorted(summary["stages"].items()):
+            for q, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99")):
+                lines.append(f'{prefix}_stage_seconds{{stage="{stage}",quantile="{q}"}} {s[key]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {s["total"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+        lines.append(f"# TYPE {prefix}_http_responses_total counter")
+        for name, value in sorted(summary["counters"].items()):
+            if name.startswith("http_status_"):
+                lines.append(f'{prefix}_http_responses_total{{status="{name[12:]}"}} {value:g}')
+        for name, value in sorted(summary["counters"].items()):
+            if not name.startswith("http_status_"):
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                lines.append(f"{prefix}_{name}_total {value:g}")
+        for name, value in sorted(summary["gauges"].items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            lines.append(f"{prefix}_{name} {value:g}")
+        lines.append(f"# TYPE {prefix}_pages_total counter")
+        lines.append(f"{prefix}_pages_total {summary['pages']}")
+        lines.append(f"# TYPE {prefix}_pages_per_second gauge")
+        lines.append(f"{prefix}_pages_per_second {summary['pages_per_second']:.6f}")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp, path)
+
+    def log_report(self, logger: logging.Logger) -> None:
+        summary = self.summary()
+        logger.info("Metrics: %d pages in %.1fs (%.2f pages/sec)",
+                    summary["pages"], summary["elapsed_seconds"], summary["pages_per_second"])
+        for stage in sorted(summary["stages"], key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+            s = summary["stages"][stage]
+            logger.info("  %-22s p50=%.1fms p95=%.1fms p99=%.1fms n=%d",
+                        stage, s["p50"] * 1000, s["p95"] * 1000, s["p99"] * 1000, s["count"])
+        for entry in summary["slowest"]:
+            logger.info("  slow: %.3fs %s", entry["seconds"], entry["source"])
+
+class NullMetrics:
+    """
+    Disabled metrics: same interface, nothing recorded.
+    """
+    enabled = False
+
+    def observe(self, stage: str, source: str, seconds: float) -> None:
+        pass
+
+    def observe_many(self, source: str, timings: Dict[str, float]) -> None:
+        pass
+
+    @contextmanager
+    def timed(self, stage: str, source: str) -> Iterator[None]:
+        yield
+
+    def count(self, name: str, value: float = 1) -> None:
+        pass
+
+    def gauge(self, name: str, value: float) -> None:
+        pass
+
+    def observe_response(self, resp: Any) -> None:
+        pass
+
+    def finish_source(self, source: str, ok: bool = True) -> None:
+        pass
+
+    def skip_source(self, source: str) -> None:
+        pass
@@ -10,11 +10,17 @@ CORE_FIELDS = [
     "comparisons", "star_distribution", "g2_reviews_link", "initial_reviews"
 ]
 
-def normalize_record(record: Dict[str, Any]) -> Dict[str, Any]:
+def normalize_record(record: Dict[str, Any], in_place: bool = False) -> Dict[str, Any]:
     """
     Normalize field types and ensure all core fields exist.
+    With `in_place`, a record that already has exactly the core fields in order
+    (as extract_record returns them) is fixed up and returned itself instead of
+    being copied; other records are still rebuilt.
     """
-    normalized: Dict[str, Any] = {k: record.get(k) for k in CORE_FIELDS}
+    if in_place and list(record) == CORE_FIELDS:
+        normalized = record
+    else:
+        normalized = {k: record.get(k) for k in CORE_FIELDS}
 
     # Coerce types
     if normalized.get("reviews") is not None:
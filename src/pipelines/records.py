@@ -0,0 +1,212 @@
+from operator import attrgetter
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from pipelines.normalize import CORE_FIELDS                   # type: ignore
+
+def plain(value: Any) -> Any:
+    """
+    `value` with every compact record inside it turned back into plain dicts.
+    """
+    if isinstance(value, (Record, StarDistribution)):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [plain(v) for v in value]
+    return value
+
+class Record:
+    """
+    Base for the compact record classes: one slot per field, declared in output
+    order, instead of a per-instance dict. Reads work as on a dict (get, [],
+    keys, items), so writers and link extraction take either; __json__() is the
+    shallow form for json's `default=` hook, so serializing never builds a full
+    plain copy. to_dict() is the deep plain form.
+    """
+    __slots__ = ()
+    _fields: frozenset = frozenset()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._fields = frozenset(cls.__slots__)
+
+    def __init__(self, *values: Any):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def compact(cls, item: Any) -> Any:
+        """
+        A `cls` for a dict with exactly this record's keys in order; anything
+        else is returned untouched so it round-trips exactly.
+        """
+        if type(item) is dict and tuple(item) == cls.__slots__:
+            return cls(*item.values())  # type: ignore[call-arg]
+        return item
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._fields else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._fields
+
+    def keys(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        return ((name, getattr(self, name)) for name in self.__slots__)
+
+    def __json__(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: plain(getattr(self, name)) for name in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({', '.join(f'{n}={getattr(self, n)!r}' for n in self.__slots__)})"
+
+class Category(Record):
+    __slots__ = ("category_name", "category_link")
+
+    def __init__(self, category_name: Optional[str], category_link: Optional[str]):
+        self.category_name = category_name
+        self.category_link = category_link
+
+class PricingPlan(Record):
+    __slots__ = ("plan_name", "plan_description", "plan_features")
+
+    def __init__(self, plan_name: Optional[str], plan_description: Optional[str], plan_features: Any):
+        self.plan_name = plan_name
+        self.plan_description = plan_description
+        self.plan_features = plan_features
+
+class Competitor(Record):
+    __slots__ = ("competitor_name", "competitor_link", "competitor_rating", "competitor_reviews")
+
+    def __init__(self, competitor_name: Optional[str], competitor_link: Optional[str],
+                 competitor_rating: Any, competitor_reviews: Any):
+        self.competitor_name = competitor_name
+        self.competitor_link = competitor_link
+        self.competitor_rating = competitor_rating
+        self.competitor_reviews = competitor_reviews
+
+class Comparison(Record):
+    __slots__ = ("link", "competitor_name")
+
+    def __init__(self, link: Optional[str], competitor_name: Optional[str]):
+        self.link = link
+        self.competitor_name = competitor_name
+
+class Review(Record):
+    __slots__ = ("review_id", "review_title", "review_rating", "publish_date", "review_link")
+
+    def __init__(self, review_id: Any, review_title: Optional[str], review_rating: Any,
+                 publish_date: Optional[str], review_link: Optional[str]):
+        self.review_id = review_id
+        self.review_title = review_title
+        self.review_rating = review_rating
+        self.publish_date = publish_date
+        self.review_link = review_link
+
+class StarDistribution:
+    """
+    Review counts for 1..5 stars as a tuple; reads and serializes as {"1": n, ..., "5": n}.
+    """
+    __slots__ = ("counts",)
+    KEYS = ("1", "2", "3", "4", "5")
+
+    def __init__(self, counts: Tuple[int, ...]):
+        self.counts = counts
+
+    @classmethod
+    def compact(cls, value: Any) -> Any:
+        if type(value) is dict and tuple(value) == cls.KEYS:
+            return cls(tuple(value.values()))
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.counts[self.KEYS.index(key)] if key in self.KEYS else default
+
+    def __getitem__(self, key: str) -> int:
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return self.counts[self.KEYS.index(key)]
+
+    def keys(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        return zip(self.KEYS, self.counts)
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(zip(self.KEYS, self.counts))
+
+    __json__ = to_dict
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        if not isinstance(other, StarDistribution):
+            return NotImplemented
+        return self.counts == other.counts
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"StarDistribution({self.to_dict()!r})"
+
+# List field -> record class its items are compacted into.
+ITEM_CLASSES = {
+    "categories": Category,
+    "pricing_plans": PricingPlan,
+    "alternatives": Competitor,
+    "comparisons": Comparison,
+    "initial_reviews": Review,
+}
+
+class ProductRecord(Record):
+    """
+    A normalized product record (see normalize_record) in one object with a
+    slot per core field: fields that are usually None cost a pointer instead of
+    a dict entry, and categories, plans, competitors, comparisons, reviews and
+    star counts are compact objects too. Meant for records held in memory in
+    bulk (the non-stream output list, writer batches).
+    """
+    __slots__ = tuple(CORE_FIELDS)
+
+    @classmethod
+    def from_dict(cls, record: Dict[str, Any]) -> "ProductRecord":
+        """
+        Compact a normalized record; to_dict() gives back an equal dict.
+        Nested values of any other shape are kept as they are.
+        """
+        values = list(map(record.get, CORE_FIELDS))
+        for i, item_cls in _ITEM_INDEXES:
+            items = values[i]
+            if items and type(items) is list:
+                values[i] = [item_cls.compact(item) for item in items]
+        values[_STARS] = StarDistribution.compact(values[_STARS])
+        compact = cls.__new__(cls)
+        for setter, value in zip(_SETTERS, values):
+            setter(compact, value)
+        return compact
+
+    def __json__(self) -> Dict[str, Any]:
+        return dict(zip(CORE_FIELDS, _GET_ALL(self)))
+
+_STARS = CORE_FIELDS.index("star_distribution")
+_ITEM_INDEXES = tuple((CORE_FIELDS.index(n), c) for n, c in ITEM_CLASSES.items())
+_SETTERS = tuple(getattr(ProductRecord, n).__set__ for n in CORE_FIELDS)
+_GET_ALL = attrgetter(*CORE_FIELDS)
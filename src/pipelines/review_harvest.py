@@ -0,0 +1,149 @@
+import hashlib
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, Optional, Set
+from urllib.parse import urlparse
+
+from extractors.backends import get_backend                   # type: ignore
+from extractors.page_index import PageIndex                   # type: ignore
+from extractors.reviews_parser import parse_review_list, review_page_count, review_page_url  # type: ignore
+from fetchers.http_pool import ConcurrentFetcher              # type: ignore
+from outputs.writer_jsonl import JsonlWriter, iter_jsonl      # type: ignore
+
+logger = logging.getLogger("g2_scraper")
+
+_PRODUCT_SLUG = re.compile(r"/products/([^/?#]+)")
+_REVIEW_ID = re.compile(r"-review-(\d+)")
+
+def product_slug(url: str) -> str:
+    """
+    File-safe product key: the /products/<slug> segment, else the file name or a URL hash.
+    """
+    m = _PRODUCT_SLUG.search(url)
+    if m:
+        return m.group(1)
+    if urlparse(url).scheme not in ("http", "https"):
+        return os.path.splitext(os.path.basename(url))[0] or "reviews"
+    return hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+
+def review_key(review: Dict[str, Any], page_url: str) -> int:
+    """
+    64-bit digest identifying a review: its link (or ID), else title/date/rating.
+    """
+    link = review.get("review_link")
+    if review.get("review_id") is not None:
+        key = f"id:{review['review_id']}"
+    elif link and link != page_url:
+        key = f"link:{link}"
+    else:
+        key = f"text:{review.get('review_title')}|{review.get('publish_date')}|{review.get('review_rating')}"
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+
+class ReviewHarvester:
+    """
+    Collect the full review history of products, one JSONL file per product.
+
+    The first reviews page is fetched to discover how many pages there are; the
+    rest are fetched through `fetcher` (a bounded window of concurrent requests)
+    in page order. Reviews are deduplicated on 64-bit key digests. Because G2
+    lists newest reviews first, harvesting a product stops at the first page
+    holding a review already stored by an earlier run.
+    """
+
+    def __init__(self, fetcher: ConcurrentFetcher, out_dir: str, backend: str = "soup",
+                 max_pages: Optional[int] = None, batch_size: int = 100):
+        self.fetcher = fetcher
+        self.out_dir = out_dir
+        self.backend = get_backend(backend)
+        self.max_pages = max_pages
+        self.batch_size = batch_size
+        os.makedirs(out_dir, exist_ok=True)
+
+    def output_path(self, url: str) -> str:
+        return os.path.join(self.out_dir, f"{product_slug(url)}.reviews.jsonl")
+
+    def _stored_keys(self, path: str) -> Set[int]:
+        if not os.path.exists(path):
+            return set()
+        return {int(r["key"], 16) for r in iter_jsonl(path) if r.get("key")}
+
+    def _index(self, html: str) -> PageIndex:
+        return PageIndex(self.backend.parse(html), self.backend)
+
+    def harvest(self, url: str) -> Dict[str, Any]:
+        """
+        Harvest one product's reviews; returns counts for logging.
+        """
+        path = self.output_path(url)
+        stored = self._stored_keys(path)
+        seen: Set[int] = set()
+        stats = {"product": product_slug(url), "output": path, "pages": 0,
+                 "new": 0, "duplicates": 0, "stopped_early": False}
+
+        first = review_page_url(url, 1)
+        _, html, error = next(self.fetcher.fetch_all([first]))
+        if error is not None:
+            raise error
+        with JsonlWriter(path, batch_size=self.batch_size, append=True) as writer:
+            index = self._index(html)
+            reached_stored = self._write_page(writer, first, 1, index, stored, seen, stats)
+            total = review_page_count(index.root, first, index=index)
+            if self.max_pages:
+                total = min(total, self.max_pages)
+            if reached_stored or total <= 1:
+                stats["stopped_early"] = reached_stored
+                return stats
+
+            pages = [review_page_url(url, n) for n in range(2, total + 1)]
+            # Leaving the generator early stops new submissions; only the
+            # bounded in-flight window is still fetched.
+            for number, (page_url, html, error) in enumerate(self.fetcher.fetch_all(pages), start=2):
+                if error is not None:
+                    logger.error("Failed to fetch review page %s: %s", page_url, error)
+                    continue
+                if self._write_page(writer, page_url, number, self._index(html), stored, seen, stats):
+                    stats["stopped_early"] = number < total
+                    break
+        return stats
+
+    def _write_page(self, writer: JsonlWriter, page_url: str, number: int, index: PageIndex,
+                    stored: Set[int], seen: Set[int], stats: Dict[str, Any]) -> bool:
+        """
+        Write the page's unseen reviews; True if it reached an already stored review.
+        """
+        stats["pages"] += 1
+        reached_stored = False
+        for review in parse_review_list(index.root, page_url, index=index):
+            m = _REVIEW_ID.search(review.get("review_link") or "")
+            if m:
+                review["review_id"] = int(m.group(1))
+            key = review_key(review, page_url)
+            if key in stored:
+                reached_stored = True
+                continue
+            if key in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(key)
+            review.update(product=stats["product"], page=number, key=f"{key:016x}")
+            writer.write_record(review)
+            stats["new"] += 1
+        return reached_stored
+
+    def harvest_all(self, urls: Iterable[str]) -> int:
+        """
+        Harvest every product URL; returns how many failed.
+        """
+        failures = 0
+        for url in urls:
+            try:
+                stats = self.harvest(url)
+            except Exception as e:
+                logger.error("Failed to harvest reviews for %s: %s", url, e, exc_info=e)
+                failures += 1
+                continue
+            logger.info("Harvested %d new reviews (%d duplicates, %d pages%s) -> %s",
+                        stats["new"], stats["duplicates"], stats["pages"],
+                        ", stopped at stored reviews" if stats["stopped_early"] else "", stats["output"])
+        return failures
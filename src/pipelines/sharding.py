@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+from outputs.writer_jsonl import iter_jsonl                   # type: ignore
+from pipelines.frontier import canonicalize_url               # type: ignore
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    "i/N" -> (i, N), with shards numbered 1..N.
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like i/N, got {spec!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"shard index must be within 1..{count}, got {spec!r}")
+    return index, count
+
+def canonical_source(source: str) -> str:
+    if source[:8].lower().startswith(("http://", "https://")):
+        return canonicalize_url(source)
+    return os.path.normpath(source)
+
+def shard_of(source: str, count: int) -> int:
+    """
+    Stable 1-based shard of an input: blake2b of its canonical URL, so the same
+    product lands on the same shard on every run and every machine.
+    """
+    digest = hashlib.blake2b(canonical_source(source).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+def shard_path(path: str, index: int, count: int) -> str:
+    """
+    records.json -> records.shard-2-of-4.json (records.jsonl.gz -> records.shard-2-of-4.jsonl.gz).
+    """
+    head, name = os.path.split(path)
+    stem, dot, ext = name.partition(".")
+    return os.path.join(head, f"{stem}.shard-{index}-of-{count}{dot}{ext}")
+
+def done_marker(path: str) -> str:
+    return path + ".done"
+
+def mark_shard_done(path: str, info: Dict[str, Any]) -> None:
+    """
+    Drop a <output>.done marker (atomically) once a shard's output is complete;
+    the merge step only trusts shards that have one.
+    """
+    tmp = f"{path}.done.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(dict(info, finished_at=time.time()), f)
+    os.replace(tmp, done_marker(path))
+
+def _iter_json_array(path: str, chunk_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    """
+    Records of a JSON array file, decoded one at a time instead of json.load-ing
+    the whole shard.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n[,]":
+                pos += 1
+            if pos == len(buf):
+                if eof:
+                    return
+                buf, pos = f.read(chunk_size), 0
+                eof = not buf
+                continue
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                more = f.read(chunk_size)
+                if not more:
+                    raise
+                buf, pos = buf[pos:] + more, 0
+                continue
+            yield record
+            pos = end
+
+def _iter_output(path: str) -> Iterator[Dict[str, Any]]:
+    if path.endswith(".json"):
+        yield from _iter_json_array(path)
+    else:
+        yield from iter_jsonl(path)
+
+def merge_key(record: Dict[str, Any]) -> str:
+    link = record.get("g2_link")
+    if link:
+        return canonicalize_url(link)
+    return json.dumps(record, ensure_ascii=False, sort_keys=True)
+
+def merge_outputs(paths: List[str], output_path: str) -> Tuple[int, int]:
+    """
+    Merge shard outputs (JSON arrays or JSONL) into one JSON array at `output_path`,
+    deduplicated by canonical g2_link (first occurrence in path order wins) and
+    sorted by that key, so the result does not depend on which shard ran when.
+    Records are spilled to a temporary SQLite table keyed by merge_key, so memory
+    stays flat however large the shards are. Returns (records written, duplicates dropped).
+    """
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(out_dir, exist_ok=True)
+    fd, db_path = tempfile.mkstemp(prefix=".merge-", suffix=".sqlite", dir=out_dir)
+    os.close(fd)
+    count = seen = 0
+    try:
+        conn = sqlite3.connect(db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE records (key TEXT PRIMARY KEY, body TEXT NOT NULL)")
+            for path in paths:
+                for record in _iter_output(path):
+                    body = json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+                    conn.execute("INSERT OR IGNORE INTO records (key, body) VALUES (?, ?)", (merge_key(record), body))
+                    seen += 1
+                conn.commit()
+            with open(output_path, "w", encoding="utf-8") as out:
+                for (body,) in conn.execute("SELECT body FROM records ORDER BY key"):
+                    out.write(("[\n  " if count == 0 else ",\n  ") + body)
+                    count += 1
+                out.write("\n]" if count else "[]")
+        finally:
+            conn.close()
+    finally:
+        os.remove(db_path)
+    return count, seen - count
@@ -0,0 +1,197 @@
+import logging
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger("g2_scraper")
+
+StageItem = Tuple[str, Any, Optional[BaseException]]
+
+_DONE = object()
+
+class _Submitted(NamedTuple):
+    executor: ProcessPoolExecutor
+    future: "Future[Dict[str, Any]]"
+    html: Any
+
+class WorkerPool:
+    """
+    Spawn-context process pool that replaces itself when a worker dies: a dead
+    worker (segfault, OOM kill) breaks a ProcessPoolExecutor for good, failing
+    every pending and later submit with BrokenProcessPool.
+    """
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.restarts = 0
+        self.executor = self._new()
+
+    def _new(self) -> ProcessPoolExecutor:
+        # spawn keeps workers independent of the fetch threads already running
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def restart(self, broken: ProcessPoolExecutor) -> None:
+        """
+        Replace `broken` with a fresh pool, once however many callers saw it break.
+        """
+        with self.lock:
+            if self.executor is not broken:
+                return
+            logger.warning("Parse worker died; restarting the process pool")
+            self.executor = self._new()
+            self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn: Callable[..., Any], html: Any, src: str) -> _Submitted:
+        executor = self.executor
+        try:
+            return _Submitted(executor, executor.submit(fn, html, src), html)
+        except BrokenProcessPool:
+            self.restart(executor)
+            executor = self.executor
+            return _Submitted(executor, executor.submit(fn, html, src), html)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+class StagedPipeline:
+    """
+    Run fetch -> parse/extract -> normalize/validate as threads linked by bounded queues.
+
+    - `pages` yields (source, html, error) and is drained by the fetch stage.
+    - `extract(html, source)` returns a plain dict; with parse_workers > 0 it runs
+      in a process pool, otherwise inline on the parse thread.
+    - `finish(raw)` normalizes/validates the raw record on its own thread.
+
+    When a worker process dies the pool is replaced and the pages it held are
+    extracted again one at a time; only a page that kills a worker again fails.
+
+    Results come back to the caller (the write stage) in input order. A full
+    queue blocks the stage feeding it, so memory stays bounded by queue_size.
+    """
+    def __init__(self, extract: Callable[[str, str], Dict[str, Any]],
+                 finish: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 parse_workers: int = 0, queue_size: int = 64):
+        self.extract = extract
+        self.finish = finish
+        self.parse_workers = max(int(parse_workers), 0)
+        self.queue_size = max(int(queue_size), 1)
+
+    @staticmethod
+    def _put(q: "queue.Queue[Any]", item: Any, stop: threading.Event) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _get(q: "queue.Queue[Any]", stop: threading.Event) -> Any:
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fetch_stage(self, pages: Iterable[StageItem], out: "queue.Queue[Any]",
+                     stop: threading.Event, fatal: List[BaseException]) -> None:
+        try:
+            for item in pages:
+                if not self._put(out, item, stop):
+                    return
+        except BaseException as e:
+            fatal.append(e)
+        finally:
+            self._put(out, _DONE, stop)
+
+    def _parse_stage(self, pool: Optional[WorkerPool], inp: "queue.Queue[Any]",
+                     out: "queue.Queue[Any]", stop: threading.Event) -> None:
+        try:
+            while True:
+                item = self._get(inp, stop)
+                if item is _DONE:
+                    break
+                src, html, error = item
+                if error is None:
+                    try:
+                        if pool is not None:
+                            item = (src, pool.submit(self.extract, html, src), None)
+                        else:
+                            item = (src, self.extract(html, src), None)
+                    except Exception as e:
+                        item = (src, None, e)
+                if not self._put(out, item, stop):
+                    return
+        finally:
+            self._put(out, _DONE, stop)
+
+    def _resolve(self, pool: WorkerPool, submitted: _Submitted, src: str) -> Dict[str, Any]:
+        try:
+            return submitted.future.result()
+        except BrokenProcessPool:
+            # Some worker died, maybe on another page: retry this one alone on a fresh pool.
+            pool.restart(submitted.executor)
+            retry = pool.submit(self.extract, submitted.html, src)
+            try:
+                return retry.future.result()
+            except BrokenProcessPool:
+                pool.restart(retry.executor)
+                raise
+
+    def _finish_stage(self, pool: Optional[WorkerPool], inp: "queue.Queue[Any]", out: "queue.Queue[Any]",
+                      stop: threading.Event) -> None:
+        try:
+            while True:
+                item = self._get(inp, stop)
+                if item is _DONE:
+                    break
+                src, raw, error = item
+                if error is None:
+                    try:
+                        if isinstance(raw, _Submitted):
+                            raw = self._resolve(pool, raw, src)
+                        item = (src, self.finish(raw), None)
+                    except Exception as e:
+                        item = (src, None, e)
+                if not self._put(out, item, stop):
+                    return
+        finally:
+            self._put(out, _DONE, stop)
+
+    def run(self, pages: Iterable[StageItem]) -> Iterator[StageItem]:
+        fetched: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        parsed: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        finished: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        fatal: List[BaseException] = []
+        pool = WorkerPool(self.parse_workers) if self.parse_workers > 0 else None
+        threads = [
+            threading.Thread(target=self._fetch_stage, args=(pages, fetched, stop, fatal),
+                             name="stage-fetch", daemon=True),
+            threading.Thread(target=self._parse_stage, args=(pool, fetched, parsed, stop),
+                             name="stage-parse", daemon=True),
+            threading.Thread(target=self._finish_stage, args=(pool, parsed, finished, stop),
+                             name="stage-finish", daemon=True),
+        ]
+        try:
+            for t in threads:
+                t.start()
+            while True:
+                item = finished.get()
+                if item is _DONE:
+                    break
+                yield item
+            if fatal:
+                raise fatal[0]
+        finally:
+            stop.set()
+            for t in threads:
+                t.join()
+            if pool is not None:
+                pool.shutdown()
@@ -1,20 +1,137 @@
+import itertools
 import json
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterable, List, Optional
 import os
 
-from jsonschema import Draft202012Validator, exceptions as js_exceptions
+Check = Callable[[Any], bool]
+
+# JSON Schema type name -> predicate, with jsonschema's semantics (bools are not
+# numbers, integral floats count as integers).
+_TYPE_CHECKS: Dict[str, Check] = {
+    "null": lambda v: v is None,
+    "boolean": lambda v: v is True or v is False,
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool))
+    or (isinstance(v, float) and v.is_integer()),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "array": lambda v: isinstance(v, list),
+    "object": lambda v: isinstance(v, dict),
+}
+
+_SUPPORTED_KEYWORDS = {"$schema", "title", "description", "type", "required", "properties",
+                       "additionalProperties", "items"}
+
+class _Unsupported(Exception):
+    pass
+
+def _compile_type(spec: Any) -> Check:
+    names = [spec] if isinstance(spec, str) else list(spec)
+    if any(n not in _TYPE_CHECKS for n in names):
+        raise _Unsupported(f"type {spec!r}")
+    # Fast exact-class lookups for the common str/None/list/dict cases; anything
+    # else goes through the predicates (int subclasses, bools, integral floats).
+    exact = {str: "string", type(None): "null", list: "array", dict: "object"}
+    exact_ok = frozenset(cls for cls, name in exact.items() if name in names)
+    checks = [_TYPE_CHECKS[n] for n in names]
+    return lambda v: type(v) in exact_ok or any(c(v) for c in checks)
+
+def compile_schema(schema: Dict[str, Any]) -> Check:
+    """
+    Compile the subset of JSON Schema used by outputs/schema.json into a predicate
+    that stops at the first failure. Raises _Unsupported for anything else.
+    """
+    unknown = set(schema) - _SUPPORTED_KEYWORDS
+    if unknown:
+        raise _Unsupported(", ".join(sorted(unknown)))
+    parts: List[Check] = []
+    if "type" in schema:
+        parts.append(_compile_type(schema["type"]))
+    if "required" in schema:
+        required = tuple(schema["required"])
+        parts.append(lambda v: not isinstance(v, dict) or all(k in v for k in required))
+    props = {k: compile_schema(s) for k, s in schema.get("properties", {}).items()}
+    additional = schema.get("additionalProperties", True)
+    if additional is not True and additional is not False:
+        raise _Unsupported("additionalProperties schema")
+    if props or additional is False:
+        closed = additional is False
+
+        def check_props(v: Any) -> bool:
+            if not isinstance(v, dict):
+                return True
+            for k, item in v.items():
+                check = props.get(k)
+                if check is None:
+                    if closed:
+                        return False
+                elif not check(item):
+                    return False
+            return True
+        parts.append(check_props)
+    if "items" in schema:
+        if not isinstance(schema["items"], dict):
+            raise _Unsupported("items")
+        item_check = compile_schema(schema["items"])
+        parts.append(lambda v: not isinstance(v, list) or all(item_check(i) for i in v))
+    if len(parts) == 1:
+        return parts[0]
+    return lambda v: all(p(v) for p in parts)
 
 class SchemaValidator:
-    def __init__(self, schema_path: str):
+    """
+    Validates records against the output schema.
+
+    A predicate compiled from the schema answers "valid?" and stops at the first
+    failure; only invalid records go through jsonschema, so error messages keep
+    the "<path>: <message>" format. With `sample_every` N > 1 only every Nth
+    record is checked (the first one always is). jsonschema itself is imported
+    and its validator built only once some record fails (or the schema cannot
+    be compiled), which keeps it off the startup path.
+    """
+
+    def __init__(self, schema_path: str, sample_every: int = 1):
         if not os.path.exists(schema_path):
             raise FileNotFoundError(f"Schema not found: {schema_path}")
         with open(schema_path, "r", encoding="utf-8") as f:
             self.schema = json.load(f)
-        self.validator = Draft202012Validator(self.schema)
+        self._validator: Any = None
+        try:
+            self.fast_check: Optional[Check] = compile_schema(self.schema)
+        except _Unsupported:
+            self.fast_check = None
+        self.sample_every = max(1, int(sample_every))
+        self._seen = itertools.count()
 
-    def validate_instance(self, instance: Dict[str, Any]) -> None:
+    @property
+    def validator(self) -> Any:
+        if self._validator is None:
+            from jsonschema import Draft202012Validator
+            self._validator = Draft202012Validator(self.schema)
+        return self._validator
+
+    def first_error(self, instance: Dict[str, Any]) -> Optional[str]:
+        """
+        Return the "<path>: <message>" error for `instance`, or None if it is valid.
+        """
+        if self.fast_check is not None and self.fast_check(instance):
+            return None
         errors = sorted(self.validator.iter_errors(instance), key=lambda e: e.path)
-        if errors:
-            first = errors[0]
-            path = ".".join([str(p) for p in first.path]) or "<root>"
-            raise js_exceptions.ValidationError(f"{path}: {first.message}")
\ No newline at end of file
+        if not errors:
+            return None
+        first = errors[0]
+        path = ".".join([str(p) for p in first.path]) or "<root>"
+        return f"{path}: {first.message}"
+
+    def validate_instance(self, instance: Dict[str, Any]) -> None:
+        if self.sample_every > 1 and next(self._seen) % self.sample_every:
+            return
+        error = self.first_error(instance)
+        if error is not None:
+            from jsonschema import exceptions as js_exceptions
+            raise js_exceptions.ValidationError(error)
+
+    def validate_batch(self, instances: Iterable[Dict[str, Any]]) -> List[Optional[str]]:
+        """
+        Validate many records (ignoring sampling); one error string or None per record.
+        """
+        return [self.first_error(instance) for instance in instances]
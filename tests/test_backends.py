@@ -0,0 +1,61 @@
+import os
+import sys
+
+# Make src importable without packages
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.join(SRC, "extractors"))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from extractors.backends import get_backend        # type: ignore
+from extractors.page_record import extract_record  # type: ignore
+from synthetic import generate_page                # type: ignore
+
+from test_parsers import HTML
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "product_page.html")
+URL = "https://www.g2.com/products/acme/reviews"
+
+def _fixture() -> bytes:
+    with open(FIXTURE, "rb") as f:
+        return f.read()
+
+def test_lxml_backend_matches_soup_backend():
+    for html in (HTML, _fixture(), _fixture().decode("utf-8"), ""):
+        assert extract_record(html, URL, backend="lxml") == extract_record(html, URL, backend="soup")
+
+def test_fixture_extraction():
+    record = extract_record(_fixture(), URL, backend="lxml")
+    assert record["product_name"] == "AcmeWidget"
+    assert record["what_is"] == "Acme makes widgets for teams & enterprises."
+    assert record["rating"] == 4.6 and record["reviews"] == 2035
+    assert record["product_logo"] == "https://images.g2crowd.com/acme/logo.png"
+    assert [c["category_name"] for c in record["categories"]] == ["Bug Tracking", "DevOps Platforms"]
+    assert [p["plan_name"] for p in record["pricing_plans"]] == ["Free", "Team"]
+    assert record["pricing_plans"][0]["plan_features"] == ["Unlimited repositories", "Community Support"]
+    assert [a["competitor_name"] for a in record["alternatives"]][:2] == ["GitLab", "Bitbucket"]
+    assert record["comparisons"][1]["competitor_name"] is None
+    assert [r["review_title"] for r in record["initial_reviews"]] == ["Collaboration made easy", "Review #2"]
+    assert record["star_distribution"]["5"] == 1703
+
+def test_synthetic_pages_are_deterministic_and_backends_agree():
+    page = generate_page(seed=3, reviews=30, categories=40, alternatives=50, comparisons=20, plans=4, page_bytes=20000)
+    assert page == generate_page(seed=3, reviews=30, categories=40, alternatives=50, comparisons=20, plans=4, page_bytes=20000)
+    assert len(page) >= 20000
+
+    record = extract_record(page, URL, backend="lxml")
+    assert record == extract_record(page, URL, backend="soup")
+    assert len(record["initial_reviews"]) == 25
+    assert len(record["pricing_plans"]) == 4
+    assert len(record["comparisons"]) == 20
+
+def test_partial_backend_matches_and_prunes():
+    page = generate_page(seed=5, reviews=30, categories=40, alternatives=50, comparisons=20, plans=4, page_bytes=50000)
+    for html in (HTML, _fixture(), page, ""):
+        assert extract_record(html, URL, backend="partial") == extract_record(html, URL, backend="soup")
+
+    tree = get_backend("partial").parse('<div style="x" data-testid="a"><!-- c --><script class="s">{"big": 1}</script></div>')
+    div = tree.getroot().find(".//div")
+    assert dict(div.attrib) == {"data-testid": "a"}
+    assert [child.tag for child in div] == ["script"] and div[0].text is None and div[0].get("class") == "s"
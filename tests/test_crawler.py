@@ -0,0 +1,88 @@
+import os
+import sys
+
+# Make src importable without packages
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.join(SRC, "extractors"))
+sys.path.insert(0, os.path.join(SRC, "pipelines"))
+
+import main                                                   # type: ignore
+from extractors.page_record import extract_record             # type: ignore
+from fetchers.fixture_site import FixtureSite                 # type: ignore
+from outputs.writer_jsonl import JsonlWriter, iter_jsonl      # type: ignore
+from pipelines.crawler import Crawler                         # type: ignore
+from pipelines.frontier import DONE, FAILED, PENDING, Frontier, canonicalize_url  # type: ignore
+from pipelines.normalize import normalize_record              # type: ignore
+
+SITE = os.path.join(ROOT, "tests", "fixtures", "site")
+SEED = "https://www.g2.com/products/acme/reviews"
+
+def test_canonicalize_url():
+    assert canonicalize_url("HTTPS://WWW.G2.com:443/products/Acme/?page=2#reviews") == SEED
+    assert canonicalize_url("/categories/crm/?utm_source=x&b=2&a=1", base=SEED) == \
+        "https://www.g2.com/categories/crm?a=1&b=2"
+
+def _crawl(tmp_path, max_pages=None):
+    site = FixtureSite(SITE)
+    frontier = Frontier(str(tmp_path / "frontier.sqlite3"), hosts=["www.g2.com"])
+
+    def fetch_pages(batch):
+        for url in batch:
+            try:
+                yield url, site.fetch(url), None
+            except Exception as e:
+                yield url, None, e
+
+    def process(html, url):
+        return normalize_record(extract_record(html, url))
+
+    crawler = Crawler(frontier, fetch_pages, process, max_depth=2, max_pages=max_pages, batch_size=8)
+    try:
+        with JsonlWriter(str(tmp_path / "records.jsonl"), append=True) as writer:
+            crawler.run([SEED], writer)
+        return frontier.count(DONE), frontier.count(FAILED), frontier.count(PENDING)
+    finally:
+        frontier.close()
+
+def test_crawler_follows_links_within_limits_and_resumes(tmp_path):
+    # Page budget stops the first run early; the frontier survives for the next one.
+    assert _crawl(tmp_path, max_pages=2) == (2, 0, 3)
+    done, failed, pending = _crawl(tmp_path)
+    assert (done, failed, pending) == (5, 1, 0)
+
+    names = [r["product_name"] for r in iter_jsonl(str(tmp_path / "records.jsonl"))]
+    # fabrikam (depth 2) is crawled, but its link to northwind would be depth 3.
+    assert names == ["Acme Widget", "Contoso", "Fabrikam"]
+
+def test_crawl_reuses_one_fetcher_and_paces_across_batches(tmp_path, monkeypatch):
+    created, sleeps = [], []
+
+    class CountingFetcher(main.ConcurrentFetcher):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self)
+
+    monkeypatch.setattr(main, "ConcurrentFetcher", CountingFetcher)
+    schema = os.path.join(ROOT, "src", "outputs", "schema.json")
+    main.crawl([SEED], str(tmp_path / "a.sqlite3"), str(tmp_path / "a.jsonl"), 0.0, schema,
+               concurrency=1, fetcher=FixtureSite(SITE).fetch)  # batches of 2 pages
+    assert len(created) == 1
+
+    monkeypatch.setattr(main.time, "sleep", sleeps.append)
+    main.crawl([SEED], str(tmp_path / "b.sqlite3"), str(tmp_path / "b.jsonl"), 0.5, schema,
+               fetcher=FixtureSite(SITE).fetch)
+    # 6 fetches over several frontier batches, one of them failing: every gap
+    # after a successful fetch is paced, not just the ones inside a batch.
+    assert len(sleeps) == 4
+
+def test_serial_delay_still_applies_with_a_controller(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(main.time, "sleep", sleeps.append)
+    controller = main.FetchController(rate=2.0, per_host=1)
+    pages = list(main.iter_pages(["a.html", "b.html", SEED], 0.5, fetcher=lambda src: "<html></html>",
+                                 controller=controller))
+    assert [p[0] for p in pages] == ["a.html", "b.html", SEED]
+    # The local files get the plain delay; the URL is paced by the controller instead.
+    assert sleeps == [0.5]
@@ -0,0 +1,311 @@
+import gzip
+import http.server
+import io
+import os
+import sys
+import tarfile
+import threading
+import time
+
+import pytest
+import requests
+
+# Make src importable without packages
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.join(SRC, "fetchers"))
+
+from fetchers.adaptive import FetchController, retry_after_seconds  # type: ignore
+from fetchers.archives import iter_archive                   # type: ignore
+from fetchers.http_pool import ConcurrentFetcher                 # type: ignore
+from fetchers import response_cache                          # type: ignore
+from fetchers.response_cache import CacheMiss, ResponseCache, fetch_cached   # type: ignore
+
+def test_fixed_controller_paces_requests():
+    controller = FetchController(rate=20.0, adaptive=False)
+    start = time.monotonic()
+    for _ in range(4):
+        with controller.slot("www.g2.com"):
+            pass
+    # First slot is immediate, the next three wait ~50ms each
+    assert time.monotonic() - start >= 0.14
+
+def test_fixed_controller_caps_concurrency_per_host():
+    controller = FetchController(per_host=2, adaptive=False)
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def worker():
+        with controller.slot("www.g2.com"):
+            with lock:
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+            time.sleep(0.02)
+            with lock:
+                active["now"] -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert active["peak"] == 2
+
+def test_concurrent_fetcher_keeps_order_and_isolates_failures():
+    def fake_fetch(source, timeout=20, session=None):
+        if source.endswith("bad"):
+            raise RuntimeError("boom")
+        time.sleep(0.01 * (len(source) % 3))
+        return f"<html>{source}</html>"
+
+    sources = [f"https://h{i % 3}.example/{i}" for i in range(10)] + ["https://h0.example/bad"]
+    fetcher = ConcurrentFetcher(fake_fetch, workers=4, per_host=2)
+    results = list(fetcher.fetch_all(sources))
+    fetcher.close()
+
+    assert [r[0] for r in results] == sources
+    assert all(html == f"<html>{src}</html>" for src, html, err in results[:-1])
+    assert results[-1][1] is None and isinstance(results[-1][2], RuntimeError)
+
+class _StubHandler(http.server.BaseHTTPRequestHandler):
+    body = b"<html><body><h1>Acme</h1></body></html>"
+    hits = []
+
+    def do_GET(self):
+        _StubHandler.hits.append((self.path, self.headers.get("If-None-Match")))
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+def _serve(handler=_StubHandler):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_response_cache_revalidates_and_replays_offline(tmp_path):
+    server, base = _serve()
+    _StubHandler.hits = []
+    try:
+        cache = ResponseCache(str(tmp_path / "cache"))
+        first = fetch_cached(cache, f"{base}/p1", requests.get, {}, timeout=5)
+        second = fetch_cached(cache, f"{base}/p1", requests.get, {}, timeout=5)
+        assert first == second == _StubHandler.body.decode()
+        # Only the validators and the content type are kept, not Server/Date/Content-Length
+        assert set(cache.get(f"{base}/p1").headers) == {"ETag", "Content-Type"}
+        # Second request was conditional and answered with 304
+        assert _StubHandler.hits == [("/p1", None), ("/p1", '"v1"')]
+
+        # Same body under another URL shares one blob
+        fetch_cached(cache, f"{base}/p2", requests.get, {}, timeout=5)
+        assert len(os.listdir(tmp_path / "cache" / "blobs")) == 1
+
+        fresh = ResponseCache(str(tmp_path / "cache"), ttl=3600)
+        fetch_cached(fresh, f"{base}/p1", requests.get, {}, timeout=5)
+        assert len(_StubHandler.hits) == 3
+    finally:
+        server.shutdown()
+
+    offline = ResponseCache(str(tmp_path / "cache"), offline=True)
+    assert fetch_cached(offline, f"{base}/p1", requests.get, {}, timeout=5) == first
+    with pytest.raises(CacheMiss):
+        fetch_cached(offline, f"{base}/never", requests.get, {}, timeout=5)
+
+def test_response_cache_refetches_when_a_blob_is_missing(tmp_path):
+    server, base = _serve()
+    _StubHandler.hits = []
+    body = _StubHandler.body.decode()
+
+    def drop_blobs():
+        for root, _, files in os.walk(tmp_path / "cache" / "blobs"):
+            for name in files:
+                os.remove(os.path.join(root, name))
+
+    try:
+        fresh = ResponseCache(str(tmp_path / "cache"), ttl=3600)
+        fetch_cached(fresh, f"{base}/p1", requests.get, {}, timeout=5)
+        drop_blobs()
+        # Fresh entry, no blob: a miss, fetched again without validators
+        assert fetch_cached(fresh, f"{base}/p1", requests.get, {}, timeout=5) == body
+        assert _StubHandler.hits == [("/p1", None), ("/p1", None)]
+
+        stale = ResponseCache(str(tmp_path / "cache"))
+        drop_blobs()
+        # Stale entry revalidated with a 304, but there is no body to reuse
+        assert fetch_cached(stale, f"{base}/p1", requests.get, {}, timeout=5) == body
+        assert _StubHandler.hits[2:] == [("/p1", '"v1"'), ("/p1", None)]
+        assert stale.read_text(stale.get(f"{base}/p1")) == body
+    finally:
+        server.shutdown()
+
+    drop_blobs()
+    offline = ResponseCache(str(tmp_path / "cache"), offline=True)
+    with pytest.raises(CacheMiss):
+        fetch_cached(offline, f"{base}/p1", requests.get, {}, timeout=5)
+    assert offline.get(f"{base}/p1") is None and offline.total_bytes() == 0
+
+def test_response_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "cache"))
+    cache.put("https://a.example/1", b"page-1 " * 100, {}, "utf-8")
+    one_blob = cache.total_bytes()
+
+    cache.max_bytes = one_blob * 2
+    time.sleep(0.01)
+    cache.put("https://a.example/2", b"page-2 " * 100, {}, "utf-8")
+    time.sleep(0.01)
+    assert cache.get("https://a.example/1") is not None  # 1 is now more recent than 2
+    time.sleep(0.01)
+    cache.put("https://a.example/3", b"page-3 " * 100, {}, "utf-8")
+
+    assert cache.get("https://a.example/2") is None
+    assert cache.get("https://a.example/1") is not None
+    assert cache.get("https://a.example/3") is not None
+    assert cache.total_bytes() <= cache.max_bytes
+
+    # Eviction walks the LRU index in batches until the cache fits.
+    monkeypatch.setattr(response_cache, "EVICT_BATCH", 2)
+    cache.max_bytes = None
+    for i in range(4, 10):
+        cache.put(f"https://a.example/{i}", f"page-{i} ".encode() * 100, {}, "utf-8")
+    cache.max_bytes = one_blob
+    cache.evict()
+    assert [i for i in range(1, 10) if cache.get(f"https://a.example/{i}")] == [9]
+    assert cache.blob_bytes == cache.total_bytes() == ResponseCache(str(tmp_path / "cache")).blob_bytes
+
+class _FlakyHandler(http.server.BaseHTTPRequestHandler):
+    """/throttled/* answers 429 (Retry-After: 1) on the first hit; /slow/* takes 0.2s."""
+    hits = []
+
+    def do_GET(self):
+        _FlakyHandler.hits.append((self.path, time.monotonic()))
+        if self.path.startswith("/throttled/") and [p for p, _ in _FlakyHandler.hits].count(self.path) == 1:
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path.startswith("/slow/"):
+            time.sleep(0.2)
+        body = f"<html>{self.path}</html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def _get(url, timeout=5, session=None):
+    resp = (session or requests).get(url, timeout=timeout)
+    resp.raise_for_status()
+    return resp.text
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert retry_after_seconds("120") == 120.0
+    assert retry_after_seconds("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412470.0) == 10.0
+    assert retry_after_seconds("soon") is None and retry_after_seconds(None) is None
+
+def test_fetch_controller_retries_429_after_retry_after_and_slows_down():
+    server, base = _serve(_FlakyHandler)
+    _FlakyHandler.hits = []
+    gauges, counters = {}, {}
+
+    class Recorder:
+        def gauge(self, name, value):
+            gauges[name] = value
+
+        def count(self, name, value=1):
+            counters[name] = counters.get(name, 0) + value
+
+    try:
+        controller = FetchController(rate=20.0, per_host=2, backoff=0.01, metrics=Recorder())
+        fetcher = ConcurrentFetcher(_get, workers=2, per_host=2, controller=controller)
+        sources = [f"{base}/throttled/{i}" for i in range(2)]
+        results = list(fetcher.fetch_all(sources))
+        fetcher.close()
+    finally:
+        server.shutdown()
+
+    assert [(src, err) for src, _, err in results] == [(src, None) for src in sources]
+    assert counters["fetch_retries"] == 2 and counters["fetch_throttled"] >= 1
+    assert gauges["fetch_rate"] < 20.0
+    # Every retry waited out the host-wide Retry-After
+    first_429 = min(t for p, t in _FlakyHandler.hits)
+    retried = [t for p, t in _FlakyHandler.hits[2:]]
+    assert min(retried) - first_429 >= 0.95
+
+def test_fetch_controller_backs_off_on_latency_and_recovers():
+    server, base = _serve(_FlakyHandler)
+    try:
+        controller = FetchController(rate=50.0, per_host=4, latency_target=0.1, decrease=0.5)
+        src = f"{base}/slow/a"
+        for _ in range(3):
+            assert controller.call(src, lambda: _get(src)) == "<html>/slow/a</html>"
+        slowed = controller.current_rate(src)
+        assert slowed < 50.0 and controller.current_limit(src) < 4
+
+        fast = f"{base}/fast/a"
+        for _ in range(8):
+            controller.call(fast, lambda: _get(fast))
+        assert controller.current_rate(src) > slowed and controller.current_limit(src) > 1
+    finally:
+        server.shutdown()
+
+def test_fetch_controller_gives_up_on_client_errors():
+    calls = []
+
+    def not_found():
+        calls.append(1)
+        resp = requests.Response()
+        resp.status_code = 404
+        raise requests.HTTPError(response=resp)
+
+    with pytest.raises(requests.HTTPError):
+        FetchController(rate=100.0, backoff=0.01).call("https://h.example/missing", not_found)
+    assert len(calls) == 1
+
+def _warc_response(uri, body, status=200, ctype="text/html", extra=()):
+    block = "\r\n".join([f"HTTP/1.1 {status} X", f"Content-Type: {ctype}", *extra]).encode() + b"\r\n\r\n" + body
+    return (f"WARC/1.0\r\nWARC-Type: response\r\nWARC-Target-URI: <{uri}>\r\n"
+            f"Content-Type: application/http; msgtype=response\r\nContent-Length: {len(block)}\r\n\r\n"
+            ).encode() + block + b"\r\n\r\n"
+
+def test_archives_stream_html_from_warc_and_tar(tmp_path):
+    page = b"<html><body><h1>Acme</h1></body></html>"
+    chunked = b"%x\r\n%s\r\n0\r\n\r\n" % (len(page), page)
+    records = [
+        b"WARC/1.0\r\nWARC-Type: warcinfo\r\nContent-Length: 4\r\n\r\ninfo\r\n\r\n",
+        _warc_response("https://www.g2.com/products/a/reviews", page),
+        _warc_response("https://www.g2.com/products/b/reviews", chunked,
+                       extra=["Transfer-Encoding: chunked"]),
+        _warc_response("https://www.g2.com/products/c/reviews", gzip.compress(page), extra=["Content-Encoding: gzip"]),
+        _warc_response("https://www.g2.com/products/gone/reviews", b"gone", status=404),
+        _warc_response("https://www.g2.com/logo.png", b"png", ctype="image/png"),
+    ]
+    (tmp_path / "crawl.warc").write_bytes(b"".join(records))
+    with open(tmp_path / "crawl.warc.gz", "wb") as f:
+        for record in records:
+            f.write(gzip.compress(record))  # one gzip member per record, as crawlers write them
+    expected = [(f"https://www.g2.com/products/{p}/reviews", page) for p in "abc"]
+    assert list(iter_archive(str(tmp_path / "crawl.warc"))) == expected
+    assert list(iter_archive(str(tmp_path / "crawl.warc.gz"))) == expected
+
+    names = ["products/" + "x" * 120 + ".html", "products/b.htm", "logo.png"]
+    for name, mode, fmt in [("pages.tar", "w", tarfile.GNU_FORMAT), ("pages.tar.gz", "w:gz", tarfile.PAX_FORMAT)]:
+        path = str(tmp_path / name)
+        with tarfile.open(path, mode, format=fmt) as tar:
+            for member in names:
+                info = tarfile.TarInfo(member)
+                info.size = len(page)
+                tar.addfile(info, io.BytesIO(page))
+        assert list(iter_archive(path)) == [(f"{path}!{n}", page) for n in names[:2]]
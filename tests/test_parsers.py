@@ -1,4 +1,6 @@
 import os
+import pickle
+import random
 import sys
 from bs4 import BeautifulSoup
 
@@ -9,10 +11,13 @@ sys.path.insert(0, SRC)
 sys.path.insert(0, os.path.join(SRC, "extractors"))
 sys.path.insert(0, os.path.join(SRC, "pipelines"))
 
+from extractors.page_index import PageIndex                  # type: ignore
 from extractors.product_profile import parse_product_profile  # type: ignore
 from extractors.reviews_parser import parse_reviews           # type: ignore
 from extractors.competitors import parse_competitive          # type: ignore
 from extractors.pricing_parser import parse_pricing           # type: ignore
+from extractors.page_record import extract_record             # type: ignore
+from extractors.selector_stats import SelectorStats, fingerprint  # type: ignore
 from pipelines.normalize import normalize_record              # type: ignore
 
 HTML = """
@@ -66,4 +71,134 @@ def test_parse_and_normalize_minimal():
     assert normalized["comparisons"][0]["link"].endswith("acme-vs-contoso")
     assert normalized["initial_reviews"][0]["review_rating"] == 5.0
     for k in ["1","2","3","4","5"]:
-        assert k in normalized["star_distribution"]
\ No newline at end of file
+        assert k in normalized["star_distribution"]
+
+def test_shared_page_index_dedupes_links():
+    links = "".join(
+        f'<a href="https://www.g2.com/categories/c{i % 3}">Cat {i % 3}</a>'
+        f'<a href="https://www.g2.com/categories/x{i}">CAT {i % 3}</a>'
+        f'<a href="https://www.g2.com/products/p{i % 4}/reviews">P{i % 4}</a>'
+        for i in range(50)
+    )
+    soup = BeautifulSoup(f"<html><body>{links}</body></html>", "lxml")
+    index = PageIndex(soup)
+    url = "https://www.g2.com/products/acme/reviews"
+
+    profile = parse_product_profile(soup, url=url, index=index)
+    comp = parse_competitive(soup, url=url, index=index)
+    assert [c["category_name"] for c in profile["categories"]] == ["Cat 0", "Cat 1", "Cat 2"]
+    assert [a["competitor_name"] for a in comp["alternatives"]] == ["P0", "P1", "P2", "P3"]
+    # Same answers without a prebuilt index
+    assert parse_competitive(soup, url=url) == comp
+
+TESTIDS = ("product-profile-header", "review", "review-count", "review-title", "what-is")
+CLASSES = ("plan", "pricing", "review-title", "star-rating")
+HREFS = ("https://www.g2.com/categories/crm", "/products/acme/reviews", "https://www.g2.com/compare/a-vs-b",
+         "https://example.com/x", "#top")
+
+def _random_page(rng):
+    """
+    Random nesting of the tags, data-testid/itemprop/id/class/data-* attributes
+    and link shapes the extractors look for.
+    """
+    def node(depth):
+        tag = rng.choice(("div", "section", "span", "p", "h1", "h3", "li", "a", "meta", "img"))
+        attrs = []
+        if rng.random() < 0.3:
+            attrs.append(f'data-testid="{rng.choice(TESTIDS)}"')
+        if rng.random() < 0.2:
+            attrs.append(f'itemprop="{rng.choice(("name", "description", "reviewCount"))}"')
+        if rng.random() < 0.2:
+            attrs.append(f'id="{rng.choice(("pricing", "reviews", "plans"))}"')
+        if rng.random() < 0.3:
+            attrs.append('class="%s"' % " ".join(rng.sample(CLASSES, rng.randint(1, 2))))
+        if rng.random() < 0.2:
+            attrs.append(f'data-rating="{rng.randint(1, 5)}"')
+        if tag == "a" and rng.random() < 0.9:
+            attrs.append(f'href="{rng.choice(HREFS)}"')
+        if tag in ("meta", "img"):
+            return f"<{tag} {' '.join(attrs)}>"
+        children = "".join(node(depth + 1) for _ in range(rng.randint(0, 3) if depth < 4 else 0))
+        return f"<{tag} {' '.join(attrs)}>t{rng.randint(0, 9)}{children}</{tag}>"
+
+    return "<html><body>%s</body></html>" % "".join(node(0) for _ in range(rng.randint(1, 12)))
+
+def _ids(nodes):
+    return [id(n) for n in nodes]
+
+def test_page_index_matches_css_selectors_on_random_pages():
+    rng = random.Random(4)
+    url = "https://www.g2.com/products/acme/reviews"
+    for _ in range(200):
+        html = _random_page(rng)
+        soup = BeautifulSoup(html, "lxml")
+        index = PageIndex(soup)
+        for testid in TESTIDS:
+            assert _ids(index.testid(testid)) == _ids(soup.select(f'[data-testid="{testid}"]'))
+            assert _ids(index.testid(testid, "div")) == _ids(soup.select(f'div[data-testid="{testid}"]'))
+        for cls in CLASSES:
+            assert _ids(index.with_class(cls)) == _ids(soup.select(f".{cls}"))
+        assert _ids(index.itemprop("name", "h1")) == _ids(soup.select('h1[itemprop="name"]'))
+        assert _ids(index.with_id("pricing")) == _ids(soup.select("#pricing"))
+        assert _ids(index.data("data-rating")) == _ids(soup.select("[data-rating]"))
+        assert _ids([n for _, n in index.category_links]) == _ids(soup.select('a[href*="/categories/"]'))
+        assert _ids([n for _, n in index.compare_links]) == _ids(soup.select('a[href*="/compare/"]'))
+
+        comma = '[data-testid="review-title"], .review-title, [itemprop="name"]'
+        groups = (index.testid("review-title"), index.with_class("review-title"), index.itemprop("name"))
+        assert index.first_of(*groups) is soup.select_one(comma)
+        assert _ids(index.union(*groups)) == _ids(soup.select(comma))
+        assert _ids(index.within(index.with_class("star-rating"), index.testid("review"))) == \
+            _ids(soup.select('[data-testid="review"] .star-rating'))
+        assert index.first_descendant(index.with_class("plan"), "h3") is soup.select_one(".plan h3")
+        first = soup.select_one('a[href*="/products/"]')
+        assert index.first_href("/products/") == (first.get("href") if first else None)
+        # The whole record agrees across backends too (the lxml index is built from another tree).
+        assert extract_record(html, url, backend="lxml") == extract_record(html, url)
+
+ITEMPROP_HTML = """
+<html>
+  <body>
+    <h1 itemprop="name">Beta CRM</h1>
+    <div itemprop="description">Beta keeps customer records.</div>
+    <meta itemprop="reviewCount" content="42">
+    <img src="/banner.png"><img alt="Beta logo" src="/beta.png">
+    <section id="pricing"><h3>Free</h3><p>No cost</p></section>
+  </body>
+</html>
+"""
+
+def test_learned_selector_order_keeps_results_and_reports_drift(tmp_path):
+    url = "https://www.g2.com/products/acme/reviews"
+    pages = [HTML, ITEMPROP_HTML] * 3
+    expected = [extract_record(p, url) for p in pages]
+    path = str(tmp_path / "selectors.json")
+    stats = SelectorStats(path)
+    assert [extract_record(p, url, selectors=stats) for p in pages] == expected
+
+    plain_fp, itemprop_fp = (fingerprint(PageIndex(BeautifulSoup(p, "lxml"))) for p in (HTML, ITEMPROP_HTML))
+    assert plain_fp != itemprop_fp and stats.hints(plain_fp) == {}
+    assert stats.hints(itemprop_fp) == {"product_name": 1, "what_is": 3, "review_count": 1, "logo": 1,
+                                        "pricing_sections": 1}
+    # Workers only receive the hints
+    assert pickle.loads(pickle.dumps(stats)).hints(itemprop_fp) == stats.hints(itemprop_fp)
+
+    # Hints that are wrong for a page still give the fixed-order result
+    for _ in range(4):
+        stats.observe((plain_fp, {"product_name": 3, "what_is": 3, "review_count": 2, "logo": 3,
+                                  "pricing_sections": 1}, 0))
+    stats.report()  # folds repeated outcomes into the hints
+    assert stats.hints(plain_fp)["product_name"] == 3
+    assert extract_record(HTML, url, selectors=stats) == expected[0]
+
+    stats.save()
+    assert os.listdir(tmp_path) == ["selectors.json"]  # no temp file left behind
+    reloaded = SelectorStats(path)
+    assert reloaded.hints(itemprop_fp) == stats.hints(itemprop_fp)
+    assert reloaded.drift() == []
+    reloaded.observe((itemprop_fp, {"product_name": None, "logo": 1}, 2))
+    reloaded.observe(("feedbeef", {"product_name": 0}, 1))
+    drift = reloaded.drift()
+    assert len(drift) == 2
+    assert {"layout": "feedbeef", "pages": 1, "new": True} in drift
+    assert {"layout": itemprop_fp, "chain": "product_name", "learned": 1, "now": None, "pages": 1} in drift
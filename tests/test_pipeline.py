@@ -0,0 +1,278 @@
+import gzip
+import io
+import json
+import os
+import socket
+import sys
+import threading
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+import requests
+
+# Make src importable without packages
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.join(SRC, "extractors"))
+sys.path.insert(0, os.path.join(SRC, "pipelines"))
+
+from extractors.page_record import extract_record, extract_record_timed  # type: ignore
+from fetchers.http_pool import ConcurrentFetcher              # type: ignore
+from outputs.writer_jsonl import iter_jsonl                   # type: ignore
+from pipelines.daemon import ExtractionServer, ExtractionService  # type: ignore
+from pipelines.incremental import IncrementalState            # type: ignore
+from pipelines.inputs import InputStream, SeenFilter          # type: ignore
+from pipelines.metrics import RunMetrics, StageStats, percentile  # type: ignore
+from pipelines.normalize import normalize_record              # type: ignore
+from pipelines.review_harvest import ReviewHarvester          # type: ignore
+from pipelines.sharding import merge_outputs, parse_shard, shard_of, shard_path  # type: ignore
+from pipelines.staged import StagedPipeline                   # type: ignore
+
+from test_parsers import HTML
+
+URL = "https://www.g2.com/products/acme/reviews"
+
+def test_staged_pipeline_keeps_order_and_isolates_failures():
+    pages = [(f"{URL}?n={i}", HTML, None) for i in range(5)]
+    pages.insert(2, ("https://www.g2.com/broken", None, RuntimeError("fetch failed")))
+
+    pipeline = StagedPipeline(extract_record, normalize_record, parse_workers=0, queue_size=2)
+    results = list(pipeline.run(iter(pages)))
+
+    assert [r[0] for r in results] == [p[0] for p in pages]
+    assert isinstance(results[2][2], RuntimeError)
+    assert all(r[1]["product_name"] == "Acme Widget" for i, r in enumerate(results) if i != 2)
+
+def test_staged_pipeline_process_pool_matches_inline():
+    pages = [(f"{URL}?n={i}", HTML, None) for i in range(4)]
+    inline = list(StagedPipeline(extract_record, normalize_record).run(iter(pages)))
+    pooled = list(StagedPipeline(extract_record, normalize_record, parse_workers=2).run(iter(pages)))
+    assert pooled == inline
+
+def _extract_or_die(html, src):
+    if src.endswith("crash"):
+        os._exit(1)  # a worker dying breaks the whole pool
+    return extract_record(html, src)
+
+def test_staged_pipeline_survives_a_dead_worker():
+    pages = [(f"{URL}?n={i}", HTML, None) for i in range(3)] + [(URL + "?crash", HTML, None)]
+    pages += [(f"{URL}?m={i}", HTML, None) for i in range(3)]
+    for workers, queue_size in ((1, 1), (2, 4)):
+        pipeline = StagedPipeline(_extract_or_die, normalize_record, parse_workers=workers, queue_size=queue_size)
+        results = list(pipeline.run(iter(pages)))
+        assert [r[0] for r in results] == [p[0] for p in pages]
+        # Only the crashing page fails; pages in flight with it and after it still come out.
+        assert isinstance(results[3][2], BrokenProcessPool)
+        assert all(r[2] is None and r[1]["product_name"] == "Acme Widget" for i, r in enumerate(results) if i != 3)
+
+def test_incremental_state_skips_unchanged_and_diffs_records(tmp_path):
+    db = str(tmp_path / "state.sqlite3")
+    changed_html = HTML.replace("Acme Widget", "Acme Widget Pro")
+
+    state = IncrementalState(db)
+    pages = list(state.skip_unchanged(iter([(URL, HTML, None)])))
+    assert state.diff(URL, normalize_record(extract_record(HTML, URL))) == {"*": "new"}
+    state.save([URL])
+    state.close()
+
+    state = IncrementalState(db)
+    metrics = RunMetrics()
+    metrics.observe("fetch", URL, 0.1)
+    assert list(state.skip_unchanged(iter([(URL, HTML, None)]), on_skip=metrics.skip_source)) == []
+    assert state.unchanged == 1
+    # Skipped pages never reach finish_source: their timings must not pile up.
+    assert metrics._pending == {} and metrics.summary()["counters"] == {"skipped": 1}
+
+    pages = list(state.skip_unchanged(iter([(URL, changed_html, None)])))
+    assert len(pages) == 1
+    changes = state.diff(URL, normalize_record(extract_record(changed_html, URL)))
+    state.save([URL])
+    assert changes["product_name"] == {"old": "Acme Widget", "new": "Acme Widget Pro"}
+    assert "rating" not in changes
+    state.close()
+
+    # A diff is only staged: if the record never gets written, the page is retried.
+    newer_html = HTML.replace("Acme Widget", "Acme Widget Max")
+    state = IncrementalState(db)
+    list(state.skip_unchanged(iter([(URL, newer_html, None)])))
+    assert "product_name" in state.diff(URL, normalize_record(extract_record(newer_html, URL)))
+    state.close()
+    state = IncrementalState(db)
+    assert len(list(state.skip_unchanged(iter([(URL, newer_html, None)])))) == 1
+    state.diff(URL, normalize_record(extract_record(newer_html, URL)))
+    state.save()
+    assert list(state.skip_unchanged(iter([(URL, newer_html, None)]))) == []
+    state.close()
+
+def test_run_metrics_percentiles_slowest_and_prometheus(tmp_path):
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 99) == 4.0
+
+    record, timings = extract_record_timed(HTML, URL, "soup")
+    assert record["product_name"] == "Acme Widget"
+    assert "parse" in timings and "parse_reviews" in timings
+    assert extract_record_timed(HTML, URL, "soup", timed=False) == (record, {})
+
+    stats = StageStats(size=100)
+    for i in range(10000):
+        stats.add(i / 10000)
+    summary = stats.summary()
+    assert len(stats.sample) == 100 and summary["count"] == 10000 and summary["max"] == 0.9999
+    assert abs(summary["total"] - 4999.5) < 1e-6 and 0.35 < summary["p50"] < 0.65 and summary["p99"] > 0.9
+
+    metrics = RunMetrics(slowest=2)
+    for i, seconds in enumerate([0.01, 0.5, 0.02, 0.3]):
+        metrics.observe("fetch", f"src{i}", seconds)
+        metrics.finish_source(f"src{i}")
+    metrics.finish_source("bad", ok=False)
+
+    summary = metrics.summary()
+    assert summary["pages"] == 4 and summary["counters"]["errors"] == 1
+    assert [s["source"] for s in summary["slowest"]] == ["src1", "src3"]
+
+    prom = tmp_path / "metrics.prom"
+    metrics.write_prometheus(str(prom))
+    text = prom.read_text()
+    assert 'g2_scraper_stage_seconds_count{stage="fetch"} 4' in text
+    assert "g2_scraper_pages_total 4" in text
+
+def _review_page(ids, pages=4):
+    links = "".join(f'<a href="/products/acme/reviews?page={n}">{n}</a>' for n in range(2, pages + 1))
+    blocks = "".join(
+        f'<div data-testid="review"><h3 data-testid="review-title">Review {i}</h3>'
+        f'<a href="https://www.g2.com/products/acme/reviews/acme-review-{i}">Read</a></div>'
+        for i in ids
+    )
+    return f"<html><body>{blocks}<nav>{links}</nav></body></html>"
+
+def test_review_harvest_dedupes_and_stops_at_stored_reviews(tmp_path):
+    site = {
+        URL: _review_page([10, 9, 8]),
+        URL + "?page=2": _review_page([7, 6, 5]),
+        URL + "?page=3": _review_page([5, 4, 3]),  # review 5 shifted onto the next page
+        URL + "?page=4": _review_page([2, 1]),
+    }
+    requested = []
+
+    def fetch(source, **kwargs):
+        requested.append(source)
+        return site[source]
+
+    fetcher = ConcurrentFetcher(fetch, workers=2, per_host=2)
+    harvester = ReviewHarvester(fetcher, str(tmp_path))
+    stats = harvester.harvest(URL + "#reviews")
+    path = tmp_path / "acme.reviews.jsonl"
+    ids = [r["review_id"] for r in iter_jsonl(str(path))]
+    assert ids == [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+    assert stats["pages"] == 4 and stats["duplicates"] == 1 and not stats["stopped_early"]
+
+    # Two new reviews pushed everything down: only page 1 is needed.
+    site[URL] = _review_page([12, 11, 10])
+    requested.clear()
+    stats = harvester.harvest(URL)
+    assert stats["new"] == 2 and stats["stopped_early"]
+    assert requested == [URL]
+    assert [r["review_id"] for r in iter_jsonl(str(path))][-2:] == [12, 11]
+
+def test_sharding_is_stable_and_merge_is_deterministic(tmp_path):
+    assert parse_shard("2/4") == (2, 4)
+    with pytest.raises(ValueError):
+        parse_shard("5/4")
+    assert shard_path("out/records.jsonl.gz", 2, 4) == "out/records.shard-2-of-4.jsonl.gz"
+
+    urls = [f"https://www.g2.com/products/p{i}/reviews" for i in range(40)]
+    (tmp_path / "urls.txt").write_text("\n".join(urls), encoding="utf-8")
+    shards = [list(InputStream(str(tmp_path / "urls.txt"), shard=(i, 4))) for i in range(1, 5)]
+    assert sorted(sum(shards, [])) == sorted(urls)
+    assert shard_of("HTTPS://www.g2.com/products/p7/#reviews", 4) == shard_of(urls[7], 4)
+
+    a = [{"g2_link": urls[3], "n": 1}, {"g2_link": urls[1], "n": 1, "name": "ünïcode ]},[ {"}]
+    b = [{"g2_link": urls[3] + "#reviews", "n": 2}, {"g2_link": urls[2], "n": 2}]
+    (tmp_path / "a.json").write_text(json.dumps(a, indent=2), encoding="utf-8")
+    with open(tmp_path / "b.jsonl", "w") as f:
+        f.write("\n".join(json.dumps(r) for r in b) + "\n")
+    out = tmp_path / "merged.json"
+    assert merge_outputs([str(tmp_path / "a.json"), str(tmp_path / "b.jsonl")], str(out)) == (3, 1)
+    merged = json.loads(out.read_text(encoding="utf-8"))
+    assert [r["g2_link"] for r in merged] == [urls[1], urls[2], urls[3]]
+    assert merged[2]["n"] == 1
+    assert out.read_text(encoding="utf-8") == json.dumps(merged, ensure_ascii=False, indent=2)  # JsonWriter layout
+
+def test_input_stream_is_lazy_deduped_and_reads_gzip_and_stdin(tmp_path, monkeypatch):
+    lines = ["# seeds", "https://www.g2.com/products/a/reviews", "", "https://WWW.g2.com/products/a/reviews#top",
+             "https://www.g2.com/products/a/reviews?page=2", "https://www.g2.com/products/a/pricing",
+             "/tmp/x/../page.html", "/tmp/page.html"]
+    path = tmp_path / "inputs.txt.gz"
+    with gzip.open(path, "wt") as f:
+        f.write("\n".join(lines) + "\n")
+
+    assert len(list(InputStream(str(path)))) == 6  # dedupe is opt-in
+    stream = InputStream(str(path), dedupe=True)
+    it = iter(stream)
+    assert next(it) == "https://www.g2.com/products/a/reviews"
+    rest = list(it)
+    assert rest == ["https://www.g2.com/products/a/reviews?page=2", "https://www.g2.com/products/a/pricing",
+                    "/tmp/x/../page.html"]
+    assert stream.duplicates == 2 and stream.offset == stream.size
+    assert stream.progress().startswith("100.0%")
+
+    monkeypatch.setattr("sys.stdin", io.TextIOWrapper(io.BytesIO(b"a.html\nb.html\na.html\n")))
+    stdin = InputStream("-", dedupe=True)
+    assert list(stdin) == ["a.html", "b.html"] and stdin.offset == 21
+
+    seen = SeenFilter(capacity=1000, error_rate=1e-6)
+    assert not any(seen.add(f"https://www.g2.com/products/p{i}/reviews") for i in range(5000))
+    assert all(seen.add(f"https://www.g2.com/products/p{i}/reviews") for i in range(5000))
+    assert len(seen.layers) == 3
+
+def test_extraction_server_handles_urls_batches_and_raw_html():
+    def fetch_pages(urls):
+        for src in urls:
+            if src.endswith("/missing"):
+                yield src, None, FileNotFoundError(src)
+            else:
+                yield src, HTML, None
+
+    schema = os.path.join(SRC, "outputs", "schema.json")
+    service = ExtractionService(schema, fetch_pages, backend="lxml", workers=1, max_batch=3)
+    server = ExtractionServer(("127.0.0.1", 0), service)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = "http://127.0.0.1:%d" % server.server_address[1]
+    expected = normalize_record(extract_record(HTML, URL, backend="lxml"))
+    try:
+        single = requests.post(base + "/extract", json={"url": URL}).json()
+        assert single == {"source": URL, "record": expected}
+
+        batch = requests.post(base + "/extract", json=[
+            {"url": URL}, {"url": "https://www.g2.com/missing"}, {"url": URL, "html": HTML},
+        ]).json()["results"]
+        assert [r.get("record") for r in batch] == [expected, None, expected]
+        assert batch[1]["error"].startswith("FileNotFoundError")
+
+        raw = requests.post(base + "/extract", params={"url": URL}, data=HTML.encode("utf-8"),
+                            headers={"Content-Type": "text/html; charset=utf-8"}).json()
+        assert raw["record"] == expected
+
+        assert requests.post(base + "/extract", json=[{"url": URL}] * 4).status_code == 413
+        assert requests.post(base + "/extract", data="{oops").status_code == 400
+        with socket.create_connection(server.server_address[:2]) as conn:
+            conn.sendall(b"POST /extract HTTP/1.1\r\nHost: x\r\nContent-Length: ten\r\n\r\n")
+            reply = conn.makefile("rb").read().decode("utf-8")  # the server closes the connection
+        assert reply.startswith("HTTP/1.0 400") or reply.startswith("HTTP/1.1 400")
+        assert "invalid Content-Length" in reply
+        assert requests.get(base + "/health").json() == {"status": "ok", "backend": "lxml", "served": 5,
+                                                          "restarts": 0}
+
+        # A worker dying (segfault, OOM kill) breaks the pool; the service
+        # replaces it instead of failing every later request.
+        for process in list(service.pool._processes.values()):
+            process.kill()
+        first = service.handle([{"url": URL, "html": HTML}])[0]
+        assert first["error"].startswith("BrokenProcessPool")
+        assert service.handle([{"url": URL, "html": HTML}]) == [{"source": URL, "record": expected}]
+        assert service.restarts == 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.close()
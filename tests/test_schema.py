@@ -1,12 +1,16 @@
 import json
 import os
 import sys
-from jsonschema import Draft202012Validator
+import pytest
+from jsonschema import Draft202012Validator, exceptions as js_exceptions
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 SRC = os.path.join(ROOT, "src")
 SCHEMA = os.path.join(SRC, "outputs", "schema.json")
 SAMPLE = os.path.join(ROOT, "data", "sample_output.json")
+sys.path.insert(0, SRC)
+
+from pipelines.validators import SchemaValidator  # type: ignore
 
 def test_sample_output_matches_schema():
     with open(SCHEMA, "r", encoding="utf-8") as f:
@@ -17,4 +21,38 @@ def test_sample_output_matches_schema():
     # Validate every record in sample output
     for rec in data:
         errors = sorted(validator.iter_errors(rec), key=lambda e: e.path)
-        assert not errors, f"Schema validation errors: {errors}"
\ No newline at end of file
+        assert not errors, f"Schema validation errors: {errors}"
+
+def test_fast_validator_matches_jsonschema_messages():
+    with open(SAMPLE, "r", encoding="utf-8") as f:
+        record = json.load(f)[0]
+    validator = SchemaValidator(SCHEMA)
+    assert validator.fast_check is not None
+
+    bad = [
+        dict(record, rating="4.5"),
+        dict(record, reviews=True),
+        dict(record, extra_field=1),
+        {k: v for k, v in record.items() if k != "g2_link"},
+        dict(record, pricing_plans=[{"plan_name": "Pro", "plan_description": None, "plan_features": [3]}]),
+        dict(record, star_distribution={"1": 0, "2": 0, "3": 0, "4": 0}),
+    ]
+    reference = Draft202012Validator(validator.schema)
+    for rec in bad:
+        first = sorted(reference.iter_errors(rec), key=lambda e: e.path)[0]
+        expected = (".".join(str(p) for p in first.path) or "<root>") + ": " + first.message
+        with pytest.raises(js_exceptions.ValidationError) as exc:
+            validator.validate_instance(rec)
+        assert exc.value.message == expected
+
+    assert validator.validate_batch([record, bad[0], dict(record, rating=4)]) == [
+        None, "rating: '4.5' is not of type 'number', 'null'", None]
+
+    sampled = SchemaValidator(SCHEMA, sample_every=3)
+    raised = 0
+    for _ in range(6):
+        try:
+            sampled.validate_instance(bad[0])
+        except js_exceptions.ValidationError:
+            raised += 1
+    assert raised == 2
@@ -0,0 +1,132 @@
+import gzip
+import json
+import os
+import sqlite3
+import sys
+
+# Make src importable without packages
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+SRC = os.path.join(ROOT, "src")
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.join(SRC, "outputs"))
+
+from outputs.writer_json import JsonWriter                                          # type: ignore
+from outputs.writer_jsonl import Checkpoint, JsonlWriter, finalize_jsonl, iter_jsonl  # type: ignore
+from outputs.writer_sqlite import SqliteWriter                                      # type: ignore
+from pipelines.normalize import normalize_record                                    # type: ignore
+from pipelines.records import ProductRecord                                         # type: ignore
+
+SAMPLE = os.path.join(ROOT, "data", "sample_output.json")
+
+def _records():
+    with open(SAMPLE, "r", encoding="utf-8") as f:
+        base = json.load(f)[0]
+    return [dict(base, g2_link=f"https://www.g2.com/products/p{i}/reviews") for i in range(5)]
+
+def test_jsonl_batches_checkpoint_and_finalize_matches_json_writer(tmp_path):
+    records = _records()
+    jsonl = str(tmp_path / "out.jsonl.gz")
+    checkpoint = Checkpoint(str(tmp_path / "out.checkpoint"))
+
+    writer = JsonlWriter(jsonl, batch_size=2, checkpoint=checkpoint)
+    for rec in records[:3]:
+        writer.write_record(rec, source=rec["g2_link"])
+    # Only the first full batch has been flushed and checkpointed so far
+    assert checkpoint.load() == {r["g2_link"] for r in records[:2]}
+    writer.close()
+
+    # Resume appends the rest
+    with JsonlWriter(jsonl, batch_size=2, append=True, checkpoint=checkpoint) as writer:
+        for rec in records[3:]:
+            writer.write_record(rec, source=rec["g2_link"])
+    assert checkpoint.load() == {r["g2_link"] for r in records}
+    assert list(iter_jsonl(jsonl)) == records
+
+    finalized = str(tmp_path / "final.json")
+    reference = str(tmp_path / "reference.json")
+    assert finalize_jsonl(jsonl, finalized) == len(records)
+    JsonWriter(reference).write(records)
+    with open(finalized, encoding="utf-8") as a, open(reference, encoding="utf-8") as b:
+        assert a.read() == b.read()
+
+def test_resume_after_truncated_tail(tmp_path):
+    records = _records()
+    for name in ("out.jsonl", "out.jsonl.gz"):
+        path = str(tmp_path / name)
+        with JsonlWriter(path, batch_size=1) as writer:
+            for rec in records[:2]:
+                writer.write_record(rec)
+        # A crash mid-batch: half a line, or half a gzip member.
+        tail = json.dumps(records[2]).encode("utf-8") + b"\n"
+        with open(path, "ab") as f:
+            f.write(gzip.compress(tail)[:-12] if name.endswith(".gz") else tail[:40])
+        assert list(iter_jsonl(path)) == records[:2]
+
+        with JsonlWriter(path, batch_size=1, append=True) as writer:
+            for rec in records[2:]:
+                writer.write_record(rec)
+        assert list(iter_jsonl(path)) == records
+
+def test_finalize_empty_and_truncated_stream(tmp_path):
+    jsonl = str(tmp_path / "out.jsonl")
+    with open(jsonl, "w", encoding="utf-8") as f:
+        f.write('{"a": 1}\n{"a": ')
+    out = str(tmp_path / "out.json")
+    assert finalize_jsonl(jsonl, out) == 1
+
+    open(jsonl, "w").close()
+    assert finalize_jsonl(jsonl, out) == 0
+    with open(out, encoding="utf-8") as f:
+        assert json.load(f) == []
+
+def test_sqlite_writer_upserts_child_tables_and_history(tmp_path):
+    records = _records()
+    db_path = str(tmp_path / "records.sqlite3")
+    with SqliteWriter(db_path, batch_size=2) as sink:
+        for record in records:
+            sink.write_record(record, source=record["g2_link"])
+
+    changed = dict(records[0], rating=(records[0]["rating"] or 0) + 0.1, alternatives=[])
+    with SqliteWriter(db_path) as sink:
+        sink.write_record(changed)
+        sink.write_record(records[1])  # unchanged: no new history row
+
+    db = sqlite3.connect(db_path)
+    link = records[0]["g2_link"]
+    assert db.execute("SELECT COUNT(*) FROM products").fetchone()[0] == 5
+    assert db.execute("SELECT rating FROM products WHERE g2_link = ?", (link,)).fetchone()[0] == changed["rating"]
+    assert db.execute("SELECT COUNT(*) FROM alternatives WHERE g2_link = ?", (link,)).fetchone()[0] == 0
+    assert db.execute("SELECT COUNT(*) FROM categories WHERE g2_link = ?", (link,)).fetchone()[0] == \
+        len(records[0]["categories"])
+    history = db.execute("SELECT g2_link, rating FROM history ORDER BY rowid").fetchall()
+    assert len(history) == 6 and history[-1] == (link, changed["rating"])
+    first, last = db.execute("SELECT first_seen, last_seen FROM products WHERE g2_link = ?",
+                             (records[1]["g2_link"],)).fetchone()
+    assert last >= first
+
+def test_compact_records_round_trip_and_write_like_dicts(tmp_path):
+    records = [normalize_record(r) for r in _records()]
+    compact = [ProductRecord.from_dict(r) for r in records]
+    assert [c.to_dict() for c in compact] == records
+    assert compact[0] == records[0] and compact[0]["categories"][0] == records[0]["categories"][0]
+    assert dict(compact[0]["star_distribution"].items()) == records[0]["star_distribution"]
+
+    # normalize_record(in_place=True) keeps an already core-shaped record
+    assert normalize_record(records[0], in_place=True) is records[0]
+
+    plain_out, compact_out = str(tmp_path / "plain.json"), str(tmp_path / "compact.json")
+    JsonWriter(plain_out).write(records)
+    JsonWriter(compact_out).write(compact)
+    with open(plain_out, "rb") as a, open(compact_out, "rb") as b:
+        assert a.read() == b.read()
+
+    jsonl = str(tmp_path / "compact.jsonl")
+    with JsonlWriter(jsonl, batch_size=2) as writer:
+        for rec in compact:
+            writer.write_record(rec, source=rec["g2_link"])
+    assert list(iter_jsonl(jsonl)) == records
+
+    with SqliteWriter(str(tmp_path / "compact.sqlite3")) as sink:
+        for rec in compact:
+            sink.write_record(rec)
+    assert sink.count == len(records)